@@ -0,0 +1 @@
+# API module init
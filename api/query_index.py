@@ -0,0 +1,148 @@
+# ============================================
+# QUERY INDEX - IN-MEMORY INDEXES PER SCAN CYCLE
+# ============================================
+
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.scanner import SIGNAL_COLUMNS
+
+# Columns that can be sorted on
+SORTABLE_COLUMNS = [
+    'score', 'price', 'change_percent', 'avg_turnover_5d', 'daily_turnover',
+    'volume_ratio', 'stoch_k', 'stoch_d', 'correction_percent', 'early_entry_strength'
+]
+
+# Columns returned per row
+RECORD_COLUMNS = [
+    'price', 'change_percent', 'supertrend_value', 'is_bullish', 'score', 'status',
+    'stoch_k', 'stoch_d', 'volume_ratio', 'daily_turnover', 'avg_turnover_5d',
+    'correction_percent', 'early_entry_strength'
+]
+
+
+class QueryError(ValueError):
+    """Invalid query parameter (answered with 400)"""
+
+
+def _json_value(value):
+    """numpy scalar -> JSON-safe Python value (NaN/inf -> None)"""
+    if isinstance(value, (np.bool_, bool)):
+        return bool(value)
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (np.floating, float)):
+        value = float(value)
+        return value if math.isfinite(value) else None
+    return value
+
+
+class QueryIndex:
+    """
+    Indexes over one scan cycle's results table
+
+    Built once per cycle: column arrays, per-status positions, per-signal
+    masks, lazily computed sort orders and ready-to-serialize records, so
+    a query is a few mask operations and a slice.
+    """
+
+    def __init__(self, table: pd.DataFrame, cycle_id: int, updated_at=None):
+        self.cycle_id = cycle_id
+        self.updated_at = updated_at
+        self.tickers = table.index.to_numpy()
+        self.size = len(table)
+        self.positions = {ticker: i for i, ticker in enumerate(self.tickers.tolist())}
+
+        self.columns = {name: table[name].to_numpy() for name in RECORD_COLUMNS if name in table}
+        self.score = table['score'].to_numpy(dtype=float) if self.size else np.array([], dtype=float)
+        self.turnover = table['avg_turnover_5d'].to_numpy(dtype=float) if self.size else np.array([], dtype=float)
+
+        statuses = table['status'].astype(str).to_numpy() if self.size else np.array([], dtype=str)
+        self.status_masks = {status: statuses == status for status in np.unique(statuses).tolist()}
+        self.signal_masks = {
+            signal_type: table[column].to_numpy(dtype=bool) if self.size else np.array([], dtype=bool)
+            for signal_type, column in SIGNAL_COLUMNS.items()
+        }
+        self._orders = {}
+        self.records = self._build_records()
+
+    def _build_records(self) -> List[dict]:
+        """One JSON-ready dict per row"""
+        records = []
+        column_values = {name: values.tolist() for name, values in self.columns.items()}
+        for i, ticker in enumerate(self.tickers.tolist()):
+            record = {'ticker': ticker}
+            for name, values in column_values.items():
+                record[name] = _json_value(values[i])
+            record['signals'] = [signal_type for signal_type, mask in self.signal_masks.items() if mask[i]]
+            records.append(record)
+        return records
+
+    def _order(self, column: str) -> np.ndarray:
+        """Ascending stable sort order of a column (cached per cycle)"""
+        order = self._orders.get(column)
+        if order is None:
+            values = pd.to_numeric(pd.Series(self.columns[column]), errors='coerce').to_numpy(dtype=float)
+            order = np.argsort(np.nan_to_num(values, nan=-np.inf), kind='stable')
+            self._orders[column] = order
+        return order
+
+    def query(self, status: Optional[List[str]] = None, signal: Optional[List[str]] = None,
+              min_score: float = None, max_score: float = None, min_turnover: float = None,
+              sort: str = 'score', descending: bool = True, limit: int = 100, offset: int = 0) -> Dict:
+        """
+        Filter, sort and page the cycle's rows
+
+        Args:
+            status: Keep rows with any of these statuses
+            signal: Keep rows flagged with any of these signal types
+            min_score, max_score: Inclusive score range
+            min_turnover: Minimum 5-day average turnover (IDR)
+            sort: Column to sort by (SORTABLE_COLUMNS)
+            descending: Sort order
+            limit, offset: Page
+
+        Returns:
+            {'total': matching rows, 'results': [records]}
+        """
+        if sort not in SORTABLE_COLUMNS or sort not in self.columns:
+            raise QueryError(f"sort must be one of: {', '.join(SORTABLE_COLUMNS)}")
+        if self.size == 0:
+            return {'total': 0, 'results': []}
+
+        mask = np.ones(self.size, dtype=bool)
+        if status:
+            status_mask = np.zeros(self.size, dtype=bool)
+            for name in status:
+                if name in self.status_masks:
+                    status_mask |= self.status_masks[name]
+            mask &= status_mask
+        if signal:
+            signal_mask = np.zeros(self.size, dtype=bool)
+            for name in signal:
+                if name not in self.signal_masks:
+                    raise QueryError(f"signal must be one of: {', '.join(SIGNAL_COLUMNS)}")
+                signal_mask |= self.signal_masks[name]
+            mask &= signal_mask
+        if min_score is not None:
+            mask &= self.score >= min_score
+        if max_score is not None:
+            mask &= self.score <= max_score
+        if min_turnover is not None:
+            mask &= self.turnover >= min_turnover
+
+        order = self._order(sort)
+        if descending:
+            order = order[::-1]
+        matched = order[mask[order]]
+
+        page = matched[offset:offset + limit]
+        return {'total': int(len(matched)), 'results': [self.records[i] for i in page.tolist()]}
+
+    def get(self, ticker: str) -> Optional[dict]:
+        """Record of one ticker"""
+        i = self.positions.get(ticker)
+        return self.records[i] if i is not None else None
@@ -0,0 +1,255 @@
+# ============================================
+# HTTP QUERY API - LATEST SCAN RESULTS (READ-ONLY)
+# ============================================
+# GET /health
+# GET /results?status=STRONG+BUY&signal=accumulation&min_score=60&min_turnover=1e10&sort=score&order=desc&limit=20
+# GET /results/BBCA
+# GET /top?n=20
+# GET /metrics   (Prometheus text format)
+
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlparse, parse_qs
+import logging
+
+from config.settings import API_HOST, API_PORT, API_MAX_LIMIT
+from core.results_cache import get_results_cache
+from monitoring.metrics import render_metrics
+from .query_index import QueryIndex, QueryError
+
+logger = logging.getLogger(__name__)
+
+# Cycle ids restart at 1 with the process; the boot time keeps ETags unique
+_BOOT_TAG = format(int(time.time()), 'x')
+
+
+class QueryService:
+    """
+    Answers API queries from the results cache
+
+    The QueryIndex is rebuilt only when a new cycle is published; encoded
+    responses are memoized per (cycle, path, query) so repeated polling
+    between scans is a dict lookup, or a 304 when the client sends the
+    cycle's ETag.
+    """
+
+    def __init__(self, cache=None, max_memo: int = 256):
+        self.cache = cache or get_results_cache()
+        self.max_memo = max_memo
+        self._lock = threading.Lock()
+        self._index = None
+        self._memo = {}
+
+    def get_index(self) -> QueryIndex:
+        """Index of the latest cycle (rebuilt when the cycle changes)"""
+        cycle_id, updated_at, table = self.cache.snapshot()
+        with self._lock:
+            if self._index is None or self._index.cycle_id != cycle_id:
+                self._index = QueryIndex(table, cycle_id, updated_at)
+                self._memo = {}
+            return self._index
+
+    def etag(self, cycle_id: int) -> str:
+        """Entity tag of a cycle's responses"""
+        return f'"{_BOOT_TAG}-{cycle_id}"'
+
+    def respond(self, path: str, query: str):
+        """
+        Route one GET request
+
+        Returns:
+            (status, body bytes, cycle_id)
+        """
+        index = self.get_index()
+        key = (path, query)
+        with self._lock:
+            cached = self._memo.get(key) if index is self._index else None
+        if cached is not None:
+            return cached + (index.cycle_id,)
+
+        params = {k: v for k, v in parse_qs(query).items()}
+        try:
+            status, payload = self._route(index, path, params)
+        except QueryError as e:
+            status, payload = 400, {'error': str(e)}
+
+        if status == 200:
+            payload = {
+                'cycle_id': index.cycle_id,
+                'updated_at': index.updated_at.isoformat() if index.updated_at is not None else None,
+                **payload
+            }
+        body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+        with self._lock:
+            if index is self._index:
+                if len(self._memo) >= self.max_memo:
+                    self._memo.clear()
+                self._memo[key] = (status, body)
+        return status, body, index.cycle_id
+
+    def _route(self, index: QueryIndex, path: str, params: dict):
+        if path == '/health':
+            return 200, {'status': 'ok', 'tickers': index.size}
+
+        if path == '/results' or path == '/top':
+            if path == '/top':
+                params.setdefault('sort', ['score'])
+                params.setdefault('limit', params.get('n', ['10']))
+            return 200, index.query(
+                status=_list_param(params, 'status'),
+                signal=_list_param(params, 'signal'),
+                min_score=_float_param(params, 'min_score'),
+                max_score=_float_param(params, 'max_score'),
+                min_turnover=_float_param(params, 'min_turnover'),
+                sort=params.get('sort', ['score'])[0],
+                descending=params.get('order', ['desc'])[0].lower() != 'asc',
+                limit=min(_int_param(params, 'limit', 100), API_MAX_LIMIT),
+                offset=_int_param(params, 'offset', 0)
+            )
+
+        if path.startswith('/results/'):
+            ticker = path[len('/results/'):].upper()
+            ticker = ticker if ticker.endswith('.JK') else ticker + '.JK'
+            record = index.get(ticker)
+            if record is None:
+                return 404, {'error': f"{ticker} not in latest scan"}
+            return 200, {'result': record}
+
+        return 404, {'error': "Not Found"}
+
+
+def _list_param(params: dict, name: str) -> Optional[list]:
+    """?status=A&status=B or ?status=A,B -> ['A', 'B']"""
+    values = [v.strip() for value in params.get(name, []) for v in value.split(',') if v.strip()]
+    return values or None
+
+
+def _float_param(params: dict, name: str) -> Optional[float]:
+    if name not in params:
+        return None
+    try:
+        value = float(params[name][0])
+    except ValueError:
+        raise QueryError(f"{name} must be a number")
+    if not math.isfinite(value):
+        raise QueryError(f"{name} must be a finite number")
+    return value
+
+
+def _int_param(params: dict, name: str, default: int) -> int:
+    """Non-negative integer parameter (?limit=0 is kept, not the default)"""
+    if name not in params:
+        return default
+    try:
+        value = int(params[name][0])
+    except ValueError:
+        raise QueryError(f"{name} must be an integer")
+    if value < 0:
+        raise QueryError(f"{name} must not be negative")
+    return value
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """GET-only JSON handler with ETag / If-None-Match support"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        service = self.server.service
+        url = urlparse(self.path)
+        path = url.path.rstrip('/') or '/'
+
+        if path == '/metrics':
+            self._send_metrics()
+            return
+
+        try:
+            status, body, cycle_id = service.respond(path, url.query)
+        except Exception as e:
+            logger.error(f"API error on {self.path}: {str(e)}")
+            status, body, cycle_id = 500, b'{"error":"Internal Server Error"}', None
+
+        etag = service.etag(cycle_id) if status == 200 else None
+        if etag is not None and etag in self.headers.get('If-None-Match', ''):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if etag is not None:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')  # Revalidate, usually a 304
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_metrics(self):
+        body = render_metrics().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class APIServer:
+    """Threaded HTTP server for the query API"""
+
+    def __init__(self, host: str = API_HOST, port: int = API_PORT, service: QueryService = None):
+        self.service = service or QueryService()
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.service = self.service
+        self._thread = None
+
+    @property
+    def address(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="query-api", daemon=True)
+        self._thread.start()
+        logger.info(f"Query API listening on {self.address}")
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+# Module-level server started by the scheduler
+_server = None
+
+
+def start_api_server(host: str = API_HOST, port: int = API_PORT) -> Optional[APIServer]:
+    """Start the shared API server (None if the port is unavailable)"""
+    global _server
+    if _server is None:
+        try:
+            _server = APIServer(host, port)
+        except OSError as e:
+            logger.error(f"Error starting query API on port {port}: {str(e)}")
+            return None
+        _server.start()
+    return _server
+
+
+def stop_api_server():
+    """Stop the shared API server"""
+    global _server
+    if _server is not None:
+        _server.stop()
+        _server = None
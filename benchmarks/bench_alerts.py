@@ -0,0 +1,101 @@
+# ============================================
+# BENCHMARK - ALERT DELIVERY UNDER BURSTS
+# ============================================
+# Offline: sends through the real DeliveryWorker to a local mock Bot API.
+#   python benchmarks/bench_alerts.py --messages 200 --chats 10 --latency 0.05
+#   python benchmarks/bench_alerts.py --no-client-limits   # let the server push back with 429s
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import notifications.delivery as delivery
+from notifications.delivery import DeliveryWorker
+from notifications.mock_telegram_server import MockTelegramServer
+from database.outbox import Outbox
+
+
+def run(args) -> dict:
+    server = MockTelegramServer(
+        port=0, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=42,
+        chat_interval=args.server_chat_interval, group_rate_per_min=20, global_rate_per_sec=30
+    )
+    delivery.TELEGRAM_API_BASE_URL = server.start()
+
+    if args.no_client_limits:
+        delivery.TELEGRAM_CHAT_MIN_INTERVAL = 0.0
+        delivery.TELEGRAM_GLOBAL_RATE_PER_SEC = 10_000
+        delivery.TELEGRAM_GROUP_RATE_PER_MIN = 10_000
+
+    outbox = None
+    if args.outbox:
+        outbox = Outbox(os.path.join(tempfile.mkdtemp(prefix="bench_outbox_"), "scanner.db"))
+
+    worker = DeliveryWorker(outbox=outbox)
+    chats = [f"-100{i:010d}" if args.groups else str(1000 + i) for i in range(args.chats)]
+    text = ("📈 BENCH " * (args.size // 9 + 1))[:args.size]
+
+    started = time.time()
+    for burst in range(args.bursts):
+        for i in range(args.messages):
+            worker.submit(f"{text} #{burst}-{i}", chats[i % len(chats)])
+        if burst < args.bursts - 1:
+            time.sleep(args.burst_gap)
+    submitted = time.time() - started
+
+    drained = worker.flush(timeout=args.timeout)
+    elapsed = time.time() - started
+    worker.stop(timeout=1.0)
+    server.stop()
+
+    stats = worker.get_stats()
+    total = args.messages * args.bursts
+    return {
+        'messages': total,
+        'drained': drained,
+        'submit_ms': submitted * 1000,
+        'elapsed_s': elapsed,
+        'throughput': stats['sent'] / elapsed if elapsed else 0.0,
+        'client': stats,
+        'server': dict(server.stats)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alert delivery burst benchmark (mock Telegram API)")
+    parser.add_argument('--messages', type=int, default=100, help="Messages per burst")
+    parser.add_argument('--bursts', type=int, default=1)
+    parser.add_argument('--burst-gap', type=float, default=5.0, help="Seconds between bursts")
+    parser.add_argument('--chats', type=int, default=10)
+    parser.add_argument('--groups', action='store_true', help="Use group chat ids (20 msgs/min each)")
+    parser.add_argument('--size', type=int, default=1500, help="Message length (chars)")
+    parser.add_argument('--latency', type=float, default=0.05, help="Mock server response time (s)")
+    parser.add_argument('--jitter', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--server-chat-interval', type=float, default=1.0)
+    parser.add_argument('--no-client-limits', action='store_true', help="Disable client-side rate limiting")
+    parser.add_argument('--outbox', action='store_true', help="Persist through a temporary SQLite outbox")
+    parser.add_argument('--timeout', type=float, default=600.0)
+    args = parser.parse_args()
+
+    result = run(args)
+    client, server = result['client'], result['server']
+
+    print("=" * 50)
+    print(f"Messages      : {result['messages']} to {args.chats} chats ({'drained' if result['drained'] else 'TIMEOUT'})")
+    print(f"Submit time   : {result['submit_ms']:.1f} ms")
+    print(f"Elapsed       : {result['elapsed_s']:.2f} s")
+    print(f"Throughput    : {result['throughput']:.1f} msg/s")
+    print(f"Latency       : p50 {client['latency_p50']:.2f}s  p95 {client['latency_p95']:.2f}s  max {client['latency_max']:.2f}s")
+    print(f"HTTP          : p50 {client['http_p50'] * 1000:.0f}ms  p95 {client['http_p95'] * 1000:.0f}ms")
+    print(f"Client        : {client['sent']} sent, {client['failed']} failed, {client['retried']} retried")
+    print(f"Server        : {server['ok']} ok, {server['rate_limited']} x 429, {server['rejected']} rejected, {server['errors']} x 500")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# ============================================
+# BENCHMARK - ALERT RENDER COST PER 1,000 RESULTS
+# ============================================
+#   python benchmarks/bench_render.py --results 1000 --repeat 20
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.scanner import ScanResult, results_to_table
+from notifications.templates import ALERT_TEMPLATES, render_alert_sections, format_timestamp
+from notifications.packer import pack_sections
+
+
+def make_results(n: int, seed: int = 42) -> dict:
+    """Synthetic ScanResults with realistic value ranges"""
+    rng = random.Random(seed)
+    results = {}
+    for i in range(n):
+        r = ScanResult(f"S{i:04d}.JK")
+        r.price = rng.uniform(50, 20000)
+        r.change_percent = rng.uniform(-10, 10)
+        r.supertrend_value = r.price * rng.uniform(0.9, 1.1)
+        r.score = rng.randint(0, 100)
+        r.stoch_k = rng.uniform(0, 100)
+        r.stoch_d = rng.uniform(0, 100)
+        r.volume_ratio = rng.uniform(0, 5)
+        r.correction_percent = rng.uniform(0, 12)
+        r.early_entry_strength = rng.randint(0, 7)
+        results[r.ticker] = r
+    return results
+
+
+def legacy_bullish_entries(results: list) -> list:
+    """Per-result formatting as the builders did before templates (reference)"""
+    entries = []
+    for r in results:
+        ticker_clean = r.ticker.replace('.JK', '')
+        change_str = f"+{r.change_percent:.1f}%" if r.change_percent >= 0 else f"{r.change_percent:.1f}%"
+        entries.append(f"📈 <b>{ticker_clean}</b> | {r.price:,.0f} ({change_str})\n"
+                       f"   └─ ST: {r.supertrend_value:,.0f} | Score: {r.score}")
+    return entries
+
+
+def check_equivalence(results: dict):
+    """Templates must render exactly what the old builders did, NaN prices included"""
+    gaps = make_results(3, seed=7)
+    for r in gaps.values():
+        r.ticker = r.ticker.replace("S", "N")
+    list(gaps.values())[0].price = float('nan')
+    list(gaps.values())[1].change_percent = float('nan')
+    list(gaps.values())[2].price = list(gaps.values())[2].change_percent = float('nan')
+    mixed = list(results.values()) + list(gaps.values())
+
+    expected = legacy_bullish_entries(mixed)
+    template = ALERT_TEMPLATES['bullish_break']
+    table = results_to_table({r.ticker: r for r in mixed})
+    assert template.render_entries(mixed) == expected, "list of ScanResult differs from legacy output"
+    assert template.render_entries(table) == expected, "results table differs from legacy output"
+
+
+def measure(fn, repeat: int) -> float:
+    """Best wall time of fn (seconds) - least affected by scheduler noise"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alert template render micro-benchmark")
+    parser.add_argument('--results', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    results = make_results(args.results)
+    result_list = list(results.values())
+    table = results_to_table(results)
+    tickers = table.index
+    timestamp = format_timestamp()
+    signals = {signal_type: tickers for signal_type in ALERT_TEMPLATES}
+    per_1k = 1000.0 / args.results
+    check_equivalence(results)
+
+    cases = [
+        ("legacy per-result f-strings (bullish)", lambda: legacy_bullish_entries(result_list)),
+        ("template, list of ScanResult (bullish)", lambda: ALERT_TEMPLATES['bullish_break'].render(result_list, timestamp)),
+        ("template, results table (bullish)", lambda: ALERT_TEMPLATES['bullish_break'].render(table, timestamp)),
+        ("template, table, sorted (early entry)", lambda: ALERT_TEMPLATES['early_entry'].render(table, timestamp)),
+        ("all 5 types from table", lambda: render_alert_sections(table, signals, timestamp)),
+        ("all 5 types + pack to messages", lambda: pack_sections(render_alert_sections(table, signals, timestamp))),
+        ("results_to_table (conversion)", lambda: results_to_table(results)),
+    ]
+
+    print("=" * 64)
+    print(f"Render cost per 1,000 results ({args.results} results, best of {args.repeat})")
+    print("Output identical to the legacy formatter (NaN prices included)")
+    print("=" * 64)
+    for name, fn in cases:
+        fn()  # Warm up
+        print(f"{name:<42} {measure(fn, args.repeat) * per_1k * 1000:8.2f} ms")
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    main()
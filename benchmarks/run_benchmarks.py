@@ -0,0 +1,263 @@
+# ============================================
+# BENCHMARK SUITE - INDICATORS, SUPERTREND, SCORING, SCANS
+# ============================================
+#   python benchmarks/run_benchmarks.py                          (all sizes)
+#   python benchmarks/run_benchmarks.py --sizes 600x120 --repeat 5
+#   python benchmarks/run_benchmarks.py --compare benchmarks/results/baseline.json
+#
+# Sizes are <tickers>x<bars> of seeded synthetic market data
+# (core/synthetic_market.py) with planted signals. Results are written as JSON to
+# benchmarks/results/; --compare flags cases whose p50 latency or peak
+# memory grew by more than --threshold (or a planted signal was missed)
+# and exits with status 1.
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.supertrend import calculate_supertrend
+from core.indicators import (
+    calculate_emas, calculate_rsi, calculate_stochastic_rsi, calculate_atr, calculate_adx,
+    calculate_volume_analysis, calculate_momentum, calculate_dca_zones, calculate_all_indicators
+)
+from core.scoring import calculate_total_score
+from core.scanner import analyze_stock, scan_all_stocks, filter_signals, get_indicator_cache
+from core.synthetic_market import SyntheticMarket
+
+MIN_SAMPLES = 30  # Per-function cases: at least this many calls, even for a single ticker
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+DEFAULT_SIZES = ["1x10000", "600x120", "5000x250"]
+
+# Order of calculate_all_indicators: each step gets the previous steps' output
+INDICATOR_PIPELINE = [
+    ("calculate_emas", calculate_emas),
+    ("calculate_rsi", calculate_rsi),
+    ("calculate_stochastic_rsi", calculate_stochastic_rsi),
+    ("calculate_atr", calculate_atr),
+    ("calculate_adx", calculate_adx),
+    ("calculate_volume_analysis", calculate_volume_analysis),
+    ("calculate_momentum", calculate_momentum),
+    ("calculate_dca_zones", calculate_dca_zones),
+]
+
+
+def parse_size(size: str):
+    tickers, bars = size.lower().split("x")
+    return int(tickers), int(bars)
+
+
+def latency_stats(samples: list, units: int = 1, bars: int = 0) -> dict:
+    """p50/p99/mean (ms) and throughput of per-call samples (seconds)"""
+    samples = np.asarray(samples)
+    total = float(samples.sum())
+    return {
+        'calls': int(len(samples)),
+        'p50_ms': float(np.percentile(samples, 50) * 1000),
+        'p99_ms': float(np.percentile(samples, 99) * 1000),
+        'mean_ms': float(samples.mean() * 1000),
+        'throughput_per_s': units * len(samples) / total if total > 0 else 0.0,
+        'bars_per_s': bars * len(samples) / total if total > 0 else 0.0,
+    }
+
+
+def peak_memory_kb(fn) -> float:
+    """Peak traced allocation of one call (KiB)"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def bench_per_frame(fn, frames: list, bars: int, repeat: int, memory: bool) -> dict:
+    """Time fn(frame) once per frame, repeat times (more passes for tiny universes)"""
+    fn(frames[0])  # Warm up
+    samples = []
+    passes = max(repeat, -(-MIN_SAMPLES // len(frames)))
+    for _ in range(passes):
+        for frame in frames:
+            started = time.perf_counter()
+            fn(frame)
+            samples.append(time.perf_counter() - started)
+    stats = latency_stats(samples, bars=bars)
+    stats['peak_kb'] = peak_memory_kb(lambda: fn(frames[0])) if memory else None
+    return stats
+
+
+def run_size(tickers: int, bars: int, repeat: int, max_calls: int, memory: bool, seed: int) -> dict:
+    """All cases for one dataset size"""
+    label = f"{tickers}x{bars}"
+    print(f"\nGenerating {label} synthetic market...")
+    market = SyntheticMarket(tickers, bars, seed, end=date(2026, 1, 30))  # Fixed end: same data every run
+    universe = market.generate()
+    frames = list(universe.values())
+    sample = frames[:max_calls]  # Per-function cases on a subset of the universe
+    cases = {}
+
+    def record(name: str, stats: dict):
+        cases[name] = stats
+        peak = f"{stats['peak_kb']:10.0f} KiB" if stats.get('peak_kb') is not None else ""
+        print(f"  {name:<28} p50 {stats['p50_ms']:9.3f} ms  p99 {stats['p99_ms']:9.3f} ms  "
+              f"{stats['throughput_per_s']:10.1f}/s  {peak}")
+
+    record("calculate_supertrend",
+           bench_per_frame(calculate_supertrend, sample, bars, repeat, memory))
+
+    # Indicator inputs: output of the previous pipeline steps (prepared outside timing)
+    stage_inputs = [calculate_supertrend(frame) for frame in sample]
+    for name, fn in INDICATOR_PIPELINE:
+        record(name, bench_per_frame(fn, stage_inputs, bars, repeat, memory))
+        stage_inputs = [fn(frame) for frame in stage_inputs]
+
+    supertrend_frames = [calculate_supertrend(frame) for frame in sample]
+    record("calculate_all_indicators",
+           bench_per_frame(calculate_all_indicators, supertrend_frames, bars, repeat, memory))
+    record("calculate_total_score",
+           bench_per_frame(calculate_total_score, stage_inputs, bars, repeat, memory))
+
+    tickers_sample = list(universe.keys())[:max_calls]
+    record("analyze_stock",
+           bench_per_frame(lambda item: analyze_stock(*item), list(zip(tickers_sample, sample)),
+                           bars, repeat, memory))
+
+    # Whole universe per call
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = scan_all_stocks(universe)
+        samples.append(time.perf_counter() - started)
+    stats = latency_stats(samples, units=tickers, bars=tickers * bars)
+    stats['peak_kb'] = peak_memory_kb(lambda: scan_all_stocks(universe)) if memory else None
+    record("scan_all_stocks", stats)
+
+    # Planted signals must all be detected; a drop means signal logic changed
+    fired = filter_signals(results)
+    signals = {}
+    for signal_type, planted in market.planted.items():
+        detected = {r.ticker for r in fired[signal_type]}
+        signals[signal_type] = {'planted': len(planted), 'detected': len(detected & set(planted)),
+                                'fired': len(detected)}
+    print("  signals: " + ", ".join(f"{k} {v['detected']}/{v['planted']} planted ({v['fired']} fired)"
+                                     for k, v in signals.items()))
+
+    return {'tickers': tickers, 'bars': bars, 'cases': cases, 'signals': signals}
+
+
+def environment() -> dict:
+    """Versions and commit the numbers belong to"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'commit': commit,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """
+    Compare two runs case by case
+
+    Returns:
+        List of regression descriptions (p50 or peak memory up by more than threshold)
+    """
+    regressions = []
+    print("\n" + "=" * 78)
+    print(f"Compared with {baseline.get('created_at', '?')} (commit {baseline['environment'].get('commit', '?')})")
+    print("=" * 78)
+    for size, run in current['sizes'].items():
+        base_run = baseline['sizes'].get(size)
+        if base_run is None:
+            print(f"{size}: not in baseline")
+            continue
+        print(size)
+        for signal_type, counts in run.get('signals', {}).items():
+            if counts['detected'] < counts['planted']:
+                regressions.append(f"{size} {signal_type}: detected {counts['detected']}/{counts['planted']} planted")
+        for name, stats in run['cases'].items():
+            base = base_run['cases'].get(name)
+            if base is None:
+                continue
+            change = stats['p50_ms'] / base['p50_ms'] - 1 if base['p50_ms'] > 0 else 0.0
+            flags = []
+            if change > threshold:
+                flags.append("SLOWER")
+                regressions.append(f"{size} {name}: p50 {base['p50_ms']:.3f} -> {stats['p50_ms']:.3f} ms ({change:+.0%})")
+            if stats.get('peak_kb') and base.get('peak_kb'):
+                mem_change = stats['peak_kb'] / base['peak_kb'] - 1
+                if mem_change > threshold:
+                    flags.append("MORE MEMORY")
+                    regressions.append(f"{size} {name}: peak {base['peak_kb']:.0f} -> {stats['peak_kb']:.0f} KiB "
+                                       f"({mem_change:+.0%})")
+            print(f"  {name:<28} {base['p50_ms']:9.3f} -> {stats['p50_ms']:9.3f} ms  {change:+7.1%}  {' '.join(flags)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indicator / scoring / scan benchmark suite")
+    parser.add_argument('--sizes', default=",".join(DEFAULT_SIZES), help="Comma list of <tickers>x<bars>")
+    parser.add_argument('--repeat', type=int, default=3, help="Passes over each dataset")
+    parser.add_argument('--max-calls', type=int, default=200, help="Frames per single-function case")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-memory', action='store_true', help="Skip tracemalloc peak measurement")
+    parser.add_argument('--output', help="JSON output file (default: benchmarks/results/bench_<time>.json)")
+    parser.add_argument('--compare', help="Baseline JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Regression threshold (0.15 = +15%%)")
+    args = parser.parse_args()
+    get_indicator_cache().resize(0)  # Measure the computation, not indicator cache hits
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'settings': {'repeat': args.repeat, 'max_calls': args.max_calls, 'seed': args.seed},
+        'sizes': {}
+    }
+
+    print("=" * 78)
+    print(f"Benchmark suite (repeat {args.repeat}, up to {args.max_calls} frames per function)")
+    print("=" * 78)
+    for size in args.sizes.split(","):
+        tickers, bars = parse_size(size.strip())
+        report['sizes'][f"{tickers}x{bars}"] = run_size(tickers, bars, args.repeat, args.max_calls,
+                                                        not args.no_memory, args.seed)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print("\nREGRESSIONS:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# ============================================
+# IDX MARKET HOLIDAYS (HARI LIBUR BURSA)
+# ============================================
+# Format: 'YYYY-MM-DD': 'Keterangan'
+# Weekends are handled by the calendar, only list weekday closures here.
+# Update every year from the official IDX "Hari Libur Bursa" announcement.
+
+IDX_HOLIDAYS = {
+    # === 2025 ===
+    "2025-01-01": "Tahun Baru Masehi",
+    "2025-01-27": "Isra Mi'raj",
+    "2025-01-28": "Cuti Bersama Tahun Baru Imlek",
+    "2025-01-29": "Tahun Baru Imlek",
+    "2025-03-28": "Cuti Bersama Hari Suci Nyepi",
+    "2025-03-31": "Idul Fitri",
+    "2025-04-01": "Idul Fitri",
+    "2025-04-02": "Cuti Bersama Idul Fitri",
+    "2025-04-03": "Cuti Bersama Idul Fitri",
+    "2025-04-04": "Cuti Bersama Idul Fitri",
+    "2025-04-07": "Cuti Bersama Idul Fitri",
+    "2025-04-18": "Wafat Yesus Kristus",
+    "2025-05-01": "Hari Buruh",
+    "2025-05-12": "Hari Raya Waisak",
+    "2025-05-13": "Cuti Bersama Waisak",
+    "2025-05-29": "Kenaikan Yesus Kristus",
+    "2025-05-30": "Cuti Bersama Kenaikan Yesus Kristus",
+    "2025-06-06": "Idul Adha",
+    "2025-06-09": "Cuti Bersama Idul Adha",
+    "2025-06-27": "Tahun Baru Islam",
+    "2025-08-18": "Cuti Bersama HUT RI",
+    "2025-09-05": "Maulid Nabi Muhammad SAW",
+    "2025-12-25": "Hari Raya Natal",
+    "2025-12-26": "Cuti Bersama Natal",
+    "2025-12-31": "Libur Bursa Akhir Tahun",
+
+    # === 2026 ===
+    "2026-01-01": "Tahun Baru Masehi",
+    "2026-01-02": "Cuti Bersama Tahun Baru",
+    "2026-01-16": "Isra Mi'raj",
+    "2026-02-16": "Cuti Bersama Tahun Baru Imlek",
+    "2026-02-17": "Tahun Baru Imlek",
+    "2026-03-18": "Cuti Bersama Hari Suci Nyepi",
+    "2026-03-19": "Hari Suci Nyepi",
+    "2026-03-20": "Idul Fitri",
+    "2026-03-23": "Cuti Bersama Idul Fitri",
+    "2026-03-24": "Cuti Bersama Idul Fitri",
+    "2026-04-03": "Wafat Yesus Kristus",
+    "2026-05-01": "Hari Buruh",
+    "2026-05-14": "Kenaikan Yesus Kristus",
+    "2026-05-15": "Cuti Bersama Kenaikan Yesus Kristus",
+    "2026-05-27": "Idul Adha",
+    "2026-06-01": "Hari Lahir Pancasila",
+    "2026-06-16": "Tahun Baru Islam",
+    "2026-08-17": "HUT Kemerdekaan RI",
+    "2026-08-25": "Maulid Nabi Muhammad SAW",
+    "2026-12-24": "Cuti Bersama Natal",
+    "2026-12-25": "Hari Raya Natal",
+    "2026-12-31": "Libur Bursa Akhir Tahun",
+}
+
+
+def get_holiday_name(date_str: str) -> str:
+    """Return holiday name for a 'YYYY-MM-DD' date, or empty string"""
+    return IDX_HOLIDAYS.get(date_str, "")
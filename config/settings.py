@@ -10,6 +10,66 @@ import os
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "8421417558:AAGSldYyzkQ59uxpuPeGIaz8sW_GUtISSq8")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "-1003752913925")
 
+# Extra subscriber chats with their own filters (see config/subscriptions.example.json)
+# TELEGRAM_SUBSCRIPTIONS (JSON string) takes precedence over the file; without either,
+# all alerts go to TELEGRAM_CHAT_ID
+TELEGRAM_SUBSCRIPTIONS = os.getenv("TELEGRAM_SUBSCRIPTIONS", "")
+SUBSCRIPTIONS_FILE = os.getenv("SUBSCRIPTIONS_FILE", "config/subscriptions.json")
+
+# === TELEGRAM DELIVERY ===
+# Point at a local mock server for offline testing (python -m notifications.mock_telegram_server)
+TELEGRAM_API_BASE_URL = os.getenv("TELEGRAM_API_BASE_URL", "https://api.telegram.org")
+# Telegram limits: ~1 msg/sec per chat, 20 msgs/min per group, 30 msgs/sec overall
+TELEGRAM_GLOBAL_RATE_PER_SEC = 30
+TELEGRAM_CHAT_MIN_INTERVAL = 1.0  # Seconds between messages to the same chat
+TELEGRAM_GROUP_RATE_PER_MIN = 20  # Group/channel chats (negative chat id)
+TELEGRAM_TIMEOUT = 10  # HTTP timeout (seconds)
+TELEGRAM_MAX_ATTEMPTS = 5  # Give up on a message the API rejects (4xx other than 429) this many times
+TELEGRAM_RETRY_MAX_SECONDS = 60  # Backoff cap; other failures are retried until the end of the day
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096  # Longer messages are split between results
+
+# === TELEGRAM COMMANDS ===
+# /scan, /top and /signals answered from the latest scan (long polling, no webhook)
+TELEGRAM_COMMANDS_ENABLED = os.getenv("TELEGRAM_COMMANDS_ENABLED", "1") == "1"
+TELEGRAM_POLL_TIMEOUT = 25  # getUpdates long-poll timeout (seconds)
+TELEGRAM_COMMAND_CHATS = [c.strip() for c in os.getenv("TELEGRAM_COMMAND_CHATS", TELEGRAM_CHAT_ID).split(",") if c.strip()]  # Default: the alert chat only, "*" = any chat
+
+# === HTTP QUERY API ===
+# Read-only JSON over the latest scan results (served by the scheduler process)
+API_ENABLED = os.getenv("API_ENABLED", "1") == "1"
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("PORT", "8080"))  # Railway/Heroku style PORT
+API_MAX_LIMIT = 1000  # Max rows per response
+
+# === PROFILING ===
+# Profile one scan cycle: SCAN_PROFILE=sample|cprofile, `python main.py --profile`,
+# or create PROFILE_TRIGGER_FILE while the scheduler runs (profiles the next cycle)
+SCAN_PROFILE = os.getenv("SCAN_PROFILE", "")
+PROFILE_DIR = "logs/profiles"
+PROFILE_TRIGGER_FILE = "logs/profile.request"  # Optional content: sample | cprofile
+PROFILE_SAMPLE_INTERVAL = 0.005  # Sampling profiler interval (seconds)
+PROFILE_TOP_FUNCTIONS = 40  # Rows in the top-functions report
+PROFILE_TICKER_OUTLIERS = 20  # Slowest analyze_stock calls listed
+
+# === MEMORY ACCOUNTING ===
+# RSS is sampled every cycle; tracemalloc stage/site accounting is opt-in (slows scans ~2x)
+MEMORY_TRACKING = os.getenv("MEMORY_TRACKING", "0") == "1"
+MEMORY_TRACE_FRAMES = 1  # Traceback depth per allocation site
+MEMORY_TOP_SITES = 10  # Allocation sites listed in the report
+MEMORY_REPORT_FILE = "logs/memory_sites.txt"
+MEMORY_GROWTH_CYCLES = 10  # Alert when RSS grew in each of this many consecutive cycles
+MEMORY_GROWTH_MIN_MB = 20  # ... and by at least this much in total
+
+# === STARTUP ===
+# Scheduler cold start: imports -> ready (state, API, startup message) -> first scan
+IMPORT_TIME_BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", "2.0"))  # Warn above this (test_cold_start.py fails)
+
+# === ALERT COALESCING ===
+# New signals are buffered and sent as one digest when the window ends or the buffer is full
+ALERT_COALESCE_SECONDS = 120  # Upper bound on added alert latency (0 = send every scan)
+ALERT_COALESCE_MAX_SIGNALS = 30  # Flush early once this many signals are buffered
+SCHEDULER_TICK_SECONDS = 5  # Scheduler loop interval (also checks the coalescing window)
+
 # === SUPERTREND SETTINGS ===
 # Same as Pine Script v3
 SUPERTREND_PERIOD = 10
@@ -54,6 +114,7 @@ HOLD_THRESHOLD = 45
 SCAN_INTERVAL_MINUTES = 1  # Scan every 1 minute
 DATA_PERIOD = "120d"  # Historical data to fetch (need more for daily TF)
 DATA_INTERVAL = "1d"  # DAILY candlestick for ALL signals
+SCAN_CYCLE_BUDGET_SECONDS = SCAN_INTERVAL_MINUTES * 60  # A longer cycle counts as an overrun (/metrics)
 
 # === TRADING HOURS (WIB) ===
 TRADING_START_HOUR = 9
@@ -61,9 +122,45 @@ TRADING_START_MINUTE = 0
 TRADING_END_HOUR = 16
 TRADING_END_MINUTE = 0
 
+# === IDX SESSIONS (WIB) ===
+# Mon-Thu: Sesi 1 09:00-12:00, Sesi 2 13:30-16:00
+# Friday : Sesi 1 09:00-11:30, Sesi 2 14:00-16:00 (longer Friday break)
+SESSION_1_END_HOUR = 12
+SESSION_1_END_MINUTE = 0
+SESSION_2_START_HOUR = 13
+SESSION_2_START_MINUTE = 30
+FRIDAY_SESSION_1_END_HOUR = 11
+FRIDAY_SESSION_1_END_MINUTE = 30
+FRIDAY_SESSION_2_START_HOUR = 14
+FRIDAY_SESSION_2_START_MINUTE = 0
+
+# === FETCH CACHE ===
+LIVE_DATA_TTL_SECONDS = 50  # Max age of cached data while market is open
+BARS_FINAL_DELAY_MINUTES = 15  # Daily bar is final after closing auction + post-trading
+LIVE_BARS_PERIOD = "5d"  # Bars refetched when an entry expires (live bar + recent final ones)
+ADJUSTED_PRICE_TOLERANCE = 0.0005  # Relative difference of a final bar that means the history was re-adjusted (split/dividend)
+
+# === FRAME CACHE ===
+# In-process caches of fetched bars and indicator frames, LRU-evicted above a byte budget
+FRAME_CACHE_MAX_MB = int(os.getenv("FRAME_CACHE_MAX_MB", "128"))  # Fetched bars (fetch cache)
+INDICATOR_CACHE_MAX_MB = int(os.getenv("INDICATOR_CACHE_MAX_MB", "128"))  # Indicator frames, reused while bars are unchanged (0 = off)
+FRAME_CACHE_SPILL_DIR = os.getenv("FRAME_CACHE_SPILL_DIR", "")  # Evicted frames spill to mmap'd .npy files here ("" = drop them)
+FRAME_CACHE_SPILL_MAX_MB = int(os.getenv("FRAME_CACHE_SPILL_MAX_MB", "1024"))  # Disk budget of the spill directory
+
+# === WARM RESTART ===
+# The session store is saved every cycle; on restart the scheduler resumes from it
+# instead of a forced full scan. Changing any indicator setting above invalidates it.
+WARM_RESTART_ENABLED = os.getenv("WARM_RESTART_ENABLED", "1") == "1"
+SNAPSHOT_MAX_AGE_DAYS = 3  # Sessions older than this (before the last trading day) are not resumed
+
 # === LOGIC SETTINGS ===
 MIN_DAILY_TURNOVER = 5_000_000_000  # 5 Miliar (Billion) IDR
 
 # === FILE PATHS ===
-STATE_FILE = "database/stock_states.json"
+STATE_FILE = "database/stock_states.json"  # Legacy JSON, migrated into DB_FILE
+DB_FILE = "database/scanner.db"  # SQLite (WAL) state store
+JOURNAL_FILE = "database/state_journal.bin"  # Append-only state transition journal
+JOURNAL_RETENTION_DAYS = 30  # Older transitions are compacted into the snapshot
+JOURNAL_MAX_RECORDS = 200_000  # Force compaction above this size (~2 MB)
+HISTORY_DIR = "database/history"  # Per-session score/signal history (.npy per day)
 LOG_FILE = "logs/scanner.log"
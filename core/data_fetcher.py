@@ -1,15 +1,36 @@
 # ============================================
 # DATA FETCHER - YAHOO FINANCE
 # ============================================
+# yfinance (with curl_cffi and bs4) is imported on the first fetch: it is the
+# largest part of startup time and a warm restart may not fetch for a while.
 
-import yfinance as yf
+import numpy as np
 import pandas as pd
 from typing import Optional, List
 import time
 import logging
 
+from config.settings import LIVE_BARS_PERIOD, ADJUSTED_PRICE_TOLERANCE, FRAME_CACHE_MAX_MB
+from .frame_cache import FrameCache, MB
+from .market_calendar import get_cache_ttl
+from monitoring.metrics import timed, TICKERS
+
 logger = logging.getLogger(__name__)
 
+# Fetch cache: {(ticker, period, interval): DataFrame} within FRAME_CACHE_MAX_MB,
+# with expiry times kept apart. TTL comes from the market calendar, so data
+# fetched after the close stays valid until the next session instead of
+# being refetched every minute. Daily bars before the live one are final:
+# an expired entry keeps its history and only the latest bars are
+# revalidated (one batched request). Prices are split/dividend adjusted, so
+# a corporate action changes the whole history: when the refetched bars
+# disagree with the cached final ones, the ticker is fetched in full.
+_fetch_cache = FrameCache('fetch', FRAME_CACHE_MAX_MB * MB)
+_fetch_expiry = {}  # (ticker, period, interval) -> expires_at
+
+# Outcome counts of the last fetch_multiple_stocks call
+_last_fetch_stats = {}
+
 
 def fetch_stock_data(ticker: str, period: str = "60d", interval: str = "15m") -> Optional[pd.DataFrame]:
     """
@@ -24,6 +45,7 @@ def fetch_stock_data(ticker: str, period: str = "60d", interval: str = "15m") ->
         DataFrame with OHLCV data or None if error
     """
     try:
+        import yfinance as yf
         stock = yf.Ticker(ticker)
         df = stock.history(period=period, interval=interval)
         
@@ -51,8 +73,45 @@ def fetch_stock_data(ticker: str, period: str = "60d", interval: str = "15m") ->
         return None
 
 
+def get_cached_data(ticker: str, period: str, interval: str) -> Optional[pd.DataFrame]:
+    """Get cached data if still valid, None otherwise"""
+    key = (ticker, period, interval)
+    expires_at = _fetch_expiry.get(key)
+    if expires_at is None or time.time() >= expires_at:
+        return None
+    
+    return get_cached_history(ticker, period, interval)
+
+
+def get_cached_history(ticker: str, period: str, interval: str) -> Optional[pd.DataFrame]:
+    """Get cached data even if expired (its final bars are still valid)"""
+    key = (ticker, period, interval)
+    df = _fetch_cache.get(key)
+    if df is None:
+        _fetch_expiry.pop(key, None)  # Evicted
+    return df
+
+
+def set_cached_data(ticker: str, period: str, interval: str, df: pd.DataFrame, ttl: float):
+    """Store fetched data in the cache for ttl seconds"""
+    key = (ticker, period, interval)
+    _fetch_cache.put(key, df)
+    _fetch_expiry[key] = time.time() + ttl
+
+
+def clear_cache():
+    """Drop all cached data"""
+    _fetch_cache.clear()
+    _fetch_expiry.clear()
+
+
+def get_fetch_cache() -> FrameCache:
+    """The fetch cache (for stats)"""
+    return _fetch_cache
+
+
 def fetch_multiple_stocks(tickers: List[str], period: str = "60d", interval: str = "15m", 
-                          delay: float = 0.1) -> dict:
+                          delay: float = 0.1, use_cache: bool = True) -> dict:
     """
     Fetch data for multiple stocks with rate limiting
     
@@ -61,28 +120,227 @@ def fetch_multiple_stocks(tickers: List[str], period: str = "60d", interval: str
         period: Data period
         interval: Candlestick interval
         delay: Delay between requests (seconds)
+        use_cache: Serve still-valid data from the fetch cache and only
+            revalidate the latest bars of expired entries (daily data only)
     
     Returns:
         Dictionary of {ticker: DataFrame}
     """
+    global _last_fetch_stats
     results = {}
     total = len(tickers)
+    cached = 0
+    revalidated = 0
     
-    for i, ticker in enumerate(tickers):
+    # Intraday bars change within a session, only daily bars follow the calendar TTL
+    use_cache = use_cache and interval == "1d"
+    ttl = get_cache_ttl() if use_cache else 0
+    
+    to_fetch = []
+    stale = {}
+    for ticker in tickers:
+        if use_cache:
+            df = get_cached_data(ticker, period, interval)
+            if df is not None:
+                results[ticker] = df
+                cached += 1
+                continue
+            df = get_cached_history(ticker, period, interval)
+            if df is not None:
+                stale[ticker] = df
+                continue
+        to_fetch.append(ticker)
+    
+    if stale:
+        refreshed = revalidate_latest_bars(stale, interval)
+        for ticker, df in refreshed.items():
+            results[ticker] = df
+            set_cached_data(ticker, period, interval, df, ttl)
+        revalidated = len(refreshed)
+        to_fetch.extend(t for t in stale if t not in refreshed)  # Not in the batch: full fetch
+    
+    for i, ticker in enumerate(to_fetch):
         if (i + 1) % 50 == 0:
-            logger.info(f"Fetching progress: {i + 1}/{total}")
+            logger.info(f"Fetching progress: {i + 1}/{len(to_fetch)}")
         
-        df = fetch_stock_data(ticker, period, interval)
+        with timed('fetch'):
+            df = fetch_stock_data(ticker, period, interval)
         if df is not None and len(df) > 0:
             results[ticker] = df
+            if use_cache:
+                set_cached_data(ticker, period, interval, df, ttl)
         
         # Rate limiting
-        time.sleep(delay)
+        with timed('fetch_throttle'):
+            time.sleep(delay)
+    
+    fetched = len(results) - cached - revalidated
+    TICKERS.inc(fetched, outcome='fetched')
+    TICKERS.inc(total - len(results), outcome='failed')
+    TICKERS.inc(cached, outcome='cached')
+    TICKERS.inc(revalidated, outcome='revalidated')
+    _last_fetch_stats = {
+        'total': total, 'cached': cached, 'revalidated': revalidated, 'fetched': fetched,
+        'failed': total - len(results),
+        'hit_ratio': (cached + revalidated) / total if total else 0.0
+    }
+    logger.info(f"Successfully fetched {len(results)}/{total} stocks "
+                f"({cached} from cache, {revalidated} revalidated, {fetched} full fetches)")
+    return results
+
+
+def get_last_fetch_stats() -> dict:
+    """
+    Outcome counts of the last fetch_multiple_stocks call
+
+    Returns:
+        {'total', 'cached', 'revalidated', 'fetched', 'failed', 'hit_ratio'}; hit_ratio
+        is the share of tickers whose history came from the cache
+    """
+    return dict(_last_fetch_stats)
+
+
+def revalidate_latest_bars(cached: dict, interval: str = "1d") -> dict:
+    """
+    Bring cached histories up to date with one batched request for the latest bars
+
+    Args:
+        cached: Dictionary of {ticker: DataFrame} with final history
+        interval: Candlestick interval
+
+    Returns:
+        Dictionary of {ticker: DataFrame} for the tickers the batch returned and
+        whose cached history is still valid (the others need a full fetch)
+    """
+    latest_bars = fetch_latest_bars(list(cached.keys()), period=LIVE_BARS_PERIOD, interval=interval)
+    refreshed = {}
+    for ticker, latest in latest_bars.items():
+        df = cached.get(ticker)
+        if df is None:
+            continue
+        if not history_matches(df, latest):
+            logger.info(f"{ticker}: cached history differs from the latest bars (adjusted?), full fetch")
+            continue
+        merged = merge_latest_bars(df, latest)
+        # Same window length as a full fetch: a new session's bar drops the oldest
+        refreshed[ticker] = merged.iloc[-len(df):] if len(merged) > len(df) else merged
+    return refreshed
+
+
+def fetch_latest_bars(tickers: List[str], period: str = "5d", interval: str = "1d") -> dict:
+    """
+    Fetch only the most recent bars for many stocks in one batched request
+    
+    Used as a cheap delta refresh on top of already fetched history.
+    
+    Args:
+        tickers: List of stock tickers
+        period: Short data period covering the bars to refresh
+        interval: Candlestick interval
+    
+    Returns:
+        Dictionary of {ticker: DataFrame} with the latest bars
+    """
+    if not tickers:
+        return {}
+    
+    try:
+        import yfinance as yf
+        with timed('fetch'):
+            data = yf.download(tickers, period=period, interval=interval, group_by='ticker',
+                               threads=True, progress=False)
+    except Exception as e:
+        logger.error(f"Error fetching latest bars: {str(e)}")
+        return {}
+    
+    if data is None or data.empty:
+        logger.warning("No latest bars returned")
+        return {}
+    
+    results = {}
+    required_cols = ['open', 'high', 'low', 'close', 'volume']
+    
+    for ticker in tickers:
+        try:
+            if isinstance(data.columns, pd.MultiIndex):
+                if ticker not in data.columns.get_level_values(0):
+                    continue
+                df = data[ticker].copy()
+            else:
+                df = data.copy()
+            
+            df.columns = df.columns.str.lower()
+            if not all(col in df.columns for col in required_cols):
+                continue
+            
+            df = df[required_cols].dropna(subset=['close'])
+            if df.empty:
+                continue
+            
+            if df.index.tz is not None:
+                df.index = df.index.tz_localize(None)
+            
+            results[ticker] = df
+        except Exception as e:
+            logger.error(f"Error parsing latest bars for {ticker}: {str(e)}")
     
-    logger.info(f"Successfully fetched {len(results)}/{total} stocks")
+    logger.info(f"Fetched latest bars for {len(results)}/{len(tickers)} stocks")
     return results
 
 
+def history_matches(df: pd.DataFrame, latest: pd.DataFrame,
+                    tolerance: float = ADJUSTED_PRICE_TOLERANCE) -> bool:
+    """
+    Check that the cached final bars agree with the same days in the latest bars
+
+    The last cached bar may have been the live one and is not compared. A split
+    or dividend re-adjusts every earlier price, which shows up as a mismatch here.
+
+    Args:
+        df: Cached history
+        latest: Latest bars of the same ticker
+        tolerance: Relative price difference still treated as rounding
+
+    Returns:
+        True if at least one final bar overlaps and all overlapping prices match
+    """
+    if latest is None or latest.empty:
+        return True
+    
+    final = df.iloc[:-1]
+    overlap = final.index.intersection(latest.index)
+    if len(overlap) == 0:
+        return False  # Gap longer than the latest window: cannot merge either
+    
+    cols = ['open', 'high', 'low', 'close']
+    old = final.loc[overlap, cols].astype(float).values
+    new = latest.loc[overlap, cols].astype(float).values
+    return bool(np.allclose(old, new, rtol=tolerance, atol=0, equal_nan=True))
+
+
+def merge_latest_bars(df: pd.DataFrame, latest: pd.DataFrame) -> pd.DataFrame:
+    """Replace/append bars in df with the ones in latest (same index = replaced)"""
+    if latest is None or latest.empty:
+        return df
+    
+    kept = df[~df.index.isin(latest.index)]
+    return pd.concat([kept, latest]).sort_index()
+
+
+def bars_changed(old: pd.DataFrame, new: pd.DataFrame) -> bool:
+    """Check if the last OHLCV bar differs between two frames"""
+    if old is None or new is None or len(old) == 0 or len(new) == 0:
+        return True
+    
+    if old.index[-1] != new.index[-1]:
+        return True
+    
+    cols = ['open', 'high', 'low', 'close', 'volume']
+    old_bar = old[cols].iloc[-1].astype(float).values
+    new_bar = new[cols].iloc[-1].astype(float).values
+    return bool((old_bar != new_bar).any())
+
+
 def get_latest_data(df: pd.DataFrame) -> dict:
     """Get latest candle data as dictionary"""
     if df is None or len(df) == 0:
@@ -0,0 +1,103 @@
+# ============================================
+# DIFF ENGINE - COMPARE SCAN CYCLES
+# ============================================
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple
+
+from config.settings import MIN_DAILY_TURNOVER
+from .scanner import SIGNAL_COLUMNS
+from monitoring.metrics import timed
+
+
+class ScanDiff:
+    """Transitions between the previous and the current scan cycle"""
+    def __init__(self):
+        self.new_bullish = []      # Tickers that turned bullish
+        self.new_bearish = []      # Tickers that turned bearish
+        self.status_upgrades = []  # HOLD/ACCUMULATE -> STRONG BUY
+        self.new_signals = {}      # {signal_type: [tickers]} not yet alerted today
+        self.signal_counts = {}    # {signal_type: count} including already alerted
+        self.changes = []          # (ticker, is_bullish, status, score) that changed
+
+
+def states_to_table(states: Dict[str, dict]) -> pd.DataFrame:
+    """
+    Convert StateManager states to a table aligned like results_to_table
+
+    Returns:
+        DataFrame indexed by ticker with is_bullish, status, score
+    """
+    tickers = list(states.keys())
+    return pd.DataFrame({
+        'is_bullish': [states[t].get('is_bullish') for t in tickers],
+        'status': [states[t].get('status') for t in tickers],
+        'score': [states[t].get('score') for t in tickers]
+    }, index=pd.Index(tickers, name='ticker'))
+
+
+@timed('signal_filter')
+def diff_scan(current: pd.DataFrame, previous: pd.DataFrame,
+              alerted: Dict[str, set] = None) -> ScanDiff:
+    """
+    Diff current results against the previous cycle in one vectorized pass
+
+    Args:
+        current: Results table (results_to_table)
+        previous: Previous states table (states_to_table)
+        alerted: {signal_type: set(tickers)} already alerted today
+
+    Returns:
+        ScanDiff with transitions, new alert candidates and change log
+    """
+    diff = ScanDiff()
+    alerted = alerted or {}
+    tickers = current.index.to_numpy()
+
+    if len(current) == 0:
+        diff.new_signals = {signal_type: [] for signal_type in SIGNAL_COLUMNS}
+        diff.signal_counts = {signal_type: 0 for signal_type in SIGNAL_COLUMNS}
+        return diff
+
+    # Align previous cycle to current rows (unknown tickers -> missing)
+    prev = previous.reindex(current.index)
+    prev_known = prev['is_bullish'].notna().to_numpy()
+    prev_bullish = prev['is_bullish'].fillna(False).astype(bool).to_numpy()
+    prev_status = prev['status'].fillna('').astype(str).to_numpy()
+    prev_score = pd.to_numeric(prev['score'], errors='coerce').to_numpy()
+
+    cur_bullish = current['is_bullish'].to_numpy(dtype=bool)
+    cur_status = current['status'].astype(str).to_numpy()
+    cur_score = current['score'].to_numpy(dtype=float)
+
+    # State transitions (first sighting never counts as a transition)
+    diff.new_bullish = tickers[prev_known & cur_bullish & ~prev_bullish].tolist()
+    diff.new_bearish = tickers[prev_known & ~cur_bullish & prev_bullish].tolist()
+    upgrade = (cur_status == "STRONG BUY") & np.isin(prev_status, ["HOLD", "ACCUMULATE"])
+    diff.status_upgrades = tickers[upgrade].tolist()
+
+    # Newly alerting tickers per signal type (liquid, flagged, not alerted today)
+    liquid = current['avg_turnover_5d'].to_numpy(dtype=float) >= MIN_DAILY_TURNOVER
+    for signal_type, column in SIGNAL_COLUMNS.items():
+        flagged = liquid & current[column].to_numpy(dtype=bool)
+        diff.signal_counts[signal_type] = int(flagged.sum())
+        already = alerted.get(signal_type)
+        if already:
+            flagged &= ~np.isin(tickers, list(already))
+        diff.new_signals[signal_type] = tickers[flagged].tolist()
+
+    # Compact change log for the state journal
+    changed = (~prev_known
+               | (cur_bullish != prev_bullish)
+               | (cur_status != prev_status)
+               | (cur_score != prev_score))
+    idx = np.flatnonzero(changed)
+    diff.changes = list(zip(
+        tickers[idx].tolist(),
+        cur_bullish[idx].tolist(),
+        cur_status[idx].tolist(),
+        cur_score[idx].astype(int).tolist()
+    ))
+
+    return diff
@@ -0,0 +1,256 @@
+# ============================================
+# FRAME CACHE - BYTE-BUDGETED LRU FOR DATAFRAMES AND ARRAYS
+# ============================================
+# Entries are accounted by their in-memory size (DataFrame.memory_usage,
+# ndarray.nbytes); above the budget the least recently used ones are
+# evicted. With a spill directory, evicted numeric frames/arrays are written
+# to .npy files and read back memory-mapped on the next get, which moves
+# them into memory again. Stats per cache are exported on /metrics.
+
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import logging
+
+import numpy as np
+import pandas as pd
+
+from config.settings import FRAME_CACHE_SPILL_DIR, FRAME_CACHE_SPILL_MAX_MB
+from monitoring.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+CACHE_BYTES = registry.gauge("scanner_frame_cache_bytes", "Bytes held in memory per frame cache", ['cache'])
+CACHE_SPILL_BYTES = registry.gauge("scanner_frame_cache_spill_bytes", "Bytes spilled to disk per frame cache", ['cache'])
+CACHE_ENTRIES = registry.gauge("scanner_frame_cache_entries", "Entries held in memory per frame cache", ['cache'])
+CACHE_REQUESTS = registry.counter(
+    "scanner_frame_cache_requests_total", "Frame cache lookups per outcome (hit, spill_hit, miss)", ['cache', 'outcome'])
+CACHE_EVICTIONS = registry.counter(
+    "scanner_frame_cache_evictions_total", "Entries evicted from memory per outcome (spilled, dropped)", ['cache', 'outcome'])
+
+
+def frame_nbytes(value: Any) -> int:
+    """In-memory size of a DataFrame, Series or array (bytes)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+
+def _to_records(df: pd.DataFrame) -> Optional[np.ndarray]:
+    """DataFrame as one structured array (index first), None if not spillable"""
+    if df.columns.has_duplicates or isinstance(df.index, pd.MultiIndex):
+        return None
+    columns = [('__index__', df.index.to_numpy())] + [(str(c), df[c].to_numpy()) for c in df.columns]
+    if any(values.dtype.hasobject for _, values in columns):
+        return None
+    records = np.empty(len(df), dtype=[(name, values.dtype) for name, values in columns])
+    for name, values in columns:
+        records[name] = values
+    return records
+
+
+class FrameCache:
+    """
+    LRU cache of DataFrames / arrays bounded by their total size in bytes
+
+    Thread-safe; values are returned as stored, callers must not modify them.
+    """
+
+    def __init__(self, name: str, max_bytes: int, spill_dir: str = FRAME_CACHE_SPILL_DIR,
+                 spill_max_bytes: int = FRAME_CACHE_SPILL_MAX_MB * MB):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.spill_max_bytes = spill_max_bytes
+        self.spill_dir = os.path.join(spill_dir, name) if spill_dir else None
+        self.bytes = 0
+        self.spill_bytes = 0
+        self.hits = 0
+        self.spill_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.spills = 0
+        self._entries = OrderedDict()  # key -> (value, nbytes), oldest first
+        self._spilled = OrderedDict()  # key -> (path, nbytes, meta)
+        self._lock = threading.RLock()
+        if self.spill_dir:
+            self._reset_spill_dir()
+
+    def _reset_spill_dir(self):
+        """Spill files of an earlier process are not indexed: remove them"""
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            for filename in os.listdir(self.spill_dir):
+                if filename.endswith(".npy"):
+                    os.remove(os.path.join(self.spill_dir, filename))
+        except OSError as e:
+            logger.error(f"Error preparing spill directory {self.spill_dir}: {str(e)}")
+            self.spill_dir = None
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._spilled)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries or key in self._spilled
+
+    def get(self, key: Hashable, default=None):
+        """Get a value (most recently used from now on), default if absent"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                CACHE_REQUESTS.inc(cache=self.name, outcome='hit')
+                return entry[0]
+
+            value = self._restore(key) if key in self._spilled else None
+            if value is None:
+                self.misses += 1
+                CACHE_REQUESTS.inc(cache=self.name, outcome='miss')
+                return default
+
+            self.spill_hits += 1
+            CACHE_REQUESTS.inc(cache=self.name, outcome='spill_hit')
+            self._insert(key, value, frame_nbytes(value))
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting least recently used entries above the budget"""
+        nbytes = frame_nbytes(value)
+        with self._lock:
+            self._discard(key)
+            if nbytes > self.max_bytes:
+                return  # Larger than the whole budget (or cache off)
+            self._insert(key, value, nbytes)
+
+    def pop(self, key: Hashable):
+        """Remove an entry (memory or spill)"""
+        with self._lock:
+            self._discard(key)
+            self._publish()
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            for key in list(self._spilled):
+                self._drop_spilled(key)
+            self._entries.clear()
+            self.bytes = 0
+            self._publish()
+
+    def resize(self, max_bytes: int):
+        """Change the memory budget (evicts down to it)"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+            self._publish()
+
+    def stats(self) -> dict:
+        """Sizes and counters of this cache"""
+        with self._lock:
+            lookups = self.hits + self.spill_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'spilled_entries': len(self._spilled),
+                'spill_bytes': self.spill_bytes,
+                'hits': self.hits,
+                'spill_hits': self.spill_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'spills': self.spills,
+                'hit_ratio': (self.hits + self.spill_hits) / lookups if lookups else 0.0
+            }
+
+    # ============================================
+    # INTERNALS (lock held)
+    # ============================================
+
+    def _insert(self, key, value, nbytes: int):
+        self._entries[key] = (value, nbytes)
+        self.bytes += nbytes
+        self._evict()
+        self._publish()
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+        if key in self._spilled:
+            self._drop_spilled(key)
+
+    def _evict(self):
+        while self.bytes > self.max_bytes and self._entries:
+            key, (value, nbytes) = self._entries.popitem(last=False)
+            self.bytes -= nbytes
+            self.evictions += 1
+            spilled = self.spill_dir is not None and self._spill(key, value)
+            CACHE_EVICTIONS.inc(cache=self.name, outcome='spilled' if spilled else 'dropped')
+
+    def _spill(self, key, value) -> bool:
+        """Write an evicted value to a .npy file; False if it cannot be spilled (or is over the disk budget)"""
+        if isinstance(value, pd.DataFrame):
+            records = _to_records(value)
+            meta = ('frame', list(value.columns), value.index.name)
+        elif isinstance(value, np.ndarray) and not value.dtype.hasobject:
+            records = value
+            meta = ('array', None, None)
+        else:
+            records = None
+        if records is None or records.nbytes > self.spill_max_bytes:
+            return False
+
+        # Make room first (oldest spill files go), so the new entry always survives
+        while self._spilled and self.spill_bytes + records.nbytes > self.spill_max_bytes:
+            self._drop_spilled(next(iter(self._spilled)))
+
+        path = os.path.join(self.spill_dir, hashlib.sha1(repr(key).encode()).hexdigest() + ".npy")
+        try:
+            np.save(path, records, allow_pickle=False)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error spilling {key} from {self.name} cache: {str(e)}")
+            return False
+
+        self._spilled[key] = (path, records.nbytes, meta)
+        self.spill_bytes += records.nbytes
+        self.spills += 1
+        return True
+
+    def _restore(self, key):
+        """Read a spilled value back (memory-mapped, then copied into memory)"""
+        path, _, (kind, columns, index_name) = self._spilled[key]
+        try:
+            records = np.load(path, mmap_mode='r', allow_pickle=False)
+            if kind == 'array':
+                value = np.array(records)
+            else:
+                value = pd.DataFrame({column: np.array(records[str(column)]) for column in columns},
+                                     index=pd.Index(np.array(records['__index__']), name=index_name))
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading spilled {key} from {self.name} cache: {str(e)}")
+            value = None
+        records = None  # Close the map before the file is removed
+        self._drop_spilled(key)
+        return value
+
+    def _drop_spilled(self, key):
+        path, nbytes, _ = self._spilled.pop(key)
+        self.spill_bytes -= nbytes
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _publish(self):
+        CACHE_BYTES.set(self.bytes, cache=self.name)
+        CACHE_SPILL_BYTES.set(self.spill_bytes, cache=self.name)
+        CACHE_ENTRIES.set(len(self._entries), cache=self.name)
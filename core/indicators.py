@@ -7,10 +7,11 @@ import pandas as pd
 import numpy as np
 from typing import Tuple, Dict
 
-# Import settings
-import sys
-sys.path.append('..')
-from config.settings import *
+from config.settings import (
+    EMA_FAST, EMA_MEDIUM, EMA_SLOW, VOLUME_PERIOD, VOLUME_SPIKE_THRESHOLD, UNUSUAL_VOLUME_THRESHOLD,
+    RSI_PERIOD, STOCH_PERIOD, SMOOTH_K, SMOOTH_D, STOCH_OVERBOUGHT, STOCH_OVERSOLD,
+    ATR_PERIOD, ADX_PERIOD, ADX_THRESHOLD, FIB_LEVEL_1, FIB_LEVEL_2, DCA_LOOKBACK, DCA_VOLUME_THRESHOLD
+)
 
 
 def calculate_ema(series: pd.Series, period: int) -> pd.Series:
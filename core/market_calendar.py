@@ -0,0 +1,193 @@
+# ============================================
+# MARKET CALENDAR - IDX SESSIONS & HOLIDAYS
+# ============================================
+
+from datetime import datetime, date, time, timedelta
+from typing import List, Optional, Tuple
+import pytz
+
+from config.settings import (
+    TRADING_START_HOUR, TRADING_START_MINUTE, TRADING_END_HOUR, TRADING_END_MINUTE,
+    SESSION_1_END_HOUR, SESSION_1_END_MINUTE, SESSION_2_START_HOUR, SESSION_2_START_MINUTE,
+    FRIDAY_SESSION_1_END_HOUR, FRIDAY_SESSION_1_END_MINUTE,
+    FRIDAY_SESSION_2_START_HOUR, FRIDAY_SESSION_2_START_MINUTE,
+    LIVE_DATA_TTL_SECONDS, BARS_FINAL_DELAY_MINUTES
+)
+from config.market_holidays import IDX_HOLIDAYS
+
+# Timezone
+WIB = pytz.timezone('Asia/Jakarta')
+
+# Market phases
+PHASE_CLOSED = "CLOSED"          # Weekend or holiday
+PHASE_PRE_OPEN = "PRE_OPEN"      # Trading day, before Sesi 1
+PHASE_SESSION_1 = "SESSION_1"
+PHASE_BREAK = "BREAK"            # Istirahat siang
+PHASE_SESSION_2 = "SESSION_2"
+PHASE_POST_CLOSE = "POST_CLOSE"  # Trading day, after Sesi 2
+
+
+def now_wib() -> datetime:
+    """Get current time in WIB"""
+    return datetime.now(WIB)
+
+
+def _to_wib(now: Optional[datetime]) -> datetime:
+    """Normalize a datetime to WIB (naive datetimes are assumed WIB)"""
+    if now is None:
+        return now_wib()
+    if now.tzinfo is None:
+        return WIB.localize(now)
+    return now.astimezone(WIB)
+
+
+def is_holiday(day: date) -> bool:
+    """Check if date is an IDX holiday (weekday closure)"""
+    return day.strftime('%Y-%m-%d') in IDX_HOLIDAYS
+
+
+def is_trading_day(day: date) -> bool:
+    """Check if IDX is open on this date"""
+    return day.weekday() < 5 and not is_holiday(day)
+
+
+def get_sessions(day: date) -> List[Tuple[time, time]]:
+    """
+    Get trading sessions for a date
+
+    Returns:
+        List of (start, end) times in WIB, empty on non-trading days
+    """
+    if not is_trading_day(day):
+        return []
+
+    if day.weekday() == 4:  # Friday - longer break for Jumat prayer
+        session_1_end = time(FRIDAY_SESSION_1_END_HOUR, FRIDAY_SESSION_1_END_MINUTE)
+        session_2_start = time(FRIDAY_SESSION_2_START_HOUR, FRIDAY_SESSION_2_START_MINUTE)
+    else:
+        session_1_end = time(SESSION_1_END_HOUR, SESSION_1_END_MINUTE)
+        session_2_start = time(SESSION_2_START_HOUR, SESSION_2_START_MINUTE)
+
+    return [
+        (time(TRADING_START_HOUR, TRADING_START_MINUTE), session_1_end),
+        (session_2_start, time(TRADING_END_HOUR, TRADING_END_MINUTE))
+    ]
+
+
+def get_market_phase(now: Optional[datetime] = None) -> str:
+    """
+    Get current market phase
+
+    Session boundaries are inclusive (e.g. 12:00 and 16:00 still count as
+    in-session) so the last minute of each session is scanned.
+    """
+    now = _to_wib(now)
+    sessions = get_sessions(now.date())
+
+    if not sessions:
+        return PHASE_CLOSED
+
+    (s1_start, s1_end), (s2_start, s2_end) = sessions
+    current = now.time().replace(second=0, microsecond=0)
+
+    if current < s1_start:
+        return PHASE_PRE_OPEN
+    if current <= s1_end:
+        return PHASE_SESSION_1
+    if current < s2_start:
+        return PHASE_BREAK
+    if current <= s2_end:
+        return PHASE_SESSION_2
+    return PHASE_POST_CLOSE
+
+
+def is_market_open(now: Optional[datetime] = None) -> bool:
+    """Check if a trading session is running"""
+    return get_market_phase(now) in (PHASE_SESSION_1, PHASE_SESSION_2)
+
+
+def _at(day: date, t: time) -> datetime:
+    """Build a WIB datetime for a date and time"""
+    return WIB.localize(datetime.combine(day, t))
+
+
+def get_close_time(day: date) -> Optional[datetime]:
+    """Get session close time for a date, None on non-trading days"""
+    sessions = get_sessions(day)
+    if not sessions:
+        return None
+    return _at(day, sessions[-1][1])
+
+
+def last_trading_day(now: Optional[datetime] = None) -> date:
+    """Get the most recent trading day (today if IDX trades today)"""
+    day = _to_wib(now).date()
+    while not is_trading_day(day):
+        day -= timedelta(days=1)
+    return day
+
+
+def next_session_open(now: Optional[datetime] = None) -> datetime:
+    """Get the next session start strictly after now (Sesi 1 or Sesi 2)"""
+    now = _to_wib(now)
+    day = now.date()
+
+    for _ in range(30):  # Longest IDX closure (Lebaran) is well below this
+        for start, _end in get_sessions(day):
+            start_dt = _at(day, start)
+            if start_dt > now:
+                return start_dt
+        day += timedelta(days=1)
+
+    raise ValueError(f"No IDX session found within 30 days of {now.date()}")
+
+
+def are_daily_bars_final(now: Optional[datetime] = None) -> bool:
+    """
+    Check if the latest daily bar is final (will not change anymore)
+
+    True before the open (yesterday's bar is final, today's does not exist),
+    after close + settlement delay, and on non-trading days.
+    """
+    now = _to_wib(now)
+    phase = get_market_phase(now)
+
+    if phase in (PHASE_CLOSED, PHASE_PRE_OPEN):
+        return True
+    if phase == PHASE_POST_CLOSE:
+        close_time = get_close_time(now.date())
+        return now >= close_time + timedelta(minutes=BARS_FINAL_DELAY_MINUTES)
+    return False
+
+
+def next_data_change(now: Optional[datetime] = None) -> datetime:
+    """
+    Get the earliest time at which daily bars can change again
+
+    While a session runs this is now; during the break it is the Sesi 2
+    open; right after the close it is when the bar becomes final.
+    """
+    now = _to_wib(now)
+    phase = get_market_phase(now)
+
+    if phase in (PHASE_SESSION_1, PHASE_SESSION_2):
+        return now
+    if phase == PHASE_POST_CLOSE and not are_daily_bars_final(now):
+        close_time = get_close_time(now.date())
+        return close_time + timedelta(minutes=BARS_FINAL_DELAY_MINUTES)
+    return next_session_open(now)
+
+
+def get_cache_ttl(now: Optional[datetime] = None) -> float:
+    """
+    Get how long fetched daily data stays valid (seconds)
+
+    Short TTL while trading, otherwise valid until the data can change.
+    """
+    now = _to_wib(now)
+    change_at = next_data_change(now)
+
+    if change_at <= now:
+        return float(LIVE_DATA_TTL_SECONDS)
+
+    return (change_at - now).total_seconds()
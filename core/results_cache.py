@@ -0,0 +1,140 @@
+# ============================================
+# RESULTS CACHE - LATEST SCAN CYCLE IN MEMORY
+# ============================================
+
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+
+import pandas as pd
+import pytz
+
+from config.settings import DATA_PERIOD, DATA_INTERVAL, MIN_DAILY_TURNOVER
+from config.stocks_list import get_all_stocks
+from .scanner import ScanResult, analyze_stock, results_to_table, SIGNAL_COLUMNS, RESULT_COLUMNS
+from .data_fetcher import fetch_multiple_stocks
+from .market_calendar import get_cache_ttl
+
+logger = logging.getLogger(__name__)
+
+# Timezone
+WIB = pytz.timezone('Asia/Jakarta')
+
+
+class ResultsCache:
+    """
+    Latest scan cycle (results and table) for on-demand queries
+
+    The scanner publishes each cycle with update(); readers (command bot,
+    HTTP API) get the published objects without recomputing anything.
+    A universe ticker missing from the latest cycle (e.g. its fetch failed)
+    is analyzed once on demand and kept until its data can change; tickers
+    outside the universe are never fetched.
+    """
+
+    def __init__(self, universe: List[str] = None):
+        self._lock = threading.RLock()
+        self.universe = set(universe if universe is not None else get_all_stocks())
+        self.results = {}
+        self.table = pd.DataFrame(columns=RESULT_COLUMNS)
+        self.cycle_id = 0
+        self.updated_at = None
+        self._on_demand = {}  # ticker -> (expires_at, ScanResult)
+        self._analyze_locks = {}
+
+    def update(self, results: Dict[str, ScanResult], table: pd.DataFrame = None) -> int:
+        """
+        Publish a new scan cycle
+
+        Returns:
+            New cycle id
+        """
+        table = table if table is not None else results_to_table(results)
+        with self._lock:
+            self.results = results
+            self.table = table
+            self.cycle_id += 1
+            self.updated_at = datetime.now(WIB)
+            self._on_demand = {t: entry for t, entry in self._on_demand.items() if t not in results}
+            return self.cycle_id
+
+    def snapshot(self):
+        """Get (cycle_id, updated_at, table) of the latest cycle"""
+        with self._lock:
+            return self.cycle_id, self.updated_at, self.table
+
+    def get(self, ticker: str) -> Optional[ScanResult]:
+        """Get a ticker's latest result without computing anything"""
+        with self._lock:
+            result = self.results.get(ticker)
+            if result is not None:
+                return result
+            entry = self._on_demand.get(ticker)
+            if entry is not None and entry[0] > time.time():
+                return entry[1]
+            return None
+
+    def get_or_analyze(self, ticker: str) -> Optional[ScanResult]:
+        """
+        Get a ticker's result; on a miss fetch and analyze only that ticker
+
+        Returns:
+            ScanResult, or None if the ticker is not in the universe or no
+            data could be fetched
+        """
+        result = self.get(ticker)
+        if result is not None or ticker not in self.universe:
+            return result
+
+        with self._lock:
+            lock = self._analyze_locks.setdefault(ticker, threading.Lock())
+
+        with lock:  # Concurrent requests for one ticker analyze it once
+            try:
+                result = self.get(ticker)
+                if result is not None:
+                    return result
+
+                logger.info(f"Results cache miss for {ticker}, analyzing on demand")
+                data = fetch_multiple_stocks([ticker], period=DATA_PERIOD, interval=DATA_INTERVAL, delay=0)
+                df = data.get(ticker)
+                if df is None:
+                    return None
+
+                result = analyze_stock(ticker, df)
+                with self._lock:
+                    self._on_demand[ticker] = (time.time() + get_cache_ttl(), result)
+                return result
+            finally:
+                with self._lock:
+                    if self._analyze_locks.get(ticker) is lock:
+                        del self._analyze_locks[ticker]
+
+    def top(self, n: int = 10) -> List[ScanResult]:
+        """Highest scoring results of the latest cycle"""
+        with self._lock:
+            table, results = self.table, self.results
+        if len(table) == 0:
+            return []
+        return [results[t] for t in table['score'].nlargest(n).index]
+
+    def signals(self, signal_type: str) -> List[ScanResult]:
+        """Liquid results flagged with a signal type in the latest cycle"""
+        column = SIGNAL_COLUMNS.get(signal_type)
+        with self._lock:
+            table, results = self.table, self.results
+        if column is None or len(table) == 0:
+            return []
+        mask = table[column].to_numpy(dtype=bool) & (table['avg_turnover_5d'].to_numpy(dtype=float) >= MIN_DAILY_TURNOVER)
+        return [results[t] for t in table.index[mask]]
+
+
+# Module-level cache shared by scanner, command bot and API
+_cache = ResultsCache()
+
+
+def get_results_cache() -> ResultsCache:
+    """Get the shared results cache"""
+    return _cache
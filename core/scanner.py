@@ -2,17 +2,28 @@
 # SCANNER - MAIN SCANNING LOGIC
 # ============================================
 
+import hashlib
+import time
 import pandas as pd
 from typing import Dict, List, Tuple
 import logging
 
-from config.settings import MIN_DAILY_TURNOVER
+from config.settings import MIN_DAILY_TURNOVER, INDICATOR_CACHE_MAX_MB
 from .supertrend import calculate_supertrend, is_bullish, just_turned_bullish, just_turned_bearish
 from .indicators import calculate_all_indicators
 from .scoring import calculate_total_score
+from .frame_cache import FrameCache, MB
+from monitoring.metrics import timed
+from monitoring.profiler import get_ticker_timings
 
 logger = logging.getLogger(__name__)
 
+# Indicator frames per ticker, reused while its bars are unchanged
+_indicator_cache = FrameCache('indicators', INDICATOR_CACHE_MAX_MB * MB)
+_indicator_fingerprints = {}  # ticker -> bars_fingerprint of the cached frame
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
 
 class ScanResult:
     """Container for scan results"""
@@ -44,6 +55,24 @@ class ScanResult:
         self.avg_turnover_5d = 0.0
 
 
+# Columns of the results table (one row per ticker, see results_to_table)
+RESULT_COLUMNS = [
+    'price', 'change_percent', 'supertrend_value', 'is_bullish', 'score', 'status', 'status_emoji',
+    'bullish_break', 'bearish_break', 'is_stoch_crossover', 'stoch_k', 'stoch_d',
+    'is_accumulation', 'is_early_entry', 'correction_percent', 'early_entry_strength',
+    'volume_ratio', 'daily_turnover', 'avg_turnover_5d'
+]
+
+# Signal type -> results table column
+SIGNAL_COLUMNS = {
+    'bullish_break': 'bullish_break',
+    'bearish_break': 'bearish_break',
+    'stoch_crossover': 'is_stoch_crossover',
+    'accumulation': 'is_accumulation',
+    'early_entry': 'is_early_entry'
+}
+
+
 def analyze_stock(ticker: str, df: pd.DataFrame, previous_state: dict = None) -> ScanResult:
     """
     Analyze a single stock and detect signals
@@ -64,10 +93,11 @@ def analyze_stock(ticker: str, df: pd.DataFrame, previous_state: dict = None) ->
     try:
         # Calculate turnover (Price * Volume)
         # Use 5-day average turnover to filter liquid stocks
-        df['turnover'] = df['close'] * df['volume']
-        avg_turnover_5d = df['turnover'].rolling(window=5).mean().iloc[-1]
+        # (not added to df: the fetch cache owns it)
+        turnover = df['close'] * df['volume']
+        avg_turnover_5d = turnover.rolling(window=5).mean().iloc[-1]
         
-        result.daily_turnover = df['turnover'].iloc[-1]
+        result.daily_turnover = turnover.iloc[-1]
         result.avg_turnover_5d = avg_turnover_5d
         
         # Filter by liquidity
@@ -77,8 +107,8 @@ def analyze_stock(ticker: str, df: pd.DataFrame, previous_state: dict = None) ->
             pass
             
         # Calculate all indicators
-        df = calculate_supertrend(df)
-        df = calculate_all_indicators(df)
+        with timed('indicators'):
+            df = compute_indicators(ticker, df)
         
         latest = df.iloc[-1]
         
@@ -208,6 +238,37 @@ def analyze_stock(ticker: str, df: pd.DataFrame, previous_state: dict = None) ->
     return result
 
 
+def bars_fingerprint(df: pd.DataFrame) -> str:
+    """Hash of the OHLCV bars and their dates"""
+    digest = hashlib.sha1(df.index.values.tobytes())
+    digest.update(df[OHLCV_COLUMNS].to_numpy(dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+def compute_indicators(ticker: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Supertrend plus all indicators, from the indicator cache if the bars are unchanged
+    
+    Returns:
+        Indicator frame (shared with the cache: do not modify)
+    """
+    fingerprint = bars_fingerprint(df)
+    if _indicator_fingerprints.get(ticker) == fingerprint:
+        cached = _indicator_cache.get(ticker)
+        if cached is not None:
+            return cached
+    
+    df = calculate_all_indicators(calculate_supertrend(df))
+    _indicator_cache.put(ticker, df)
+    _indicator_fingerprints[ticker] = fingerprint
+    return df
+
+
+def get_indicator_cache() -> FrameCache:
+    """The indicator frame cache (for stats or resizing)"""
+    return _indicator_cache
+
+
 def scan_all_stocks(stock_data: Dict[str, pd.DataFrame], previous_states: dict = None) -> Dict[str, ScanResult]:
     """
     Scan all stocks and return results
@@ -221,15 +282,35 @@ def scan_all_stocks(stock_data: Dict[str, pd.DataFrame], previous_states: dict =
     """
     results = {}
     previous_states = previous_states or {}
+    timings = get_ticker_timings()  # Only while a cycle is profiled
     
     for ticker, df in stock_data.items():
         prev_state = previous_states.get(ticker, {})
+        started = time.perf_counter()
         result = analyze_stock(ticker, df, prev_state)
         results[ticker] = result
+        if timings is not None:
+            timings[ticker] = (time.perf_counter() - started, 0 if df is None else len(df))
     
     return results
 
 
+def results_to_table(results: Dict[str, ScanResult]) -> pd.DataFrame:
+    """
+    Convert scan results to a columnar table
+    
+    Returns:
+        DataFrame indexed by ticker with RESULT_COLUMNS
+    """
+    data = {col: [getattr(r, col) for r in results.values()] for col in RESULT_COLUMNS}
+    table = pd.DataFrame(data, index=pd.Index(list(results.keys()), name='ticker'))
+    
+    bool_cols = ['is_bullish', 'bullish_break', 'bearish_break', 'is_stoch_crossover',
+                 'is_accumulation', 'is_early_entry']
+    table[bool_cols] = table[bool_cols].astype(bool)
+    return table
+
+
 def filter_signals(results: Dict[str, ScanResult]) -> Dict[str, List[ScanResult]]:
     """
     Filter and categorize signals
@@ -7,9 +7,8 @@ import pandas as pd
 import numpy as np
 from typing import Tuple
 
-import sys
-sys.path.append('..')
-from config.settings import *
+from config.settings import BUY_THRESHOLD, ACCUMULATE_THRESHOLD, HOLD_THRESHOLD
+from monitoring.metrics import timed
 
 
 def calculate_trend_score(df: pd.DataFrame) -> float:
@@ -129,6 +128,7 @@ def calculate_position_score(df: pd.DataFrame) -> float:
     return min(score, 18.0)
 
 
+@timed('scoring')
 def calculate_total_score(df: pd.DataFrame) -> Tuple[int, str, str]:
     """
     Calculate total score and determine status
@@ -0,0 +1,294 @@
+# ============================================
+# SYNTHETIC MARKET - SEEDED IDX-LIKE DAILY OHLCV
+# ============================================
+# Deterministic test/benchmark data in the shape fetch_multiple_stocks
+# returns: {ticker: DataFrame[open, high, low, close, volume]}.
+#
+#   market = SyntheticMarket(tickers=10_000, bars=250, seed=7)
+#   data = market.generate()
+#   market.planted  -> {'bullish_break': [...], 'accumulation': [...], ...}
+
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+import logging
+
+import numpy as np
+import pandas as pd
+
+from config.settings import VOLUME_PERIOD, DCA_VOLUME_THRESHOLD, ADX_THRESHOLD
+from .market_calendar import is_trading_day, last_trading_day
+from .supertrend import calculate_supertrend
+from .indicators import calculate_atr, calculate_adx
+
+logger = logging.getLogger(__name__)
+
+# IDX price fractions (tick size per price band)
+TICK_BANDS = [(200, 1), (500, 2), (2000, 5), (5000, 10), (float('inf'), 25)]
+
+# IDX auto-rejection limits per price band (max daily move)
+ARA_BANDS = [(200, 0.35), (5000, 0.25), (float('inf'), 0.20)]
+
+MIN_PRICE = 50  # Papan utama/pengembangan floor
+LOT_SIZE = 100  # Shares per lot
+
+# Regimes: (daily drift, daily volatility, mean bars before switching)
+REGIMES = {
+    'uptrend': (0.004, 0.018, 30),
+    'downtrend': (-0.004, 0.020, 25),
+    'range': (0.0, 0.012, 35),
+}
+
+# Lead-in of planted scenarios (last ~40 bars): clean, low-noise trend (drift, volatility)
+LEAD_IN = {
+    'bullish_break': (-0.006, 0.010),
+    'bearish_break': (0.006, 0.010),
+    'accumulation': (0.006, 0.010),
+    'early_entry': (0.006, 0.012),
+}
+
+# Scenarios planted on the last bar (probability per ticker)
+DEFAULT_PLANT_RATES = {
+    'bullish_break': 0.02,
+    'bearish_break': 0.02,
+    'accumulation': 0.03,
+    'early_entry': 0.04,  # About half pass the preconditions
+}
+
+
+def tick_size(price: np.ndarray) -> np.ndarray:
+    """IDX tick size for each price"""
+    price = np.asarray(price, dtype=float)
+    ticks = np.empty_like(price)
+    lower = -np.inf
+    for upper, tick in TICK_BANDS:
+        ticks[(price >= lower) & (price < upper)] = tick
+        lower = upper
+    return ticks
+
+
+def round_to_tick(price: np.ndarray) -> np.ndarray:
+    """Round prices to the IDX tick grid (never below MIN_PRICE)"""
+    price = np.maximum(np.asarray(price, dtype=float), MIN_PRICE)
+    ticks = tick_size(price)
+    return np.maximum(np.round(price / ticks) * ticks, MIN_PRICE)
+
+
+def auto_rejection_limit(price: np.ndarray) -> np.ndarray:
+    """Max daily move (fraction) for each reference price"""
+    price = np.asarray(price, dtype=float)
+    limits = np.empty_like(price)
+    lower = -np.inf
+    for upper, limit in ARA_BANDS:
+        limits[(price >= lower) & (price < upper)] = limit
+        lower = upper
+    return limits
+
+
+def trading_days(count: int, end: date = None) -> pd.DatetimeIndex:
+    """Last count IDX trading days up to end (weekends and holidays skipped)"""
+    day = end or last_trading_day()
+    days = []
+    while len(days) < count:
+        if is_trading_day(day):
+            days.append(day)
+        day -= timedelta(days=1)
+    return pd.to_datetime(list(reversed(days)))
+
+
+def ticker_names(count: int) -> List[str]:
+    """Synthetic 4-letter IDX-style codes: ZAAA.JK, ZAAB.JK, ..."""
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    names = []
+    for i in range(count):
+        a, rest = divmod(i, 26 * 26)
+        b, c = divmod(rest, 26)
+        suffix = f"{i // 17576}" if i >= 17576 else ""
+        names.append(f"Z{letters[a % 26]}{letters[b]}{letters[c]}{suffix}.JK")
+    return names
+
+
+class SyntheticMarket:
+    """
+    Seeded generator of a daily IDX-like market
+
+    Prices follow a regime-switching random walk (uptrend, downtrend,
+    range) clipped to auto-rejection limits and rounded to IDX ticks;
+    volume is lot-sized, tracks a per-ticker turnover level drawn from a
+    heavy-tailed distribution (most names illiquid, a few very liquid)
+    and has random spikes. A fraction of tickers gets a scenario planted
+    on the last bar (Supertrend flip, accumulation, dry correction) so
+    scanner runs have known signals; planted tickers are always liquid.
+    A scenario is only recorded in planted when its preconditions held
+    (e.g. the lead-in really ended in the opposite Supertrend trend).
+    Other tickers may still produce signals on their own.
+
+    The same seed always gives the same data, and ticker i's series does
+    not depend on how many tickers are generated.
+    """
+
+    def __init__(self, tickers: int = 600, bars: int = 120, seed: int = 42, end: date = None,
+                 plant_rates: Dict[str, float] = None, median_turnover: float = 2e9,
+                 turnover_sigma: float = 1.8, names: List[str] = None):
+        """
+        Args:
+            tickers: Number of tickers
+            bars: Daily bars per ticker
+            seed: Random seed
+            end: Last trading day of the data (default: last trading day)
+            plant_rates: {scenario: fraction of tickers} (default DEFAULT_PLANT_RATES)
+            median_turnover: Median average daily turnover (IDR)
+            turnover_sigma: Log-normal spread of turnover across tickers
+            names: Ticker codes (default ticker_names)
+        """
+        self.tickers = tickers
+        self.bars = bars
+        self.seed = seed
+        self.end = end
+        self.plant_rates = DEFAULT_PLANT_RATES if plant_rates is None else plant_rates
+        self.median_turnover = median_turnover
+        self.turnover_sigma = turnover_sigma
+        self.names = names or ticker_names(tickers)
+        self.planted: Dict[str, List[str]] = {}
+
+    def generate(self) -> Dict[str, pd.DataFrame]:
+        """
+        Generate the market
+
+        Returns:
+            {ticker: OHLCV DataFrame}, like fetch_multiple_stocks
+        """
+        index = trading_days(self.bars, self.end)
+        self.planted = {name: [] for name in self.plant_rates}
+        thresholds = np.cumsum(list(self.plant_rates.values()))
+        scenario_names = list(self.plant_rates)
+
+        data = {}
+        for i, ticker in enumerate(self.names[:self.tickers]):
+            rng = np.random.default_rng([self.seed, i])
+            pick = int(np.searchsorted(thresholds, rng.random(), side='right'))
+            scenario = scenario_names[pick] if pick < len(scenario_names) else None
+            frame = self._generate_ticker(rng, scenario)
+            if scenario is not None and self._plant(frame, rng, scenario):
+                self.planted[scenario].append(ticker)
+            data[ticker] = pd.DataFrame(frame, index=index)
+        return data
+
+    # ============================================
+    # BASE SERIES
+    # ============================================
+
+    def _generate_ticker(self, rng: np.random.Generator, scenario: Optional[str]) -> Dict[str, np.ndarray]:
+        n = self.bars
+        price0 = float(np.clip(rng.lognormal(np.log(800), 1.3), MIN_PRICE, 50_000))
+        turnover = rng.lognormal(np.log(self.median_turnover), self.turnover_sigma)
+        if scenario is not None:
+            turnover = max(turnover, 6e10)  # Planted signals must pass the liquidity filter, even on thin days
+
+        # Regime path; planted scenarios control the last ~40 bars
+        tail = min(40, n // 2) if scenario else 0
+        regimes = self._regime_path(rng, n - tail)
+        drift = np.array([REGIMES[r][0] for r in regimes] + [LEAD_IN[scenario][0]] * tail if tail else
+                         [REGIMES[r][0] for r in regimes])
+        vol = np.array([REGIMES[r][1] for r in regimes] + [LEAD_IN[scenario][1]] * tail if tail else
+                       [REGIMES[r][1] for r in regimes])
+        returns = drift + vol * rng.standard_t(5, n) / np.sqrt(5 / 3)
+
+        close = np.empty(n)
+        price = price0
+        for t, ret in enumerate(returns.tolist()):
+            limit = next(limit for upper, limit in ARA_BANDS if price < upper)
+            price = max(price * (1 + min(max(ret, -limit), limit)), MIN_PRICE)
+            close[t] = price
+        close = round_to_tick(close)
+
+        prev_close = np.concatenate([[round_to_tick(np.array([price0]))[0]], close[:-1]])
+        open_ = round_to_tick(prev_close * (1 + rng.normal(0, 0.004, n)))
+        wick = np.abs(rng.normal(0, 0.006, (2, n))) + 0.001
+        high = round_to_tick(np.maximum(open_, close) * (1 + wick[0]))
+        low = round_to_tick(np.minimum(open_, close) * (1 - wick[1]))
+
+        # Volume follows turnover, larger on big moves, with random spikes
+        abs_move = np.abs(close / prev_close - 1)
+        intensity = rng.lognormal(0, 0.35, n) * (1 + 8 * abs_move)
+        spikes = rng.random(n) < 0.02
+        intensity[spikes] *= rng.uniform(2.5, 5, spikes.sum())
+        volume = np.maximum(np.round(turnover * intensity / close / LOT_SIZE), 1) * LOT_SIZE
+
+        return {
+            'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume.astype(float),
+            'dividends': np.zeros(n), 'stock splits': np.zeros(n)
+        }
+
+    def _regime_path(self, rng: np.random.Generator, length: int) -> List[str]:
+        names = list(REGIMES)
+        path = []
+        regime = names[int(rng.integers(len(names)))]
+        while len(path) < length:
+            path.extend([regime] * max(1, int(rng.exponential(REGIMES[regime][2]))))
+            regime = names[int(rng.integers(len(names)))]
+        return path[:length]
+
+    # ============================================
+    # PLANTED SCENARIOS (LAST BAR)
+    # ============================================
+
+    def _plant(self, frame: Dict[str, np.ndarray], rng: np.random.Generator, scenario: str) -> bool:
+        """Rewrite the last bar so the scenario fires; returns False if not possible"""
+        close, volume = frame['close'], frame['volume']
+        prev = close[-2]
+        avg_volume = float(volume[-VOLUME_PERIOD - 1:-1].mean())
+        prefix = pd.DataFrame({k: frame[k][:-1] for k in ('open', 'high', 'low', 'close')})
+        st = calculate_supertrend(prefix).iloc[-1]
+
+        if scenario in ('bullish_break', 'bearish_break'):
+            bullish = scenario == 'bullish_break'
+            if (st['direction'] == 1) == bullish:
+                return False  # Lead-in did not end in the opposite trend
+            target = st['supertrend'] * (1.01 if bullish else 0.99)
+            limit = auto_rejection_limit(np.array([prev]))[0]
+            if abs(target / prev - 1) > limit * 0.9:
+                return False
+            last = round_to_tick(np.array([target + (tick_size(np.array([target]))[0] if bullish else
+                                                     -tick_size(np.array([target]))[0])]))[0]
+            open_ = prev
+            volume[-1] = round(avg_volume * rng.uniform(1.2, 2.0) / LOT_SIZE) * LOT_SIZE
+
+        elif st['direction'] != 1:
+            return False  # Accumulation and early entry need a bullish trend
+
+        elif scenario == 'accumulation':
+            if calculate_adx(calculate_atr(prefix))['adx'].iloc[-1] <= ADX_THRESHOLD + 5:
+                return False  # Sideways: accumulation needs a trending market
+            last = round_to_tick(np.array([prev * (1 + rng.uniform(0.02, 0.05))]))[0]
+            open_ = round_to_tick(np.array([prev * 1.002]))[0]
+            volume[-1] = round(avg_volume * rng.uniform(2.0, 4.0) / LOT_SIZE) * LOT_SIZE
+
+        elif scenario == 'early_entry':
+            # Dry correction: 3-5% down on thin volume after quiet up days, green candle off the low
+            up = close[-5:-1] > close[-6:-2]
+            if up.sum() < 2:
+                return False  # Mostly down days read as distribution
+            last = round_to_tick(np.array([prev * (1 - rng.uniform(0.032, 0.045))]))[0]
+            if last < st['supertrend'] * 1.01:
+                return False  # Correction would break the trend
+            open_ = round_to_tick(np.array([last * 0.985]))[0]
+            thin = avg_volume * DCA_VOLUME_THRESHOLD * 0.5
+            recent = thin * rng.uniform(0.8, 1.0, 5)
+            recent[:-1][~up] *= 0.1  # Selling dries up
+            recent[-1] *= 0.5
+            volume[-5:] = np.maximum(np.round(recent / LOT_SIZE), 1) * LOT_SIZE
+
+        else:
+            return False
+
+        close[-1] = last
+        frame['open'][-1] = open_
+        frame['high'][-1] = round_to_tick(np.array([max(open_, last) * 1.003]))[0]
+        frame['low'][-1] = round_to_tick(np.array([min(open_, last) * 0.997]))[0]
+        volume[-1] = max(volume[-1], LOT_SIZE)
+        return True
+
+
+def generate_market(tickers: int = 600, bars: int = 120, seed: int = 42, **kwargs) -> Dict[str, pd.DataFrame]:
+    """Shortcut: {ticker: OHLCV} of a SyntheticMarket"""
+    return SyntheticMarket(tickers, bars, seed, **kwargs).generate()
@@ -0,0 +1,204 @@
+# ============================================
+# ALERT LEDGER - DAILY ALERTED STOCKS
+# ============================================
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Iterable
+import logging
+
+logger = logging.getLogger(__name__)
+
+SIGNAL_TYPES = ['bullish_break', 'bearish_break', 'stoch_crossover', 'accumulation', 'early_entry']
+
+# Keep older days in the DB for history, prune beyond this
+LEDGER_RETENTION_DAYS = 30
+
+
+class AlertLedger:
+    """
+    Track which stocks were alerted today, per signal type
+
+    Membership checks use in-memory sets. New alerts are buffered and
+    written by flush() as plain INSERTs in one transaction, so marking
+    N alerts costs one write and never rewrites earlier rows.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.Lock = None,
+                 legacy_file: str = "database/daily_alerts.json"):
+        self.conn = conn
+        self._lock = lock or threading.Lock()
+        self.legacy_file = legacy_file
+        self.date = ""
+        self.alerts = {}    # {signal_type: set(tickers)}
+        self.order = {}     # {signal_type: [tickers]} in alert order, for recaps
+        self._pending = []  # (date, signal_type, ticker, alerted_at) not yet flushed
+        self._create_tables()
+        self._migrate_json_alerts()
+        self.load()
+
+    def _create_tables(self):
+        """Create ledger table (PK doubles as per-signal-type index)"""
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS daily_alerts (
+                    date TEXT NOT NULL,
+                    signal_type TEXT NOT NULL,
+                    ticker TEXT NOT NULL,
+                    alerted_at TEXT NOT NULL,
+                    PRIMARY KEY (date, signal_type, ticker)
+                )
+            """)
+
+    def _migrate_json_alerts(self):
+        """Import legacy daily_alerts.json once, then rename it"""
+        if not self.legacy_file or not os.path.exists(self.legacy_file):
+            return
+
+        try:
+            with open(self.legacy_file, 'r') as f:
+                legacy = json.load(f)
+
+            date = legacy.get('date', '')
+            rows = [
+                (date, signal_type, ticker, date)
+                for signal_type, tickers in legacy.items() if signal_type != 'date'
+                for ticker in tickers
+            ]
+            with self._lock, self.conn:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO daily_alerts (date, signal_type, ticker, alerted_at) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+            os.replace(self.legacy_file, self.legacy_file + ".migrated")
+            logger.info(f"Migrated {len(rows)} daily alerts from {self.legacy_file}")
+        except Exception as e:
+            logger.error(f"Error migrating daily alerts from JSON: {str(e)}")
+
+    @staticmethod
+    def _today() -> str:
+        """Current ledger date"""
+        return datetime.now().strftime('%Y-%m-%d')
+
+    def load(self):
+        """Load today's alerts from database"""
+        today = self._today()
+        self.date = today
+        self.alerts = {signal_type: set() for signal_type in SIGNAL_TYPES}
+        self.order = {signal_type: [] for signal_type in SIGNAL_TYPES}
+        self._pending = []
+
+        try:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT signal_type, ticker FROM daily_alerts WHERE date = ? ORDER BY alerted_at, rowid",
+                    (today,)
+                ).fetchall()
+            for signal_type, ticker in rows:
+                self.alerts.setdefault(signal_type, set()).add(ticker)
+                self.order.setdefault(signal_type, []).append(ticker)
+            logger.info(f"Loaded {len(rows)} daily alerts for {today}")
+        except Exception as e:
+            logger.error(f"Error loading daily alerts: {str(e)}")
+
+    def reset_if_new_day(self) -> bool:
+        """Start a fresh ledger on a new day; returns True if reset"""
+        today = self._today()
+        if self.date == today:
+            return False
+
+        self.flush()
+        self.load()
+        self._prune()
+        logger.info(f"Daily alerts reset for {today}")
+        return True
+
+    def _prune(self):
+        """Drop ledger rows older than the retention window"""
+        cutoff = (datetime.now() - timedelta(days=LEDGER_RETENTION_DAYS)).strftime('%Y-%m-%d')
+        try:
+            with self._lock, self.conn:
+                self.conn.execute("DELETE FROM daily_alerts WHERE date < ?", (cutoff,))
+        except Exception as e:
+            logger.error(f"Error pruning daily alerts: {str(e)}")
+
+    def is_alerted(self, signal_type: str, ticker: str) -> bool:
+        """Check if ticker was already alerted for signal_type today (O(1))"""
+        return ticker in self.alerts.get(signal_type, ())
+
+    def get_alerted(self, signal_type: str) -> set:
+        """Get set of tickers alerted today for signal_type"""
+        return self.alerts.get(signal_type, set())
+
+    def mark(self, signal_type: str, tickers: Iterable[str]) -> int:
+        """
+        Mark tickers as alerted for signal_type (buffered until flush)
+
+        Returns:
+            Number of newly marked tickers
+        """
+        alerted = self.alerts.setdefault(signal_type, set())
+        order = self.order.setdefault(signal_type, [])
+        now = datetime.now().isoformat()
+        added = 0
+
+        for ticker in tickers:
+            if ticker in alerted:
+                continue
+            alerted.add(ticker)
+            order.append(ticker)
+            self._pending.append((self.date, signal_type, ticker, now))
+            added += 1
+
+        return added
+
+    def unmark(self, signal_type: str, tickers: Iterable[str]) -> int:
+        """
+        Forget today's alerts of tickers for signal_type (their delivery failed)
+
+        Returns:
+            Number of tickers unmarked
+        """
+        tickers = set(tickers) & self.alerts.get(signal_type, set())
+        if not tickers:
+            return 0
+
+        self.alerts[signal_type] -= tickers
+        self.order[signal_type] = [t for t in self.order.get(signal_type, []) if t not in tickers]
+        self._pending = [row for row in self._pending if not (row[1] == signal_type and row[2] in tickers)]
+        try:
+            with self._lock, self.conn:
+                self.conn.executemany(
+                    "DELETE FROM daily_alerts WHERE date = ? AND signal_type = ? AND ticker = ?",
+                    [(self.date, signal_type, ticker) for ticker in tickers]
+                )
+        except Exception as e:
+            logger.error(f"Error unmarking daily alerts: {str(e)}")
+        return len(tickers)
+
+    def flush(self):
+        """Write buffered alerts in one transaction"""
+        if not self._pending:
+            return
+
+        pending = self._pending
+        try:
+            with self._lock, self.conn:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO daily_alerts (date, signal_type, ticker, alerted_at) VALUES (?, ?, ?, ?)",
+                    pending
+                )
+            self._pending = []
+            logger.info(f"Flushed {len(pending)} daily alerts")
+        except Exception as e:
+            logger.error(f"Error flushing daily alerts: {str(e)}")
+
+    def get_summary(self) -> Dict[str, List[str]]:
+        """Get today's alerted tickers per signal type (in alert order)"""
+        summary = {'date': self.date}
+        for signal_type, tickers in self.order.items():
+            summary[signal_type] = list(tickers)
+        return summary
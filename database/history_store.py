@@ -0,0 +1,193 @@
+# ============================================
+# HISTORY STORE - PER-SESSION SCORE TIME SERIES
+# ============================================
+
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+import logging
+
+import numpy as np
+
+from .state_journal import STATUS_CODES, STATUS_NAMES
+
+logger = logging.getLogger(__name__)
+
+# One fixed-width row per ticker per session (6 bytes)
+HISTORY_DTYPE = np.dtype([
+    ('score', '<i2'),
+    ('status', 'u1'),
+    ('direction', 'i1'),   # 1 bullish, -1 bearish
+    ('flags', 'u1'),       # Signal bit flags, see below
+    ('valid', 'u1')        # 0 = ticker not scanned that session
+])
+
+# Signal flags
+FLAG_BULLISH_BREAK = 1
+FLAG_BEARISH_BREAK = 2
+FLAG_STOCH_CROSSOVER = 4
+FLAG_ACCUMULATION = 8
+FLAG_EARLY_ENTRY = 16
+
+SIGNAL_FLAGS = {
+    'bullish_break': FLAG_BULLISH_BREAK,
+    'bearish_break': FLAG_BEARISH_BREAK,
+    'stoch_crossover': FLAG_STOCH_CROSSOVER,
+    'accumulation': FLAG_ACCUMULATION,
+    'early_entry': FLAG_EARLY_ENTRY
+}
+
+
+def get_signal_flags(result) -> int:
+    """Pack ScanResult signal booleans into bit flags"""
+    return (
+        (FLAG_BULLISH_BREAK if result.bullish_break else 0)
+        | (FLAG_BEARISH_BREAK if result.bearish_break else 0)
+        | (FLAG_STOCH_CROSSOVER if result.is_stoch_crossover else 0)
+        | (FLAG_ACCUMULATION if result.is_accumulation else 0)
+        | (FLAG_EARLY_ENTRY if result.is_early_entry else 0)
+    )
+
+
+class HistoryStore:
+    """
+    Columnar history of score, status, direction and signals per session
+
+    Each session is one .npy file holding a fixed-width row per ticker,
+    aligned to an append-only ticker index. Past sessions never change, so
+    they are opened memory-mapped and a query reads one row per day.
+    """
+
+    def __init__(self, history_dir: str = "database/history"):
+        self.history_dir = history_dir
+        self.tickers_file = os.path.join(history_dir, "tickers.txt")
+        self.tickers = []
+        self.ticker_ids = {}
+        self._saved_tickers = 0
+        self._mmaps = {}  # session date -> memmapped array (finalized sessions only)
+        self._ensure_directory()
+        self._load_tickers()
+
+    def _ensure_directory(self):
+        """Create directory if not exists"""
+        if not os.path.exists(self.history_dir):
+            os.makedirs(self.history_dir)
+
+    def _load_tickers(self):
+        """Load ticker index"""
+        try:
+            if os.path.exists(self.tickers_file):
+                with open(self.tickers_file, 'r') as f:
+                    self.tickers = [line.strip() for line in f if line.strip()]
+            self.ticker_ids = {ticker: i for i, ticker in enumerate(self.tickers)}
+            self._saved_tickers = len(self.tickers)
+        except Exception as e:
+            logger.error(f"Error loading history tickers: {str(e)}")
+
+    def _session_file(self, session_date: str) -> str:
+        return os.path.join(self.history_dir, f"{session_date}.npy")
+
+    def write_session(self, results: Dict, session_date: str):
+        """
+        Write (or overwrite) one session's row set
+
+        Args:
+            results: Dictionary of {ticker: ScanResult}
+            session_date: Session date 'YYYY-MM-DD'
+        """
+        try:
+            for ticker in results:
+                if ticker not in self.ticker_ids:
+                    self.ticker_ids[ticker] = len(self.tickers)
+                    self.tickers.append(ticker)
+
+            if self._saved_tickers < len(self.tickers):
+                with open(self.tickers_file, 'a') as f:
+                    f.write(''.join(t + '\n' for t in self.tickers[self._saved_tickers:]))
+                self._saved_tickers = len(self.tickers)
+
+            rows = np.zeros(len(self.tickers), dtype=HISTORY_DTYPE)
+            for ticker, result in results.items():
+                row = rows[self.ticker_ids[ticker]]
+                row['score'] = max(-32768, min(32767, int(result.score)))
+                row['status'] = STATUS_CODES.get(result.status, 0)
+                row['direction'] = 1 if result.is_bullish else -1
+                row['flags'] = get_signal_flags(result)
+                row['valid'] = 1
+
+            path = self._session_file(session_date)
+            tmp_file = path + ".tmp.npy"
+            np.save(tmp_file, rows)
+            os.replace(tmp_file, path)
+            self._mmaps.pop(session_date, None)
+        except Exception as e:
+            logger.error(f"Error writing history for {session_date}: {str(e)}")
+
+    def _open_session(self, session_date: str) -> Optional[np.ndarray]:
+        """Open a session file memory-mapped (cached for past sessions)"""
+        if session_date in self._mmaps:
+            return self._mmaps[session_date]
+
+        path = self._session_file(session_date)
+        if not os.path.exists(path):
+            return None
+
+        rows = np.load(path, mmap_mode='r')
+        if session_date < datetime.now().strftime('%Y-%m-%d'):
+            self._mmaps[session_date] = rows
+        return rows
+
+    def list_sessions(self) -> List[str]:
+        """Get all stored session dates (sorted)"""
+        return sorted(
+            name[:-4] for name in os.listdir(self.history_dir)
+            if name.endswith('.npy') and not name.endswith('.tmp.npy')
+        )
+
+    def query(self, ticker: str, start: str = None, end: str = None) -> List[dict]:
+        """
+        Get ticker history between two session dates (inclusive)
+
+        Args:
+            ticker: Stock ticker
+            start: First session 'YYYY-MM-DD' (default: 30 days before end)
+            end: Last session 'YYYY-MM-DD' (default: today)
+
+        Returns:
+            List of {'date', 'score', 'status', 'is_bullish', 'signals'} (oldest first)
+        """
+        ticker_id = self.ticker_ids.get(ticker)
+        if ticker_id is None:
+            return []
+
+        end = end or datetime.now().strftime('%Y-%m-%d')
+        if start is None:
+            start = (date.fromisoformat(end) - timedelta(days=30)).strftime('%Y-%m-%d')
+
+        history = []
+        for session_date in self.list_sessions():
+            if session_date < start or session_date > end:
+                continue
+
+            rows = self._open_session(session_date)
+            if rows is None or ticker_id >= len(rows):
+                continue
+
+            row = rows[ticker_id]
+            if not row['valid']:
+                continue
+
+            flags = int(row['flags'])
+            history.append({
+                'date': session_date,
+                'score': int(row['score']),
+                'status': STATUS_NAMES.get(int(row['status']), 'UNKNOWN'),
+                'is_bullish': int(row['direction']) == 1,
+                'signals': [name for name, flag in SIGNAL_FLAGS.items() if flags & flag]
+            })
+
+        return history
+
+    def get_scores(self, ticker: str, start: str = None, end: str = None) -> List[int]:
+        """Get ticker score series between two session dates (oldest first)"""
+        return [entry['score'] for entry in self.query(ticker, start, end)]
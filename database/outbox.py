@@ -0,0 +1,215 @@
+# ============================================
+# OUTBOX - DURABLE TELEGRAM MESSAGE QUEUE
+# ============================================
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = 'pending'
+STATUS_SENT = 'sent'
+STATUS_FAILED = 'failed'
+
+# Delivered/failed messages are kept this long for inspection
+OUTBOX_RETENTION_SECONDS = 7 * 86400
+
+
+def make_alert_key(signal_type: str, ticker: str, date: str, chat_id: str) -> str:
+    """Idempotency key of one alert: (signal type, ticker, date) per chat"""
+    return f"{date}:{signal_type}:{ticker}:{chat_id}"
+
+
+def parse_alert_key(key: str) -> Tuple[str, str, str, str]:
+    """Inverse of make_alert_key: (date, signal_type, ticker, chat_id)"""
+    date, signal_type, ticker, chat_id = key.split(':', 3)
+    return date, signal_type, ticker, chat_id
+
+
+class Outbox:
+    """
+    Durable outbox for outgoing Telegram messages (SQLite, WAL mode)
+
+    Messages are committed before delivery and acknowledged after, so a
+    restart re-delivers whatever was still pending. Idempotency keys make
+    enqueueing the same alert twice a no-op; the keys of a batch that was
+    given up on can be released (get_failed_keys, release_keys) so its
+    alerts are enqueued again.
+    """
+
+    def __init__(self, db_file: str = "database/scanner.db"):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._ensure_directory()
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+    def _ensure_directory(self):
+        """Create directory if not exists"""
+        directory = os.path.dirname(self.db_file)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+    def _create_tables(self):
+        """Create outbox tables and indexes if not exists"""
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    chat_id TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    next_attempt_at REAL NOT NULL,
+                    sent_at REAL,
+                    last_error TEXT,
+                    batch_id INTEGER
+                )
+            """)
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(outbox)")}
+            if 'batch_id' not in columns:  # Outbox created before batches were recorded
+                self.conn.execute("ALTER TABLE outbox ADD COLUMN batch_id INTEGER")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox (status, next_attempt_at)")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS outbox_keys (
+                    key TEXT PRIMARY KEY,
+                    message_id INTEGER NOT NULL
+                )
+            """)
+
+    def filter_new_keys(self, keys: Iterable[str]) -> Set[str]:
+        """Return the keys that were never enqueued"""
+        keys = list(keys)
+        if not keys:
+            return set()
+
+        existing = set()
+        with self._lock:
+            for i in range(0, len(keys), 500):  # Stay under SQLite's variable limit
+                chunk = keys[i:i + 500]
+                rows = self.conn.execute(
+                    f"SELECT key FROM outbox_keys WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                existing.update(row[0] for row in rows)
+        return set(keys) - existing
+
+    def enqueue_many(self, messages: List[Tuple[str, str]], keys: Iterable[str] = ()) -> List[int]:
+        """
+        Commit a batch of messages and their idempotency keys in one transaction
+
+        Args:
+            messages: List of (chat_id, text)
+            keys: Idempotency keys covered by this batch
+
+        Returns:
+            Message ids (empty if every key was already enqueued)
+        """
+        keys = list(keys)
+        if keys and not self.filter_new_keys(keys):
+            logger.info("Outbox: batch already enqueued, skipping duplicate")
+            return []
+
+        now = time.time()
+        ids = []
+        with self._lock, self.conn:
+            for chat_id, text in messages:
+                cursor = self.conn.execute(
+                    "INSERT INTO outbox (chat_id, text, status, created_at, next_attempt_at) VALUES (?, ?, ?, ?, ?)",
+                    (str(chat_id), text, STATUS_PENDING, now, now)
+                )
+                ids.append(cursor.lastrowid)
+            if ids:
+                # Keys point at the batch (its first message), every message knows its batch
+                self.conn.executemany("UPDATE outbox SET batch_id = ? WHERE id = ?", [(ids[0], i) for i in ids])
+            if ids and keys:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO outbox_keys (key, message_id) VALUES (?, ?)",
+                    [(key, ids[0]) for key in keys]
+                )
+        return ids
+
+    def enqueue(self, chat_id: str, text: str, keys: Iterable[str] = ()) -> Optional[int]:
+        """Commit one message; returns its id or None if a duplicate"""
+        ids = self.enqueue_many([(chat_id, text)], keys)
+        return ids[0] if ids else None
+
+    def get_pending(self) -> List[Tuple[int, str, str, int, float, float]]:
+        """Get pending messages as (id, chat_id, text, attempts, created_at, next_attempt_at)"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT id, chat_id, text, attempts, created_at, next_attempt_at FROM outbox "
+                "WHERE status = ? ORDER BY id", (STATUS_PENDING,)
+            ).fetchall()
+
+    def ack(self, message_id: int):
+        """Mark message as delivered"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE outbox SET status = ?, sent_at = ?, attempts = attempts + 1 WHERE id = ?",
+                (STATUS_SENT, time.time(), message_id)
+            )
+
+    def retry_later(self, message_id: int, attempts: int, next_attempt_at: float, error: str):
+        """Record a failed attempt (attempts counted so far) and when to retry"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (attempts, next_attempt_at, error[:500], message_id)
+            )
+
+    def fail(self, message_id: int, error: str):
+        """Give up on a message (kept as failed for inspection)"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, last_error = ? WHERE id = ?",
+                (STATUS_FAILED, error[:500], message_id)
+            )
+
+    def get_failed_keys(self) -> List[str]:
+        """Idempotency keys of batches with a message that was given up on"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT key FROM outbox_keys WHERE message_id IN "
+                "(SELECT COALESCE(batch_id, id) FROM outbox WHERE status = ?) ORDER BY key", (STATUS_FAILED,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def release_keys(self, keys: Iterable[str]):
+        """Forget idempotency keys, so their alerts can be enqueued again"""
+        keys = list(keys)
+        with self._lock, self.conn:
+            for i in range(0, len(keys), 500):  # Stay under SQLite's variable limit
+                chunk = keys[i:i + 500]
+                self.conn.execute(f"DELETE FROM outbox_keys WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+
+    def prune(self, older_than: float = OUTBOX_RETENTION_SECONDS):
+        """Delete delivered/failed messages (and their keys) older than retention"""
+        cutoff = time.time() - older_than
+        with self._lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM outbox_keys WHERE message_id IN "
+                "(SELECT id FROM outbox WHERE status != ? AND created_at < ?)", (STATUS_PENDING, cutoff)
+            )
+            self.conn.execute("DELETE FROM outbox WHERE status != ? AND created_at < ?", (STATUS_PENDING, cutoff))
+
+    def get_stats(self) -> dict:
+        """Queue depth, age of the oldest pending message (seconds) and failed count"""
+        with self._lock:
+            depth, oldest = self.conn.execute(
+                "SELECT COUNT(*), MIN(created_at) FROM outbox WHERE status = ?", (STATUS_PENDING,)
+            ).fetchone()
+            failed = self.conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status = ?", (STATUS_FAILED,)
+            ).fetchone()[0]
+        return {
+            'depth': depth,
+            'oldest_age': time.time() - oldest if oldest is not None else 0.0,
+            'failed': failed
+        }
@@ -0,0 +1,142 @@
+# ============================================
+# SESSION STORE - LAST SESSION RESULTS & BARS
+# ============================================
+
+import hashlib
+import os
+import pickle
+from datetime import datetime
+from typing import Dict, Optional
+import logging
+
+from config import settings
+from config.settings import SNAPSHOT_MAX_AGE_DAYS
+from core.market_calendar import now_wib, last_trading_day, are_daily_bars_final
+
+logger = logging.getLogger(__name__)
+
+# Bump when the stored layout changes
+SNAPSHOT_FORMAT = 2
+
+# Settings the stored results depend on: any change invalidates the snapshot
+SNAPSHOT_SETTINGS = (
+    'SUPERTREND_PERIOD', 'SUPERTREND_MULTIPLIER', 'EMA_FAST', 'EMA_MEDIUM', 'EMA_SLOW',
+    'VOLUME_PERIOD', 'VOLUME_SPIKE_THRESHOLD', 'UNUSUAL_VOLUME_THRESHOLD',
+    'RSI_PERIOD', 'STOCH_PERIOD', 'SMOOTH_K', 'SMOOTH_D', 'STOCH_OVERBOUGHT', 'STOCH_OVERSOLD',
+    'ATR_PERIOD', 'ATR_MULTIPLIER', 'ADX_PERIOD', 'ADX_THRESHOLD',
+    'FIB_LEVEL_1', 'FIB_LEVEL_2', 'DCA_LOOKBACK', 'DCA_VOLUME_THRESHOLD',
+    'BUY_THRESHOLD', 'ACCUMULATE_THRESHOLD', 'HOLD_THRESHOLD',
+    'DATA_PERIOD', 'DATA_INTERVAL', 'MIN_DAILY_TURNOVER',
+)
+
+
+def snapshot_version() -> str:
+    """Format number plus a hash of the indicator settings"""
+    values = repr([(name, getattr(settings, name)) for name in SNAPSHOT_SETTINGS])
+    return f"{SNAPSHOT_FORMAT}-{hashlib.sha1(values.encode()).hexdigest()[:12]}"
+
+
+class SessionStore:
+    """
+    Keep the latest scan results and bars of the current trading session
+
+    Updated in memory and written to disk every scan cycle, so the 18:00
+    evening scan and a restarted scheduler can reuse them instead of
+    refetching and re-analyzing the whole universe. The file is versioned
+    by the indicator settings; a snapshot from other settings is ignored.
+    """
+
+    def __init__(self, store_file: str = "database/last_session.pkl"):
+        self.store_file = store_file
+        self.session = {}
+        self._ensure_directory()
+        self.load()
+
+    def _ensure_directory(self):
+        """Create directory if not exists"""
+        directory = os.path.dirname(self.store_file)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+    def load(self):
+        """Load last session from file"""
+        try:
+            if os.path.exists(self.store_file):
+                with open(self.store_file, 'rb') as f:
+                    self.session = pickle.load(f)
+                if self.session.get('version') != snapshot_version():
+                    logger.info(f"Ignoring stored session {self.session.get('session_date')}: "
+                                f"indicator settings or format changed")
+                    self.session = {}
+                    return
+                logger.info(f"Loaded session {self.session.get('session_date')} "
+                            f"with {len(self.session.get('results', {}))} results")
+            else:
+                self.session = {}
+        except Exception as e:
+            logger.error(f"Error loading session: {str(e)}")
+            self.session = {}
+
+    def save(self):
+        """Save last session to file (atomic replace, never half-written)"""
+        if not self.session:
+            return
+
+        tmp_file = self.store_file + ".tmp"
+        try:
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(self.session, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.store_file)
+            logger.info(f"Saved session {self.session.get('session_date')}")
+        except Exception as e:
+            logger.error(f"Error saving session: {str(e)}")
+
+    def update(self, results: Dict, stock_data: Dict, bars_final: Optional[bool] = None, table=None,
+               session_date: Optional[str] = None):
+        """
+        Replace in-memory session with the latest scan cycle
+
+        Args:
+            results: Dictionary of {ticker: ScanResult}
+            stock_data: Dictionary of {ticker: DataFrame} the results were built from
+            bars_final: Whether the daily bars are final (default: from market calendar)
+            table: Optional results table of the cycle (rebuilt from results if missing)
+            session_date: Trading day of the bars, 'YYYY-MM-DD' (default: last trading day)
+        """
+        now = now_wib()
+        if bars_final is None:
+            bars_final = are_daily_bars_final(now)
+
+        self.session = {
+            'version': snapshot_version(),
+            'session_date': session_date or last_trading_day(now).strftime('%Y-%m-%d'),
+            'captured_at': now.isoformat(),
+            'bars_final': bars_final,
+            'results': results,
+            'stock_data': stock_data,
+            'table': table
+        }
+
+    def get_session(self, session_date: str) -> Optional[dict]:
+        """Get stored session if it belongs to session_date ('YYYY-MM-DD')"""
+        if self.session.get('session_date') != session_date:
+            return None
+        if not self.session.get('results'):
+            return None
+        return self.session
+
+    def get_resumable(self, max_age_days: int = SNAPSHOT_MAX_AGE_DAYS) -> Optional[dict]:
+        """
+        Get the stored session if it is recent enough to resume from after a restart
+
+        Returns:
+            Session dict, or None if empty or older than max_age_days
+            before the last trading day
+        """
+        if not self.session.get('results') or not self.session.get('stock_data'):
+            return None
+        session_day = datetime.strptime(self.session['session_date'], '%Y-%m-%d').date()
+        if (last_trading_day() - session_day).days > max_age_days:
+            logger.info(f"Stored session {self.session['session_date']} is too old to resume")
+            return None
+        return self.session
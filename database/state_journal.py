@@ -0,0 +1,304 @@
+# ============================================
+# STATE JOURNAL - APPEND-ONLY TRANSITION LOG
+# ============================================
+
+import json
+import os
+import struct
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Record: timestamp (uint32), ticker id (uint16), direction (int8),
+#         status code (uint8), score (int16) -> 10 bytes, little endian
+RECORD_FORMAT = '<IHbBh'
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+STATUS_CODES = {'UNKNOWN': 0, 'AVOID': 1, 'HOLD': 2, 'ACCUMULATE': 3, 'STRONG BUY': 4}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+DIRECTION_BULLISH = 1
+DIRECTION_BEARISH = -1
+
+
+def _apply_record(last_state: Dict, last_flip: Dict, record: Tuple[int, int, int, int, int]):
+    """Apply one record to latest-state and last-flip maps"""
+    ts, ticker_id, direction, status, score = record
+    previous = last_state.get(ticker_id)
+
+    if previous is not None and previous[1] != direction and direction != 0:
+        last_flip.setdefault(ticker_id, {})[direction] = ts
+
+    last_state[ticker_id] = (ts, direction, status, score)
+
+
+class StateJournal:
+    """
+    Append-only binary journal of per-ticker state transitions
+
+    Each record is a (direction, status, score) change of one ticker.
+    An in-memory index keeps every ticker's latest state, the last time it
+    flipped bullish/bearish and the journal offsets of its records, so
+    queries never scan the journal. compact() folds old records into a
+    JSON snapshot to keep the journal bounded.
+    """
+
+    def __init__(self, journal_file: str = "database/state_journal.bin",
+                 retention_days: int = 30, max_records: int = 200_000):
+        self.journal_file = journal_file
+        self.snapshot_file = journal_file + ".snapshot.json"
+        self.tickers_file = journal_file + ".tickers"
+        self.retention_days = retention_days
+        self.max_records = max_records
+
+        self.tickers = []         # ticker id -> ticker
+        self.ticker_ids = {}      # ticker -> ticker id
+        self.last_state = {}      # ticker id -> (ts, direction, status code, score)
+        self.last_flip = {}       # ticker id -> {direction: ts}
+        self.offsets = {}         # ticker id -> [record index in journal]
+        self.record_count = 0
+        self.compacted_until = 0  # Records up to this ts live in the snapshot
+        self._saved_tickers = 0
+
+        self._ensure_directory()
+        self.load()
+
+    def _ensure_directory(self):
+        """Create directory if not exists"""
+        directory = os.path.dirname(self.journal_file)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+    # ============================================
+    # LOAD / INDEX
+    # ============================================
+
+    def load(self):
+        """Load ticker ids and snapshot, then replay the journal into the index"""
+        self.tickers, self.ticker_ids = [], {}
+        self.last_state, self.last_flip, self.offsets = {}, {}, {}
+        self.record_count = 0
+        self.compacted_until = 0
+
+        try:
+            if os.path.exists(self.tickers_file):
+                with open(self.tickers_file, 'r') as f:
+                    self.tickers = [line.strip() for line in f if line.strip()]
+                self.ticker_ids = {ticker: i for i, ticker in enumerate(self.tickers)}
+            self._saved_tickers = len(self.tickers)
+
+            self.compacted_until, self.last_state, self.last_flip = self._load_snapshot()
+        except Exception as e:
+            logger.error(f"Error loading journal snapshot: {str(e)}")
+
+        try:
+            for index, record in enumerate(self._read_records()):
+                # Already folded into the snapshot (crash between snapshot and journal replace)
+                if record[0] <= self.compacted_until:
+                    continue
+                self._index_record(index, record)
+            logger.info(f"Loaded state journal: {self.record_count} records, {len(self.tickers)} tickers")
+        except Exception as e:
+            logger.error(f"Error loading state journal: {str(e)}")
+
+    def _load_snapshot(self) -> Tuple[int, Dict, Dict]:
+        """Read snapshot as (compacted_until, last_state, last_flip)"""
+        if not os.path.exists(self.snapshot_file):
+            return 0, {}, {}
+
+        with open(self.snapshot_file, 'r') as f:
+            snapshot = json.load(f)
+
+        last_state = {int(k): tuple(v) for k, v in snapshot.get('last_state', {}).items()}
+        last_flip = {
+            int(k): {int(d): ts for d, ts in flips.items()}
+            for k, flips in snapshot.get('last_flip', {}).items()
+        }
+        return snapshot.get('compacted_until', 0), last_state, last_flip
+
+    def _read_records(self) -> List[Tuple[int, int, int, int, int]]:
+        """Read all complete records, dropping a torn trailing record"""
+        if not os.path.exists(self.journal_file):
+            return []
+
+        with open(self.journal_file, 'rb') as f:
+            data = f.read()
+
+        usable = len(data) - (len(data) % RECORD_SIZE)
+        if usable != len(data):
+            logger.warning("Dropping incomplete trailing journal record")
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(usable)
+
+        self.record_count = usable // RECORD_SIZE
+        return list(struct.iter_unpack(RECORD_FORMAT, data[:usable]))
+
+    def _index_record(self, index: int, record: Tuple[int, int, int, int, int]):
+        """Apply one record to the in-memory index"""
+        _apply_record(self.last_state, self.last_flip, record)
+        self.offsets.setdefault(record[1], []).append(index)
+
+    def _get_ticker_id(self, ticker: str) -> int:
+        """Get (or assign) the numeric id for a ticker"""
+        ticker_id = self.ticker_ids.get(ticker)
+        if ticker_id is None:
+            ticker_id = len(self.tickers)
+            self.tickers.append(ticker)
+            self.ticker_ids[ticker] = ticker_id
+        return ticker_id
+
+    # ============================================
+    # APPEND
+    # ============================================
+
+    def append(self, changes: List[Tuple[str, Optional[bool], str, int]], timestamp: float = None) -> int:
+        """
+        Append state changes (one write for the whole batch)
+
+        Args:
+            changes: List of (ticker, is_bullish, status, score); entries equal
+                to the ticker's last journaled state are skipped
+            timestamp: Epoch seconds for all records (default: now)
+
+        Returns:
+            Number of records written
+        """
+        ts = int(timestamp if timestamp is not None else time.time())
+        records = []
+
+        for ticker, is_bullish, status, score in changes:
+            ticker_id = self._get_ticker_id(ticker)
+            direction = 0 if is_bullish is None else (DIRECTION_BULLISH if is_bullish else DIRECTION_BEARISH)
+            status_code = STATUS_CODES.get(status, 0)
+            score = max(-32768, min(32767, int(score or 0)))
+
+            previous = self.last_state.get(ticker_id)
+            if previous is not None and previous[1:] == (direction, status_code, score):
+                continue
+
+            record = (ts, ticker_id, direction, status_code, score)
+            self._index_record(self.record_count + len(records), record)
+            records.append(record)
+
+        if not records:
+            return 0
+
+        try:
+            # Ticker names first, so every journaled id can be resolved
+            if self._saved_tickers < len(self.tickers):
+                with open(self.tickers_file, 'a') as f:
+                    f.write(''.join(t + '\n' for t in self.tickers[self._saved_tickers:]))
+                self._saved_tickers = len(self.tickers)
+
+            with open(self.journal_file, 'ab') as f:
+                f.write(b''.join(struct.pack(RECORD_FORMAT, *r) for r in records))
+            self.record_count += len(records)
+        except Exception as e:
+            logger.error(f"Error appending state journal: {str(e)}")
+            self.load()  # Re-sync index with what is actually on disk
+            return 0
+
+        if self.record_count > self.max_records:
+            self.compact()
+
+        return len(records)
+
+    # ============================================
+    # COMPACTION
+    # ============================================
+
+    def compact(self):
+        """
+        Fold records older than the retention window into the snapshot
+
+        If the journal is still over max_records, the oldest half is folded
+        as well. Snapshot is written before the journal is replaced; records
+        at or before compacted_until are skipped on load, so a crash between
+        the two steps is harmless.
+        """
+        try:
+            records = self._read_records()
+            if not records:
+                return
+
+            cutoff = int(time.time()) - self.retention_days * 86400
+            if len(records) > self.max_records:
+                cutoff = max(cutoff, records[len(records) - self.max_records // 2][0] - 1)
+
+            # Fold old records on top of the current snapshot
+            compacted_until, last_state, last_flip = self._load_snapshot()
+            kept = []
+            for record in records:
+                if record[0] <= compacted_until:
+                    continue
+                if record[0] <= cutoff:
+                    _apply_record(last_state, last_flip, record)
+                else:
+                    kept.append(record)
+
+            snapshot = {
+                'created_at': datetime.now().isoformat(),
+                'compacted_until': max(cutoff, compacted_until),
+                'last_state': {str(k): list(v) for k, v in last_state.items()},
+                'last_flip': {
+                    str(k): {str(d): ts for d, ts in flips.items()}
+                    for k, flips in last_flip.items()
+                }
+            }
+            tmp_file = self.snapshot_file + ".tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(snapshot, f, separators=(',', ':'))
+            os.replace(tmp_file, self.snapshot_file)
+
+            tmp_file = self.journal_file + ".tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(b''.join(struct.pack(RECORD_FORMAT, *r) for r in kept))
+            os.replace(tmp_file, self.journal_file)
+
+            logger.info(f"Compacted state journal: {len(records) - len(kept)} folded, {len(kept)} kept")
+            self.load()
+        except Exception as e:
+            logger.error(f"Error compacting state journal: {str(e)}")
+
+    # ============================================
+    # QUERIES
+    # ============================================
+
+    def get_last_flip(self, ticker: str, bullish: bool = True) -> Optional[datetime]:
+        """When did ticker last flip bullish (or bearish)? None if never seen"""
+        ticker_id = self.ticker_ids.get(ticker)
+        if ticker_id is None:
+            return None
+
+        direction = DIRECTION_BULLISH if bullish else DIRECTION_BEARISH
+        ts = self.last_flip.get(ticker_id, {}).get(direction)
+        return datetime.fromtimestamp(ts) if ts is not None else None
+
+    def get_transitions(self, ticker: str, limit: int = 50) -> List[dict]:
+        """
+        Get the latest journaled transitions of a ticker (newest last)
+
+        Reads only this ticker's records using the offset index.
+        """
+        ticker_id = self.ticker_ids.get(ticker)
+        if ticker_id is None or not os.path.exists(self.journal_file):
+            return []
+
+        transitions = []
+        with open(self.journal_file, 'rb') as f:
+            for index in self.offsets.get(ticker_id, [])[-limit:]:
+                f.seek(index * RECORD_SIZE)
+                data = f.read(RECORD_SIZE)
+                if len(data) < RECORD_SIZE:
+                    break
+                ts, _, direction, status, score = struct.unpack(RECORD_FORMAT, data)
+                transitions.append({
+                    'timestamp': datetime.fromtimestamp(ts).isoformat(),
+                    'is_bullish': None if direction == 0 else direction == DIRECTION_BULLISH,
+                    'status': STATUS_NAMES.get(status, 'UNKNOWN'),
+                    'score': score
+                })
+        return transitions
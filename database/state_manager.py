@@ -4,53 +4,183 @@
 
 import json
 import os
+import sqlite3
+import threading
 from datetime import datetime
 from typing import Dict, Optional, List
 import logging
 
+from config.settings import JOURNAL_FILE, JOURNAL_RETENTION_DAYS, JOURNAL_MAX_RECORDS, HISTORY_DIR
+from core.market_calendar import last_trading_day
+from .alert_ledger import AlertLedger
+from .state_journal import StateJournal
+from .history_store import HistoryStore
+from monitoring.metrics import timed
+
 logger = logging.getLogger(__name__)
 
+STATE_COLUMNS = ['is_bullish', 'status', 'score', 'updated_at', 'previous_is_bullish', 'previous_status']
+
+
+def _to_db_bool(value) -> Optional[int]:
+    """Convert optional bool to SQLite integer"""
+    return None if value is None else int(bool(value))
+
+
+def _from_db_bool(value) -> Optional[bool]:
+    """Convert SQLite integer back to optional bool"""
+    return None if value is None else bool(value)
+
 
 class StateManager:
-    """Manage persistent state for stocks"""
+    """Manage persistent state for stocks (SQLite, WAL mode)"""
     
-    def __init__(self, state_file: str = "database/stock_states.json"):
-        self.state_file = state_file
-        self.daily_alerts_file = "database/daily_alerts.json"
+    def __init__(self, state_file: str = "database/stock_states.json", db_file: str = "database/scanner.db",
+                 journal_file: str = JOURNAL_FILE, history_dir: str = HISTORY_DIR):
+        self.state_file = state_file  # Legacy JSON store, migrated on first start
+        self.db_file = db_file
         self.states = {}
-        self.daily_alerts = {}
+        self._dirty = set()  # Tickers updated since last save
+        self._changes = []  # (ticker, is_bullish, status, score) transitions since last save
+        self._lock = threading.Lock()
         self._ensure_directory()
+        self.conn = self._connect()
+        self._create_tables()
+        self._migrate_json_states()
         self.load()
-        self._load_daily_alerts()
+        self.alert_ledger = AlertLedger(self.conn, self._lock, legacy_file="database/daily_alerts.json")
+        self.journal = StateJournal(journal_file, retention_days=JOURNAL_RETENTION_DAYS,
+                                    max_records=JOURNAL_MAX_RECORDS)
+        self.history = HistoryStore(history_dir)
     
     def _ensure_directory(self):
         """Create directory if not exists"""
-        directory = os.path.dirname(self.state_file)
+        directory = os.path.dirname(self.db_file)
         if directory and not os.path.exists(directory):
             os.makedirs(directory)
     
-    def load(self):
-        """Load states from file"""
+    def _connect(self) -> sqlite3.Connection:
+        """Open SQLite connection in WAL mode"""
+        conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # Durable across app crashes in WAL mode
+        return conn
+    
+    def _create_tables(self):
+        """Create state tables and indexes if not exists"""
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS stock_states (
+                    ticker TEXT PRIMARY KEY,
+                    is_bullish INTEGER,
+                    status TEXT,
+                    score INTEGER,
+                    updated_at TEXT,
+                    previous_is_bullish INTEGER,
+                    previous_status TEXT
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_stock_states_status ON stock_states (status)")
+    
+    def _migrate_json_states(self):
+        """Import legacy stock_states.json once, then rename it"""
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        
         try:
-            if os.path.exists(self.state_file):
+            count = self.conn.execute("SELECT COUNT(*) FROM stock_states").fetchone()[0]
+            if count == 0:
                 with open(self.state_file, 'r') as f:
-                    self.states = json.load(f)
-                logger.info(f"Loaded {len(self.states)} stock states")
-            else:
-                self.states = {}
+                    legacy = json.load(f)
+                self._upsert_states(legacy)
+                logger.info(f"Migrated {len(legacy)} stock states from {self.state_file}")
+            
+            os.replace(self.state_file, self.state_file + ".migrated")
+        except Exception as e:
+            logger.error(f"Error migrating states from JSON: {str(e)}")
+    
+    def _upsert_states(self, states: Dict[str, dict]):
+        """Upsert many states in a single transaction"""
+        rows = [
+            (
+                ticker,
+                _to_db_bool(state.get('is_bullish')),
+                state.get('status'),
+                None if state.get('score') is None else int(state['score']),
+                state.get('updated_at'),
+                _to_db_bool(state.get('previous_is_bullish')),
+                state.get('previous_status')
+            )
+            for ticker, state in states.items()
+        ]
+        
+        with self._lock, self.conn:
+            self.conn.executemany("""
+                INSERT INTO stock_states (ticker, is_bullish, status, score, updated_at,
+                                          previous_is_bullish, previous_status)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(ticker) DO UPDATE SET
+                    is_bullish = excluded.is_bullish,
+                    status = excluded.status,
+                    score = excluded.score,
+                    updated_at = excluded.updated_at,
+                    previous_is_bullish = excluded.previous_is_bullish,
+                    previous_status = excluded.previous_status
+            """, rows)
+    
+    @staticmethod
+    def _row_to_state(row) -> dict:
+        """Convert DB row (without ticker) to state dict"""
+        is_bullish, status, score, updated_at, previous_is_bullish, previous_status = row
+        return {
+            'is_bullish': _from_db_bool(is_bullish),
+            'status': status,
+            'score': score,
+            'updated_at': updated_at,
+            'previous_is_bullish': _from_db_bool(previous_is_bullish),
+            'previous_status': previous_status
+        }
+    
+    def load(self):
+        """Load states from database"""
+        try:
+            with self._lock:
+                rows = self.conn.execute(
+                    f"SELECT ticker, {', '.join(STATE_COLUMNS)} FROM stock_states"
+                ).fetchall()
+            self.states = {row[0]: self._row_to_state(row[1:]) for row in rows}
+            self._dirty.clear()
+            logger.info(f"Loaded {len(self.states)} stock states")
         except Exception as e:
             logger.error(f"Error loading states: {str(e)}")
             self.states = {}
     
+    @timed('state_save')
     def save(self):
-        """Save states to file"""
+        """Save states updated since last save (one transaction) and journal transitions"""
+        if self._changes:
+            self.journal.append(self._changes)
+            self._changes = []
+        
+        if not self._dirty:
+            return
+        
         try:
-            with open(self.state_file, 'w') as f:
-                json.dump(self.states, f, indent=2, default=str)
-            logger.info(f"Saved {len(self.states)} stock states")
+            dirty = {ticker: self.states[ticker] for ticker in self._dirty if ticker in self.states}
+            self._upsert_states(dirty)
+            self._dirty.clear()
+            logger.info(f"Saved {len(dirty)} stock states")
         except Exception as e:
             logger.error(f"Error saving states: {str(e)}")
     
+    def get_tickers_by_status(self, status: str) -> List[str]:
+        """Get tickers currently in a status (indexed lookup)"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT ticker FROM stock_states WHERE status = ? ORDER BY ticker", (status,)
+            ).fetchall()
+        return [row[0] for row in rows]
+    
     def get_state(self, ticker: str) -> dict:
         """Get state for a specific ticker"""
         return self.states.get(ticker, {})
@@ -59,20 +189,30 @@ class StateManager:
         """Get all states"""
         return self.states
     
-    def update_state(self, ticker: str, is_bullish: bool, status: str, score: int):
-        """Update state for a specific ticker"""
-        now = datetime.now().isoformat()
+    def update_state(self, ticker: str, is_bullish: bool, status: str, score: int,
+                     track_changes: bool = True):
+        """
+        Update state for a specific ticker (track_changes=False when a diff supplies the change log)
         
+        An unchanged state is left as is, so updated_at is the time of the last
+        change and save() only writes the tickers that changed.
+        """
         previous = self.states.get(ticker, {})
+        if ticker in self.states and (previous.get('is_bullish'), previous.get('status'), previous.get('score')) == (is_bullish, status, score):
+            return
         
         self.states[ticker] = {
             'is_bullish': is_bullish,
             'status': status,
             'score': score,
-            'updated_at': now,
+            'updated_at': datetime.now().isoformat(),
             'previous_is_bullish': previous.get('is_bullish'),
             'previous_status': previous.get('status')
         }
+        self._dirty.add(ticker)
+        
+        if track_changes:
+            self._changes.append((ticker, is_bullish, status, score))
     
     def update_from_scan_result(self, result):
         """Update state from ScanResult object"""
@@ -83,6 +223,36 @@ class StateManager:
             score=result.score
         )
     
+    def update_from_diff(self, results: dict, changes: List[tuple]):
+        """
+        Update states from a full results set using a precomputed change log
+        
+        Args:
+            results: Dictionary of {ticker: ScanResult}
+            changes: ScanDiff.changes - (ticker, is_bullish, status, score) tuples
+        """
+        for result in results.values():
+            self.update_state(result.ticker, bool(result.is_bullish), result.status, result.score,
+                              track_changes=False)
+        self._changes.extend(changes)
+    
+    def get_last_flip(self, ticker: str, bullish: bool = True) -> Optional[datetime]:
+        """When did ticker last flip bullish (or bearish), from the journal index"""
+        return self.journal.get_last_flip(ticker, bullish)
+    
+    def get_transitions(self, ticker: str, limit: int = 50) -> List[dict]:
+        """Get latest journaled state transitions of a ticker"""
+        return self.journal.get_transitions(ticker, limit)
+    
+    def record_history(self, results: dict, session_date: str = None):
+        """Write this session's score/status/signals for all results"""
+        session_date = session_date or last_trading_day().strftime('%Y-%m-%d')
+        self.history.write_session(results, session_date)
+    
+    def get_history(self, ticker: str, start: str = None, end: str = None) -> List[dict]:
+        """Get per-session score/status/signal history of a ticker"""
+        return self.history.query(ticker, start, end)
+    
     def is_new_bullish(self, ticker: str, current_is_bullish: bool) -> bool:
         """Check if stock just turned bullish"""
         prev_state = self.get_state(ticker)
@@ -114,80 +284,52 @@ class StateManager:
     def clear_all(self):
         """Clear all states (useful for testing)"""
         self.states = {}
+        self._dirty.clear()
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM stock_states")
+    
+    def close(self):
+        """Flush pending states and alerts and close the database"""
         self.save()
+        self.flush_alerts()
+        self.conn.close()
     
     # ============================================
     # DAILY ALERT TRACKING
     # ============================================
     
-    def _load_daily_alerts(self):
-        """Load daily alerts from file"""
-        try:
-            if os.path.exists(self.daily_alerts_file):
-                with open(self.daily_alerts_file, 'r') as f:
-                    self.daily_alerts = json.load(f)
-                
-                # Check if it's a new day - reset if so
-                today = datetime.now().strftime('%Y-%m-%d')
-                if self.daily_alerts.get('date') != today:
-                    self._reset_daily_alerts()
-            else:
-                self._reset_daily_alerts()
-        except Exception as e:
-            logger.error(f"Error loading daily alerts: {str(e)}")
-            self._reset_daily_alerts()
-    
-    def _reset_daily_alerts(self):
-        """Reset daily alerts for a new day"""
-        today = datetime.now().strftime('%Y-%m-%d')
-        self.daily_alerts = {
-            'date': today,
-            'bullish_break': [],
-            'bearish_break': [],
-            'stoch_crossover': [],
-            'accumulation': [],
-            'early_entry': []
-        }
-        self._save_daily_alerts()
-        logger.info(f"Daily alerts reset for {today}")
-    
-    def _save_daily_alerts(self):
-        """Save daily alerts to file"""
-        try:
-            with open(self.daily_alerts_file, 'w') as f:
-                json.dump(self.daily_alerts, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving daily alerts: {str(e)}")
-    
     def is_already_alerted(self, signal_type: str, ticker: str) -> bool:
         """Check if stock was already alerted for this signal type today"""
         # Make sure we're on the same day
-        today = datetime.now().strftime('%Y-%m-%d')
-        if self.daily_alerts.get('date') != today:
-            self._reset_daily_alerts()
-        
-        return ticker in self.daily_alerts.get(signal_type, [])
+        self.alert_ledger.reset_if_new_day()
+        return self.alert_ledger.is_alerted(signal_type, ticker)
+    
+    def get_alerted_stocks(self, signal_type: str) -> set:
+        """Get set of stocks already alerted for this signal type today"""
+        self.alert_ledger.reset_if_new_day()
+        return self.alert_ledger.get_alerted(signal_type)
     
     def add_alerted_stock(self, signal_type: str, ticker: str):
-        """Mark stock as alerted for this signal type today"""
-        if signal_type not in self.daily_alerts:
-            self.daily_alerts[signal_type] = []
-        
-        if ticker not in self.daily_alerts[signal_type]:
-            self.daily_alerts[signal_type].append(ticker)
-            self._save_daily_alerts()
+        """Mark stock as alerted for this signal type today (written on flush_alerts)"""
+        self.alert_ledger.mark(signal_type, [ticker])
     
     def add_alerted_stocks(self, signal_type: str, tickers: List[str]):
-        """Mark multiple stocks as alerted"""
-        for ticker in tickers:
-            self.add_alerted_stock(signal_type, ticker)
+        """Mark multiple stocks as alerted (written on flush_alerts)"""
+        self.alert_ledger.mark(signal_type, tickers)
+    
+    def remove_alerted_stocks(self, signal_type: str, tickers: List[str]) -> int:
+        """Unmark stocks whose alert could not be delivered (alerted again next cycle)"""
+        return self.alert_ledger.unmark(signal_type, tickers)
+    
+    def flush_alerts(self):
+        """Write all alerts marked this cycle in one transaction"""
+        self.alert_ledger.flush()
     
     def get_daily_summary(self) -> dict:
         """Get summary of all stocks alerted today per signal type"""
-        return self.daily_alerts.copy()
+        return self.alert_ledger.get_summary()
     
     def reset_daily_if_new_day(self):
-        """Check and reset if it's a new day"""
-        today = datetime.now().strftime('%Y-%m-%d')
-        if self.daily_alerts.get('date') != today:
-            self._reset_daily_alerts()
+        """Check and reset if it's a new day (also compacts the state journal)"""
+        if self.alert_ledger.reset_if_new_day():
+            self.journal.compact()
@@ -5,7 +5,9 @@
 import sys
 import os
 import logging
+import time
 from datetime import datetime
+from typing import Dict, Tuple
 import pytz
 
 # Add project root to path
@@ -13,10 +15,20 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config.settings import *
 from config.stocks_list import get_all_stocks, get_stock_count
-from core.data_fetcher import fetch_multiple_stocks
-from core.scanner import scan_all_stocks, filter_signals, filter_all_current_signals, has_any_signal
+from core.data_fetcher import fetch_multiple_stocks, fetch_latest_bars, merge_latest_bars, bars_changed, set_cached_data, get_last_fetch_stats, get_fetch_cache
+from core.scanner import ScanResult, scan_all_stocks, filter_all_current_signals, has_any_signal, results_to_table, SIGNAL_COLUMNS, get_indicator_cache
+from core.diff_engine import diff_scan, states_to_table
+from core.results_cache import get_results_cache
+from core.market_calendar import is_market_open, is_trading_day, last_trading_day, get_cache_ttl
 from database.state_manager import StateManager
-from notifications.telegram_bot import send_all_alerts, send_startup_message, send_daily_recap_message, send_morning_recap_message
+from database.session_store import SessionStore
+from database.outbox import parse_alert_key
+from notifications.telegram_bot import send_all_alerts, send_startup_message, send_daily_recap_message, send_morning_recap_message, flush_telegram_queue, queue_telegram_message
+from notifications.delivery import get_delivery_worker
+from notifications.coalescer import AlertCoalescer
+from monitoring.metrics import start_cycle, end_cycle, FETCH_CACHE_HIT_RATIO
+from monitoring.memory import get_memory_monitor
+from monitoring.profiler import consume_profile_request, profile_call
 
 # Setup logging
 # Ensure directories exist BEFORE setting up file handlers
@@ -39,40 +51,121 @@ WIB = pytz.timezone('Asia/Jakarta')
 
 
 def is_trading_hours() -> bool:
-    """Check if current time is within trading hours"""
-    now = datetime.now(WIB)
-    
-    # Skip weekends
-    if now.weekday() >= 5:  # Saturday = 5, Sunday = 6
-        return False
-    
-    # Check trading hours (09:00 - 16:00 WIB)
-    current_time = now.hour * 100 + now.minute
-    start_time = TRADING_START_HOUR * 100 + TRADING_START_MINUTE
-    end_time = TRADING_END_HOUR * 100 + TRADING_END_MINUTE
+    """
+    Check if a trading session is running
     
-    return start_time <= current_time <= end_time
+    Uses the IDX market calendar: weekends, holidays and the midday
+    break (longer on Friday) are all outside trading hours.
+    """
+    return is_market_open(datetime.now(WIB))
 
 
 def is_evening_scan_time() -> bool:
-    """Check if current time is evening scan time (18:00)"""
+    """Check if current time is evening scan time (18:00 on a trading day)"""
     now = datetime.now(WIB)
-    return now.hour == 18 and now.minute <= 5
+    return is_trading_day(now.date()) and now.hour == 18 and now.minute <= 5
 
 
 def is_end_of_trading() -> bool:
-    """Check if current time is end of trading session (16:00)"""
+    """Check if current time is end of trading session (16:00 on a trading day)"""
     now = datetime.now(WIB)
-    return now.hour == TRADING_END_HOUR and now.minute <= 5
+    return is_trading_day(now.date()) and now.hour == TRADING_END_HOUR and now.minute <= 5
+
+
+def deliver_alerts(state_manager: StateManager, signals: dict) -> bool:
+    """
+    Queue alert messages and mark the stocks as alerted for today
+    
+    Returns:
+        True if the messages were durably queued
+    """
+    messages_queued = send_all_alerts(signals)
+    
+    if messages_queued is None:
+        # Not durably queued: leave unmarked so the next attempt retries
+        logger.error("Alerts could not be stored in the outbox, will retry")
+        return False
+    
+    logger.info(f"Queued {messages_queued} alert messages")
+    
+    # Mark these stocks as alerted for today (one ledger write per batch)
+    for signal_type, results in signals.items():
+        state_manager.add_alerted_stocks(signal_type, [r.ticker for r in results])
+    state_manager.flush_alerts()
+    return True
+
+
+def requeue_undelivered_alerts(state_manager: StateManager) -> int:
+    """
+    Unmark today's alerts whose delivery was given up on, so this cycle sends them again
+    
+    The ledger is updated before the outbox keys are released: a crash in
+    between leaves the keys, and the next cycle repeats the release.
+    
+    Returns:
+        Number of alerts unmarked
+    """
+    outbox = get_delivery_worker().outbox
+    if outbox is None:
+        return 0
+    
+    try:
+        keys = outbox.get_failed_keys()
+    except Exception as e:
+        logger.error(f"Error reading undelivered alerts: {str(e)}")
+        return 0
+    if not keys:
+        return 0
+    
+    today = datetime.now(WIB).strftime('%Y-%m-%d')
+    undelivered = {}
+    for key in keys:
+        date, signal_type, ticker, _ = parse_alert_key(key)
+        if date == today:  # Earlier days' alerts have expired
+            undelivered.setdefault(signal_type, set()).add(ticker)
+    
+    unmarked = sum(state_manager.remove_alerted_stocks(signal_type, tickers)
+                   for signal_type, tickers in undelivered.items())
+    try:
+        outbox.release_keys(keys)
+    except Exception as e:
+        logger.error(f"Error releasing undelivered alerts: {str(e)}")
+    logger.warning(f"{len(keys)} alerts could not be delivered, {unmarked} of today's are sent again this cycle")
+    return unmarked
 
 
-def run_scan(state_manager: StateManager, force: bool = False) -> dict:
+def flush_coalesced_alerts(state_manager: StateManager, coalescer: AlertCoalescer, force: bool = False) -> int:
+    """
+    Send the coalesced digest if its window has ended (or force)
+    
+    Returns:
+        Number of signals sent
+    """
+    if coalescer is None or not (coalescer.is_due() or (force and coalescer.pending_count())):
+        return 0
+    
+    first_at = time.time() - coalescer.oldest_age()
+    count = coalescer.pending_count()
+    logger.info(f"Sending digest of {count} signals (oldest waited {coalescer.oldest_age():.0f}s)...")
+    
+    signals = coalescer.drain()
+    if not deliver_alerts(state_manager, signals):
+        coalescer.restore(signals, first_at)
+        return 0
+    return count
+
+
+def run_scan(state_manager: StateManager, force: bool = False, session_store: SessionStore = None,
+             coalescer: AlertCoalescer = None) -> dict:
     """
     Run a single scan cycle
     
     Args:
         state_manager: StateManager instance
         force: If True, run even outside trading hours
+        session_store: Optional SessionStore to keep this cycle's results and bars
+        coalescer: Optional AlertCoalescer; new signals are buffered into a
+            digest instead of being sent right away
     
     Returns:
         Dictionary with scan results summary
@@ -85,6 +178,8 @@ def run_scan(state_manager: StateManager, force: bool = False) -> dict:
     logger.info("="*50)
     logger.info("Starting IHSG Supertrend Scan")
     logger.info("="*50)
+    start_cycle()
+    get_memory_monitor().start_cycle()
     
     # Get stock list
     stocks = get_all_stocks()
@@ -93,10 +188,13 @@ def run_scan(state_manager: StateManager, force: bool = False) -> dict:
     # Fetch data
     logger.info("Fetching data from Yahoo Finance...")
     stock_data = fetch_multiple_stocks(stocks, period=DATA_PERIOD, interval=DATA_INTERVAL)
-    logger.info(f"Fetched data for {len(stock_data)} stocks")
+    fetch_stats = get_last_fetch_stats()
+    FETCH_CACHE_HIT_RATIO.set(fetch_stats['hit_ratio'])
+    logger.info(f"Fetched data for {len(stock_data)} stocks (cache hit ratio {fetch_stats['hit_ratio']:.0%})")
     
     if len(stock_data) == 0:
         logger.error("No data fetched. Aborting scan.")
+        end_cycle(SCAN_CYCLE_BUDGET_SECONDS)
         return {'error': 'No data fetched'}
     
     # Get previous states
@@ -104,42 +202,61 @@ def run_scan(state_manager: StateManager, force: bool = False) -> dict:
     
     # Reset daily alerts if new day
     state_manager.reset_daily_if_new_day()
+    requeue_undelivered_alerts(state_manager)
     
     # Scan all stocks
     logger.info("Analyzing stocks...")
     results = scan_all_stocks(stock_data, previous_states)
     
-    # Filter signals
-    all_signals = filter_signals(results)
+    # Diff against previous cycle (transitions + new signals in one pass)
+    table = results_to_table(results)
+    alerted = {signal_type: state_manager.get_alerted_stocks(signal_type) for signal_type in SIGNAL_COLUMNS}
+    if coalescer is not None:
+        # Buffered signals are already on their way - not new again
+        for signal_type, tickers in coalescer.buffered_tickers().items():
+            alerted[signal_type] = alerted.get(signal_type, set()) | tickers
+    diff = diff_scan(table, states_to_table(previous_states), alerted)
+    
+    # Publish for bot commands and the query API
+    get_results_cache().update(results, table)
+    
+    if diff.new_bullish or diff.new_bearish or diff.status_upgrades:
+        logger.info(f"Transitions: {len(diff.new_bullish)} new bullish, {len(diff.new_bearish)} new bearish, "
+                    f"{len(diff.status_upgrades)} upgraded to STRONG BUY")
     
-    # Filter for NEW signals only (not already alerted today)
+    # NEW signals only (not already alerted today)
     new_signals = {}
-    for signal_type, signal_list in all_signals.items():
-        new_only = [r for r in signal_list if not state_manager.is_already_alerted(signal_type, r.ticker)]
-        new_signals[signal_type] = new_only
+    for signal_type, tickers in diff.new_signals.items():
+        new_signals[signal_type] = [results[t] for t in tickers]
         
         # Log signal counts
-        if len(signal_list) > 0:
-            logger.info(f"  {signal_type}: {len(signal_list)} total, {len(new_only)} new")
+        total = diff.signal_counts[signal_type]
+        if total > 0:
+            logger.info(f"  {signal_type}: {total} total, {len(tickers)} new")
     
     # Send alerts for NEW signals only
     if has_any_signal(new_signals):
-        logger.info("Sending Telegram alerts for NEW signals...")
-        messages_sent = send_all_alerts(new_signals)
-        logger.info(f"Sent {messages_sent} alert messages")
-        
-        # Mark these stocks as alerted for today
-        for signal_type, signal_list in new_signals.items():
-            for r in signal_list:
-                state_manager.add_alerted_stock(signal_type, r.ticker)
+        if coalescer is not None:
+            added = coalescer.add(new_signals)
+            logger.info(f"Buffered {added} NEW signals for digest ({coalescer.pending_count()} pending)")
+        else:
+            logger.info("Sending Telegram alerts for NEW signals...")
+            deliver_alerts(state_manager, new_signals)
     else:
         logger.info("No NEW signals detected this scan")
     
+    flush_coalesced_alerts(state_manager, coalescer)
+    
     # Update states
     logger.info("Updating stock states...")
-    for ticker, result in results.items():
-        state_manager.update_from_scan_result(result)
+    state_manager.update_from_diff(results, diff.changes)
     state_manager.save()
+    state_manager.record_history(results)
+    
+    # Keep latest results and bars for the evening scan and a warm restart
+    if session_store is not None:
+        session_store.update(results, stock_data, table=table)
+        session_store.save()
     
     # Summary
     summary = {
@@ -152,15 +269,32 @@ def run_scan(state_manager: StateManager, force: bool = False) -> dict:
         'timestamp': datetime.now(WIB).isoformat()
     }
     
+    stages = end_cycle(SCAN_CYCLE_BUDGET_SECONDS)
+    memory = get_memory_monitor().end_cycle()
     logger.info("Scan complete!")
     logger.info(f"Summary: {summary}")
+    logger.info("Stage timings: " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in stages.items()))
+    logger.info(f"Memory: RSS {memory['rss_mb']:.0f} MB ({memory['rss_delta_mb']:+.1f} MB)"
+                + "".join(f", {stage} {kept:+.1f}/{peak:.1f} MB" for stage, (kept, peak) in memory['stages'].items()))
+    for cache in (get_fetch_cache(), get_indicator_cache()):
+        stats = cache.stats()
+        logger.info(f"Frame cache {cache.name}: {stats['bytes'] / 2**20:.0f}/{stats['max_bytes'] / 2**20:.0f} MB, "
+                    f"{stats['entries']} entries, {stats['evictions']} evicted, hit ratio {stats['hit_ratio']:.0%}")
+    if memory['growth_alert']:
+        queue_telegram_message(f"⚠️ <b>Peringatan Memori</b>\n\n{memory['growth_alert']}\n"
+                               f"Cek {MEMORY_REPORT_FILE} (MEMORY_TRACKING=1) untuk lokasi alokasi.")
     logger.info("="*50)
     
     return summary
 
 
-def main():
-    """Main entry point"""
+def main(profile: str = None):
+    """
+    Main entry point
+    
+    Args:
+        profile: Profile the scan ('sample' or 'cprofile'); default from SCAN_PROFILE
+    """
     # Ensure logs directory exists
     os.makedirs('logs', exist_ok=True)
     os.makedirs('database', exist_ok=True)
@@ -176,7 +310,14 @@ def main():
         logger.info("This is to establish baseline states for all stocks.")
     
     # Run scan
-    run_scan(state_manager, force=True)  # force=True for testing
+    profile = profile or consume_profile_request()
+    if profile:
+        profile_call(profile, run_scan, state_manager, force=True)  # Reports under logs/profiles/
+    else:
+        run_scan(state_manager, force=True)  # force=True for testing
+    
+    # Alerts are sent in the background - deliver them before exiting
+    flush_telegram_queue()
 
 
 def run_with_notification():
@@ -192,9 +333,10 @@ def run_with_notification():
     # Initialize and run
     state_manager = StateManager()
     run_scan(state_manager, force=True)
+    flush_telegram_queue()
 
 
-def send_end_of_day_recap(state_manager: StateManager):
+def send_end_of_day_recap(state_manager: StateManager, session_store: SessionStore = None):
     """
     Send end-of-day recap with ALL stocks that triggered signals today.
     This is called at 16:00 (end of trading session).
@@ -203,6 +345,10 @@ def send_end_of_day_recap(state_manager: StateManager):
     logger.info("SENDING END-OF-DAY RECAP")
     logger.info("="*50)
     
+    # Checkpoint last intraday cycle to disk for the evening scan
+    if session_store is not None:
+        session_store.save()
+    
     # Get all daily signals
     daily_summary = state_manager.get_daily_summary()
     
@@ -221,35 +367,151 @@ def send_end_of_day_recap(state_manager: StateManager):
     logger.info("="*50)
 
 
-def run_evening_scan(state_manager: StateManager):
+def refresh_session_bars(session: dict) -> Tuple[Dict[str, ScanResult], bool]:
+    """
+    Bring a stored session up to the final daily bars with one delta refresh
+    
+    Only tickers whose last bar changed are re-analyzed; the rest keep
+    their stored ScanResult.
+    
+    Returns:
+        Tuple of ({ticker: ScanResult} for the whole session, True if the
+        batch covered every ticker - otherwise some bars are still the
+        stored ones and the session keeps its date and bars_final)
+    """
+    stock_data = session['stock_data']
+    results = dict(session['results'])
+    
+    logger.info("Refreshing latest daily bars (single batched request)...")
+    latest_bars = fetch_latest_bars(list(stock_data.keys()))
+    
+    if not latest_bars:
+        logger.warning("Delta refresh returned nothing. Using stored bars as-is.")
+        return results, False
+    
+    missing = len(set(stock_data) - set(latest_bars))
+    if missing:
+        logger.warning(f"Delta refresh missed {missing} stocks, their stored bars are kept")
+    
+    changed_data = {}
+    for ticker, latest in latest_bars.items():
+        old_df = stock_data.get(ticker)
+        if old_df is None:
+            continue
+        new_df = merge_latest_bars(old_df, latest)
+        if bars_changed(old_df, new_df):
+            stock_data[ticker] = new_df
+            changed_data[ticker] = new_df
+    
+    logger.info(f"Re-analyzing {len(changed_data)} stocks with changed final bars...")
+    results.update(scan_all_stocks(changed_data))
+    
+    return results, missing == 0
+
+
+def resume_session(session_store: SessionStore) -> bool:
+    """
+    Resume from the stored session after a restart instead of a full scan
+    
+    Stale bars get one batched delta refresh (only changed tickers are
+    re-analyzed); the bars seed the fetch cache and the results answer
+    bot commands and the query API right away. States and alerts are
+    left to the next scan cycle. If the refresh fails the session keeps
+    its original date and bars_final, and the cached bars are seeded
+    already expired so the next fetch revalidates them.
+    
+    Returns:
+        True if resumed, False if a full scan is needed
+    """
+    session = session_store.get_resumable()
+    if session is None:
+        return False
+    
+    started = time.time()
+    logger.info(f"Resuming session {session['session_date']} ({len(session['results'])} results, "
+                f"captured {session['captured_at']})")
+    
+    if session['bars_final'] and session['session_date'] == last_trading_day().strftime('%Y-%m-%d'):
+        results = session['results']
+        table = session.get('table')
+        current = True
+    else:
+        results, current = refresh_session_bars(session)
+        table = None
+    if table is None:
+        table = results_to_table(results)
+    
+    stock_data = session['stock_data']
+    ttl = get_cache_ttl() if current else -1
+    for ticker, df in stock_data.items():
+        set_cached_data(ticker, DATA_PERIOD, DATA_INTERVAL, df, ttl)
+    
+    get_results_cache().update(results, table)
+    if current:
+        session_store.update(results, stock_data, table=table)
+    else:
+        session_store.update(results, stock_data, bars_final=session['bars_final'], table=table,
+                             session_date=session['session_date'])
+    session_store.save()
+    
+    logger.info(f"Resumed {len(results)} results in {time.time() - started:.1f}s (no full scan)")
+    return True
+
+
+def run_evening_scan(state_manager: StateManager, session_store: SessionStore = None):
     """
     Run evening scan at 18:00 PM.
-    Scans ALL stocks and sends recap of ALL matching signals (not just new).
+    Sends recap of ALL matching signals (not just new).
     This gives users a complete overview after market closes.
+    
+    Reuses the last intraday cycle from session_store (plus at most one
+    delta refresh of the final bars); falls back to a full scan otherwise.
     """
     logger.info("="*50)
     logger.info("EVENING SCAN - 18:00 OVERVIEW")
     logger.info("="*50)
     
-    # Get stock list
-    stocks = get_all_stocks()
-    logger.info(f"Morning scan: {len(stocks)} stocks...")
+    session_date = last_trading_day().strftime('%Y-%m-%d')
+    session = session_store.get_session(session_date) if session_store is not None else None
     
-    # Fetch data
-    logger.info("Fetching data from Yahoo Finance...")
-    stock_data = fetch_multiple_stocks(stocks, period=DATA_PERIOD, interval=DATA_INTERVAL)
-    logger.info(f"Fetched data for {len(stock_data)} stocks")
-    
-    if len(stock_data) == 0:
-        logger.error("No data fetched. Aborting morning scan.")
-        return
-    
-    # Get previous states
-    previous_states = state_manager.get_all_states()
+    if session is not None:
+        logger.info(f"Reusing session {session_date} ({len(session['results'])} results, "
+                    f"captured {session['captured_at']})")
+        
+        if session['bars_final']:
+            results, final = session['results'], True
+        else:
+            results, final = refresh_session_bars(session)
+        
+        session_store.update(results, session['stock_data'], bars_final=final, session_date=session_date)
+        session_store.save()
+    else:
+        # Get stock list
+        stocks = get_all_stocks()
+        logger.info(f"No stored session. Full evening scan: {len(stocks)} stocks...")
+        
+        # Fetch data
+        logger.info("Fetching data from Yahoo Finance...")
+        stock_data = fetch_multiple_stocks(stocks, period=DATA_PERIOD, interval=DATA_INTERVAL)
+        logger.info(f"Fetched data for {len(stock_data)} stocks")
+        
+        if len(stock_data) == 0:
+            logger.error("No data fetched. Aborting evening scan.")
+            return
+        
+        # Get previous states
+        previous_states = state_manager.get_all_states()
+        
+        # Scan all stocks
+        logger.info("Analyzing stocks for evening recap...")
+        results = scan_all_stocks(stock_data, previous_states)
+        
+        if session_store is not None:
+            session_store.update(results, stock_data)
+            session_store.save()
     
-    # Scan all stocks
-    logger.info("Analyzing stocks for morning recap...")
-    results = scan_all_stocks(stock_data, previous_states)
+    # Final bars of the session answer bot commands / API until the next scan
+    get_results_cache().update(results)
     
     # Get ALL current matching signals (not filtering for new-only)
     all_current_signals = filter_all_current_signals(results)
@@ -258,11 +520,11 @@ def run_evening_scan(state_manager: StateManager):
     total_signals = sum(len(v) for v in all_current_signals.values())
     
     if total_signals == 0:
-        logger.info("No matching signals found in morning scan.")
+        logger.info("No matching signals found in evening scan.")
         return
     
-    # Send morning recap message
-    logger.info(f"Sending morning recap with {total_signals} total signals...")
+    # Send evening recap message
+    logger.info(f"Sending evening recap with {total_signals} total signals...")
     send_morning_recap_message(all_current_signals)
     
     # Update states
@@ -270,11 +532,19 @@ def run_evening_scan(state_manager: StateManager):
     for ticker, result in results.items():
         state_manager.update_from_scan_result(result)
     state_manager.save()
+    state_manager.record_history(results)
     
-    logger.info("Morning scan complete!")
+    logger.info("Evening scan complete!")
     logger.info("="*50)
 
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Run one IHSG scan")
+    parser.add_argument('--profile', nargs='?', const='sample', choices=['sample', 'cprofile'],
+                        help="Profile the scan (default: sample) and write reports to logs/profiles/")
+    args = parser.parse_args()
+    
     # For testing, use force=True to run outside trading hours
-    main()
+    main(profile=args.profile)
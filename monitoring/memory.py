@@ -0,0 +1,228 @@
+# ============================================
+# MEMORY ACCOUNTING - RSS PER CYCLE, TRACEMALLOC PER STAGE
+# ============================================
+# RSS is sampled at the end of every scan cycle. With MEMORY_TRACKING=1,
+# tracemalloc also accounts memory per timed stage (retained and peak)
+# and reports the allocation sites that grew since the first cycle
+# (logs/memory_sites.txt).
+
+import os
+import threading
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from typing import Optional
+import logging
+
+from config.settings import (
+    MEMORY_TRACKING, MEMORY_TRACE_FRAMES, MEMORY_TOP_SITES, MEMORY_REPORT_FILE,
+    MEMORY_GROWTH_CYCLES, MEMORY_GROWTH_MIN_MB
+)
+from .metrics import registry, set_stage_hook
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+RSS_BYTES = registry.gauge("process_resident_memory_bytes", "Resident set size at the end of the last scan cycle")
+TRACED_BYTES = registry.gauge("scanner_traced_memory_bytes", "tracemalloc traced memory at the end of the last cycle")
+STAGE_RETAINED_BYTES = registry.gauge(
+    "scanner_stage_retained_bytes", "Memory a stage left allocated in the last cycle (tracemalloc)", ['stage'])
+STAGE_PEAK_BYTES = registry.gauge(
+    "scanner_stage_peak_bytes", "Largest single-call allocation peak of a stage in the last cycle (tracemalloc)", ['stage'])
+GROWTH_ALERTS = registry.counter("scanner_memory_growth_alerts_total", "Monotonic RSS growth alerts")
+
+# Allocations of the accounting itself are not interesting
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def read_rss() -> int:
+    """Current resident set size in bytes (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return 0
+
+
+class MemoryMonitor:
+    """
+    Memory accounting per scan cycle with a growth alert
+
+    Acts as the timed() stage hook while tracking: each stage call records
+    what it left allocated and its allocation peak. Peaks are approximate
+    when stages nest or run concurrently in other threads.
+    """
+
+    def __init__(self, tracking: bool = MEMORY_TRACKING, growth_cycles: int = MEMORY_GROWTH_CYCLES,
+                 growth_min_mb: float = MEMORY_GROWTH_MIN_MB, top_sites: int = MEMORY_TOP_SITES,
+                 report_file: str = MEMORY_REPORT_FILE):
+        self.growth_cycles = growth_cycles
+        self.growth_min_mb = growth_min_mb
+        self.top_sites = top_sites
+        self.report_file = report_file
+        self.rss_history = deque(maxlen=growth_cycles + 1)
+        self.cycles = 0
+        self.tracking = False
+        self._lock = threading.Lock()
+        self._stage_retained = {}
+        self._stage_peak = {}
+        self._baseline = None  # Snapshot after the first tracked cycle
+        self._alerted = False
+        if tracking:
+            self.enable_tracking()
+
+    def enable_tracking(self):
+        """Start tracemalloc and per-stage accounting"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(MEMORY_TRACE_FRAMES)
+        set_stage_hook(self)
+        self.tracking = True
+        logger.info("Memory tracking enabled (tracemalloc)")
+
+    def disable_tracking(self):
+        """Stop per-stage accounting and tracemalloc"""
+        set_stage_hook(None)
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.tracking = False
+        self._baseline = None
+
+    # ============================================
+    # STAGE HOOK (called by timed)
+    # ============================================
+
+    def enter(self) -> Optional[int]:
+        if not tracemalloc.is_tracing():
+            return None
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        return current
+
+    def exit(self, stage: str, start: int):
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            self._stage_retained[stage] = self._stage_retained.get(stage, 0) + current - start
+            self._stage_peak[stage] = max(self._stage_peak.get(stage, 0), peak - start)
+
+    # ============================================
+    # CYCLES
+    # ============================================
+
+    def start_cycle(self):
+        """Reset per-stage accounting"""
+        with self._lock:
+            self._stage_retained = {}
+            self._stage_peak = {}
+
+    def end_cycle(self) -> dict:
+        """
+        Sample memory, update the site report and check for growth
+
+        Returns:
+            {'rss_mb', 'rss_delta_mb', 'traced_mb', 'stages': {stage: (retained_mb, peak_mb)},
+             'growth_alert': message or None}
+        """
+        self.cycles += 1
+        rss = read_rss()
+        previous = self.rss_history[-1] if self.rss_history else rss
+        self.rss_history.append(rss)
+        RSS_BYTES.set(rss)
+
+        with self._lock:
+            retained, peaks = self._stage_retained, self._stage_peak
+        stages = {stage: (retained.get(stage, 0) / MB, peaks.get(stage, 0) / MB) for stage in retained}
+        for stage, (kept, peak) in stages.items():
+            STAGE_RETAINED_BYTES.set(kept * MB, stage=stage)
+            STAGE_PEAK_BYTES.set(peak * MB, stage=stage)
+
+        traced = 0
+        if self.tracking and tracemalloc.is_tracing():
+            traced = tracemalloc.get_traced_memory()[0]
+            TRACED_BYTES.set(traced)
+            try:
+                self._write_site_report(rss, traced, stages)
+            except Exception as e:
+                logger.error(f"Error writing memory report: {str(e)}")
+
+        return {
+            'rss_mb': rss / MB,
+            'rss_delta_mb': (rss - previous) / MB,
+            'traced_mb': traced / MB,
+            'stages': stages,
+            'growth_alert': self._check_growth()
+        }
+
+    def _check_growth(self) -> Optional[str]:
+        """Alert once per streak of RSS growth over growth_cycles cycles"""
+        history = list(self.rss_history)
+        growing = len(history) == self.rss_history.maxlen and all(b > a for a, b in zip(history, history[1:]))
+        growth_mb = (history[-1] - history[0]) / MB if history else 0.0
+
+        if not growing or growth_mb < self.growth_min_mb:
+            self._alerted = False
+            return None
+        if self._alerted:
+            return None
+
+        self._alerted = True
+        GROWTH_ALERTS.inc()
+        message = (f"RSS grew in each of the last {self.growth_cycles} cycles "
+                   f"(+{growth_mb:.0f} MB, now {history[-1] / MB:.0f} MB)")
+        logger.warning(f"Possible memory leak: {message}")
+        return message
+
+    def growth_sites(self, limit: int = None) -> list:
+        """Allocation sites that grew most since the first tracked cycle"""
+        if not tracemalloc.is_tracing():
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        if self._baseline is None:
+            self._baseline = snapshot
+        return snapshot.compare_to(self._baseline, 'lineno')[:limit or self.top_sites]
+
+    def _write_site_report(self, rss: int, traced: int, stages: dict):
+        sites = self.growth_sites()
+        lines = [
+            f"Memory report - cycle {self.cycles} - {datetime.now().isoformat(timespec='seconds')}",
+            f"RSS {rss / MB:.1f} MB | traced {traced / MB:.1f} MB",
+            "",
+            f"{'stage':<16} {'retained MB':>12} {'peak MB':>9}",
+        ]
+        for stage, (kept, peak) in sorted(stages.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{stage:<16} {kept:12.2f} {peak:9.2f}")
+        lines += ["", f"Top allocation sites since cycle 1 (growth, total):"]
+        for stat in sites:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size_diff / 1024:+10.1f} KiB {stat.size / 1024:10.1f} KiB  "
+                         f"{frame.filename}:{frame.lineno}")
+
+        os.makedirs(os.path.dirname(self.report_file) or ".", exist_ok=True)
+        with open(self.report_file, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+
+
+# Module-level monitor shared by the scanner
+_monitor = None
+
+
+def get_memory_monitor() -> MemoryMonitor:
+    """Get the shared memory monitor (tracking per MEMORY_TRACKING)"""
+    global _monitor
+    if _monitor is None:
+        _monitor = MemoryMonitor()
+    return _monitor
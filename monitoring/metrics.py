@@ -0,0 +1,289 @@
+# ============================================
+# METRICS - COUNTERS, GAUGES, HISTOGRAMS (PROMETHEUS TEXT FORMAT)
+# ============================================
+# Stage timings:
+#   with timed('fetch'): ...        or        @timed('scoring')
+# Exposed by the query API on GET /metrics
+
+import bisect
+import functools
+import threading
+import time
+from typing import Dict, Sequence, Tuple
+
+# Latency buckets (seconds): per-ticker stages take ms, whole cycles take tens of seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0)
+
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...], extra: str = None) -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base: one metric family with optional labels"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        if not items and not self.label_names and self.kind != "histogram":
+            items = [((), 0)]
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value) -> list:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """Monotonic count"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def get(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """Observation counts per bucket, plus sum and count"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def get(self, **labels) -> Tuple[float, int]:
+        """(sum, count) of observations"""
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return (entry[1], entry[2]) if entry else (0.0, 0)
+
+    def _render_value(self, key, value) -> list:
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+        labels = _format_labels(self.label_names, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "scanner_stage_duration_seconds", "Duration of one stage call (per ticker for fetch/indicators/scoring)", ['stage'])
+CYCLE_STAGE_SECONDS = registry.gauge(
+    "scanner_cycle_stage_seconds", "Total time per stage in the last scan cycle", ['stage'])
+CYCLE_SECONDS = registry.histogram("scanner_cycle_duration_seconds", "Scan cycle duration")
+CYCLE_OVERRUNS = registry.counter("scanner_cycle_overruns_total", "Scan cycles longer than the budget")
+CYCLE_OVERRUN_SECONDS = registry.gauge("scanner_cycle_overrun_seconds", "Time over budget in the last scan cycle")
+CYCLES = registry.counter("scanner_cycles_total", "Completed scan cycles")
+TICKERS = registry.counter("scanner_tickers_total", "Tickers per fetch outcome (fetched, failed, cached, revalidated)", ['outcome'])
+FETCH_CACHE_HIT_RATIO = registry.gauge(
+    "scanner_fetch_cache_hit_ratio", "Share of tickers whose history came from the fetch cache in the last scan cycle")
+
+# Background delivery (outside the scan cycle)
+TELEGRAM_POST_SECONDS = registry.histogram("telegram_post_duration_seconds", "sendMessage round trip")
+TELEGRAM_MESSAGES = registry.counter("telegram_messages_total", "Delivery attempts per outcome (sent, retried, failed)", ['outcome'])
+ALERT_DELIVERY_SECONDS = registry.histogram("telegram_alert_latency_seconds", "Time from enqueue to sent")
+
+# Stage totals of the running cycle
+_cycle_lock = threading.Lock()
+_cycle_stages: Dict[str, float] = {}
+_cycle_started = None
+
+# Optional per-stage hook with enter() -> token and exit(stage, token) (memory accounting)
+_stage_hook = None
+
+
+def set_stage_hook(hook):
+    """Install (or remove with None) a hook called around every timed stage"""
+    global _stage_hook
+    _stage_hook = hook
+
+
+class timed:
+    """
+    Time a stage, as a context manager or decorator
+
+    Each call is observed in scanner_stage_duration_seconds and added to
+    the running cycle's total for the stage.
+    """
+
+    __slots__ = ('stage', '_start', '_token')
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        hook = _stage_hook
+        self._token = hook.enter() if hook is not None else None
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record_stage(self.stage, time.perf_counter() - self._start)
+        hook = _stage_hook
+        if hook is not None and self._token is not None:
+            hook.exit(self.stage, self._token)
+        return False
+
+    def __call__(self, func):
+        stage = self.stage
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            hook = _stage_hook
+            token = hook.enter() if hook is not None else None
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record_stage(stage, time.perf_counter() - start)
+                if hook is not None and token is not None:
+                    hook.exit(stage, token)
+        return wrapper
+
+
+def record_stage(stage: str, seconds: float):
+    """Record one stage duration measured elsewhere"""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    with _cycle_lock:
+        _cycle_stages[stage] = _cycle_stages.get(stage, 0.0) + seconds
+
+
+def start_cycle():
+    """Mark the start of a scan cycle (resets per-cycle stage totals)"""
+    global _cycle_started
+    with _cycle_lock:
+        _cycle_stages.clear()
+        _cycle_started = time.perf_counter()
+
+
+def end_cycle(budget: float = None) -> Dict[str, float]:
+    """
+    Mark the end of a scan cycle
+
+    Args:
+        budget: Cycle budget in seconds; a longer cycle counts as an overrun
+
+    Returns:
+        {stage: seconds} of this cycle, plus 'total'
+    """
+    global _cycle_started
+    with _cycle_lock:
+        if _cycle_started is None:
+            return {}
+        elapsed = time.perf_counter() - _cycle_started
+        stages = dict(_cycle_stages)
+        _cycle_started = None
+
+    CYCLES.inc()
+    CYCLE_SECONDS.observe(elapsed)
+    for stage, seconds in stages.items():
+        CYCLE_STAGE_SECONDS.set(seconds, stage=stage)
+    if budget is not None:
+        overrun = max(elapsed - budget, 0.0)
+        CYCLE_OVERRUN_SECONDS.set(overrun)
+        if overrun > 0:
+            CYCLE_OVERRUNS.inc()
+
+    stages['total'] = elapsed
+    return stages
+
+
+def render_metrics() -> str:
+    """All metrics in Prometheus text format"""
+    return registry.render()
@@ -0,0 +1,227 @@
+# ============================================
+# PROFILER - ON-DEMAND PROFILING OF ONE SCAN CYCLE
+# ============================================
+# python main.py --profile [sample|cprofile]
+# SCAN_PROFILE=sample python scheduler.py          (profiles the first cycle)
+# echo cprofile > logs/profile.request             (running scheduler: next cycle)
+#
+# Output in logs/profiles/scan_<timestamp>_*:
+#   .collapsed   collapsed stacks (flamegraph.pl / speedscope)  [sample]
+#   .prof        raw cProfile stats (pstats / snakeviz)          [cprofile]
+#   _top.txt     top functions
+#   _tickers.txt slowest analyze_stock calls
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+import logging
+
+import numpy as np
+
+from config.settings import (
+    SCAN_PROFILE, PROFILE_DIR, PROFILE_TRIGGER_FILE, PROFILE_SAMPLE_INTERVAL,
+    PROFILE_TOP_FUNCTIONS, PROFILE_TICKER_OUTLIERS
+)
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('sample', 'cprofile')
+
+# {ticker: (seconds, bars)} while a profiled cycle runs, None otherwise
+_ticker_timings: Optional[Dict[str, Tuple[float, int]]] = None
+_env_profile_used = False
+
+
+def get_ticker_timings() -> Optional[Dict[str, Tuple[float, int]]]:
+    """Per-ticker timing table of the running profile (None when not profiling)"""
+    return _ticker_timings
+
+
+def consume_profile_request() -> Optional[str]:
+    """
+    Profile mode requested for the next cycle, if any
+
+    SCAN_PROFILE applies once per process; the trigger file applies to
+    the next cycle and is removed.
+
+    Returns:
+        'sample', 'cprofile' or None
+    """
+    global _env_profile_used
+    if SCAN_PROFILE and not _env_profile_used:
+        _env_profile_used = True
+        return _normalize_mode(SCAN_PROFILE)
+
+    if not os.path.exists(PROFILE_TRIGGER_FILE):
+        return None
+    try:
+        with open(PROFILE_TRIGGER_FILE, 'r', encoding='utf-8') as f:
+            mode = f.read().strip()
+        os.remove(PROFILE_TRIGGER_FILE)
+    except OSError as e:
+        logger.error(f"Error reading profile trigger: {str(e)}")
+        return None
+    return _normalize_mode(mode)
+
+
+def _normalize_mode(mode: str) -> str:
+    mode = (mode or 'sample').strip().lower()
+    if mode in ('1', 'true', 'yes'):
+        return 'sample'
+    if mode not in PROFILE_MODES:
+        logger.warning(f"Unknown profile mode '{mode}', using sample")
+        return 'sample'
+    return mode
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's Python stack at a fixed interval
+
+    Runs in a background thread reading sys._current_frames(), so the
+    profiled code is not slowed by per-call hooks; cost is one stack walk
+    per interval.
+    """
+
+    def __init__(self, thread_id: int = None, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="scan-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Collapsed stack lines: 'outer;...;inner count'"""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = PROFILE_TOP_FUNCTIONS) -> str:
+        """Functions by own (leaf) and total (on stack) samples"""
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for name in set(stack):
+                total[name] += count
+
+        samples = max(self.samples, 1)
+        lines = [f"{self.samples} samples every {self.interval * 1000:.1f} ms", "",
+                 f"{'own %':>7} {'total %':>8}  function"]
+        for name, count in own.most_common(limit):
+            lines.append(f"{count / samples * 100:7.1f} {total[name] / samples * 100:8.1f}  {name}")
+        lines += ["", f"{'total %':>8}  function (cumulative)"]
+        for name, count in total.most_common(limit):
+            lines.append(f"{count / samples * 100:8.1f}  {name}")
+        return "\n".join(lines) + "\n"
+
+
+def profile_call(mode: str, func, *args, **kwargs):
+    """
+    Run func(*args, **kwargs) under a profiler and write the reports
+
+    Args:
+        mode: 'sample' (sampling, collapsed stacks) or 'cprofile' (deterministic)
+        func: Callable to profile, typically run_scan
+
+    Returns:
+        Whatever func returns
+    """
+    global _ticker_timings
+    mode = _normalize_mode(mode)
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, f"scan_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    logger.info(f"Profiling scan cycle ({mode}) -> {base}_*")
+
+    _ticker_timings = {}
+    profiler = cProfile.Profile() if mode == 'cprofile' else SamplingProfiler()
+    started = time.perf_counter()
+    try:
+        if mode == 'cprofile':
+            profiler.enable()
+        else:
+            profiler.start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if mode == 'cprofile':
+                profiler.disable()
+            else:
+                profiler.stop()
+    finally:
+        elapsed = time.perf_counter() - started
+        timings, _ticker_timings = _ticker_timings, None
+        try:
+            _write_reports(base, mode, profiler, timings, elapsed)
+        except Exception as e:
+            logger.error(f"Error writing profile reports: {str(e)}")
+
+
+def _write_reports(base: str, mode: str, profiler, timings: Dict[str, Tuple[float, int]], elapsed: float):
+    if mode == 'cprofile':
+        profiler.dump_stats(f"{base}.prof")
+        out = io.StringIO()
+        stats = pstats.Stats(profiler, stream=out)
+        stats.sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+        stats.sort_stats('tottime').print_stats(PROFILE_TOP_FUNCTIONS)
+        top = out.getvalue()
+    else:
+        with open(f"{base}.collapsed", 'w', encoding='utf-8') as f:
+            f.write(profiler.collapsed())
+        top = profiler.top_functions()
+
+    with open(f"{base}_top.txt", 'w', encoding='utf-8') as f:
+        f.write(f"Scan cycle: {elapsed:.2f}s ({mode})\n\n{top}")
+    with open(f"{base}_tickers.txt", 'w', encoding='utf-8') as f:
+        f.write(ticker_outliers_report(timings))
+
+    logger.info(f"Profile written: {base}_top.txt ({elapsed:.2f}s cycle, {len(timings)} tickers timed)")
+
+
+def ticker_outliers_report(timings: Dict[str, Tuple[float, int]], limit: int = PROFILE_TICKER_OUTLIERS) -> str:
+    """Distribution of analyze_stock times and the slowest tickers"""
+    if not timings:
+        return "No analyze_stock calls recorded\n"
+
+    seconds = np.array([t[0] for t in timings.values()])
+    median = float(np.median(seconds))
+    lines = [
+        f"analyze_stock: {len(seconds)} tickers, total {seconds.sum():.3f}s",
+        f"p50 {median * 1000:.2f} ms | p90 {np.percentile(seconds, 90) * 1000:.2f} ms | "
+        f"p99 {np.percentile(seconds, 99) * 1000:.2f} ms | max {seconds.max() * 1000:.2f} ms",
+        "",
+        f"{'ticker':<12} {'ms':>9} {'x p50':>7} {'bars':>6}"
+    ]
+    slowest = sorted(timings.items(), key=lambda item: item[1][0], reverse=True)[:limit]
+    for ticker, (took, bars) in slowest:
+        ratio = took / median if median > 0 else 0.0
+        lines.append(f"{ticker:<12} {took * 1000:9.2f} {ratio:7.1f} {bars:6d}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,60 @@
+# ============================================
+# STARTUP - COLD START TIMING
+# ============================================
+# Imported first by scheduler.py, so the clock starts with the process.
+# Milestones (seconds since start, also on /metrics):
+#   imports     scheduler modules loaded
+#   ready       state loaded, API up, startup message queued
+#   first_scan  first results published: initial scan or warm resume (time-to-first-scan)
+
+import time
+from typing import Dict
+import logging
+
+from config.settings import IMPORT_TIME_BUDGET_SECONDS
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+STARTUP_SECONDS = registry.gauge("scanner_startup_seconds", "Seconds from process start to each startup milestone", ['milestone'])
+
+_started = time.perf_counter()
+_milestones: Dict[str, float] = {}
+
+
+def mark_startup(milestone: str) -> float:
+    """
+    Record a startup milestone (first occurrence only)
+
+    Returns:
+        Seconds since process start
+    """
+    if milestone not in _milestones:
+        _milestones[milestone] = time.perf_counter() - _started
+        STARTUP_SECONDS.set(_milestones[milestone], milestone=milestone)
+    return _milestones[milestone]
+
+
+def get_startup_milestones() -> Dict[str, float]:
+    """{milestone: seconds since process start}"""
+    return dict(_milestones)
+
+
+def check_import_budget(budget: float = IMPORT_TIME_BUDGET_SECONDS) -> bool:
+    """
+    Warn when loading the scheduler modules took longer than the budget
+
+    Returns:
+        True if within budget (or not measured yet)
+    """
+    took = _milestones.get('imports')
+    if took is None or took <= budget:
+        return True
+    logger.warning(f"Slow cold start: imports took {took:.2f}s (budget {budget:.2f}s). "
+                   f"Run `python -X importtime scheduler.py` to find the module")
+    return False
+
+
+def startup_report() -> str:
+    """One-line summary of the startup milestones"""
+    return "Cold start: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in _milestones.items())
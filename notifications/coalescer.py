@@ -0,0 +1,88 @@
+# ============================================
+# ALERT COALESCER - DIGEST NEW SIGNALS ACROSS SCANS
+# ============================================
+
+import time
+from typing import Dict, List, Set
+import logging
+
+from config.settings import ALERT_COALESCE_SECONDS, ALERT_COALESCE_MAX_SIGNALS
+
+logger = logging.getLogger(__name__)
+
+
+class AlertCoalescer:
+    """
+    Buffer new signals over consecutive scans and release them as one digest
+
+    The buffer is due once the oldest signal has waited window_seconds or
+    max_signals are buffered, so an alert is never delayed by more than the
+    window (plus one scheduler tick).
+    """
+
+    def __init__(self, window_seconds: float = ALERT_COALESCE_SECONDS,
+                 max_signals: int = ALERT_COALESCE_MAX_SIGNALS):
+        self.window_seconds = window_seconds
+        self.max_signals = max_signals
+        self._buffer = {}        # signal_type -> {ticker: ScanResult} (insertion ordered)
+        self._first_at = None    # When the oldest buffered signal arrived
+
+    def add(self, signals: Dict[str, List], now: float = None) -> int:
+        """
+        Buffer new signals (a ticker already buffered for a type is skipped)
+
+        Args:
+            signals: Dictionary of signal types and their results
+
+        Returns:
+            Number of signals added
+        """
+        now = now if now is not None else time.time()
+        added = 0
+        for signal_type, results in signals.items():
+            bucket = self._buffer.setdefault(signal_type, {})
+            for result in results:
+                if result.ticker not in bucket:
+                    bucket[result.ticker] = result
+                    added += 1
+
+        if added and self._first_at is None:
+            self._first_at = now
+        return added
+
+    def pending_count(self) -> int:
+        """Number of buffered signals"""
+        return sum(len(bucket) for bucket in self._buffer.values())
+
+    def oldest_age(self, now: float = None) -> float:
+        """Seconds the oldest buffered signal has waited"""
+        if self._first_at is None:
+            return 0.0
+        return (now if now is not None else time.time()) - self._first_at
+
+    def buffered_tickers(self) -> Dict[str, Set[str]]:
+        """Get {signal_type: set(tickers)} waiting in the buffer"""
+        return {signal_type: set(bucket) for signal_type, bucket in self._buffer.items()}
+
+    def is_due(self, now: float = None) -> bool:
+        """Check if the buffer should be sent now"""
+        count = self.pending_count()
+        if count == 0:
+            return False
+        return count >= self.max_signals or self.oldest_age(now) >= self.window_seconds
+
+    def drain(self) -> Dict[str, List]:
+        """Take all buffered signals and empty the buffer"""
+        signals = {signal_type: list(bucket.values()) for signal_type, bucket in self._buffer.items() if bucket}
+        self._buffer = {}
+        self._first_at = None
+        return signals
+
+    def restore(self, signals: Dict[str, List], first_at: float):
+        """Put drained signals back (e.g. when they could not be queued)"""
+        for signal_type, results in signals.items():
+            bucket = {result.ticker: result for result in results}
+            bucket.update(self._buffer.get(signal_type, {}))
+            self._buffer[signal_type] = bucket
+        if self.pending_count():
+            self._first_at = min(first_at, self._first_at) if self._first_at is not None else first_at
@@ -0,0 +1,430 @@
+# ============================================
+# TELEGRAM DELIVERY - BACKGROUND SEND QUEUE
+# ============================================
+
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+import logging
+
+import pytz
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import (
+    TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_API_BASE_URL,
+    TELEGRAM_GLOBAL_RATE_PER_SEC, TELEGRAM_CHAT_MIN_INTERVAL, TELEGRAM_GROUP_RATE_PER_MIN,
+    TELEGRAM_TIMEOUT, TELEGRAM_MAX_ATTEMPTS, TELEGRAM_RETRY_MAX_SECONDS, DB_FILE
+)
+from database.outbox import Outbox
+from monitoring.metrics import TELEGRAM_POST_SECONDS, TELEGRAM_MESSAGES, ALERT_DELIVERY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Timezone
+WIB = pytz.timezone('Asia/Jakarta')
+
+# Shared pooled HTTP session (keep-alive to the Bot API)
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Get the shared pooled HTTP session"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
+
+
+def is_telegram_configured() -> bool:
+    """Check if bot token and chat id are set"""
+    return TELEGRAM_BOT_TOKEN != "YOUR_BOT_TOKEN_HERE" and TELEGRAM_CHAT_ID != "YOUR_CHAT_ID_HERE"
+
+
+def post_message(chat_id: str, message: str) -> Tuple[bool, float, str]:
+    """
+    POST one sendMessage request
+
+    Returns:
+        Tuple of (success, retry_after seconds or 0, error text)
+    """
+    if not is_telegram_configured():
+        logger.warning("Telegram not configured. Message would be:")
+        print("\n" + "="*50)
+        print(message)
+        print("="*50 + "\n")
+        return True, 0, ""
+
+    try:
+        url = f"{TELEGRAM_API_BASE_URL}/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+        payload = {
+            'chat_id': chat_id,
+            'text': message,
+            'parse_mode': 'HTML',
+            'disable_web_page_preview': True
+        }
+
+        response = get_session().post(url, json=payload, timeout=TELEGRAM_TIMEOUT)
+
+        if response.status_code == 200:
+            return True, 0, ""
+
+        retry_after = 0
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.json().get('parameters', {}).get('retry_after', 1))
+            except ValueError:
+                retry_after = float(response.headers.get('Retry-After', 1))
+        return False, retry_after, f"{response.status_code} - {response.text}"
+
+    except Exception as e:
+        return False, 0, str(e)
+
+
+def delivery_deadline(enqueued_at: float) -> float:
+    """Retry a message until the end of the day (WIB) it was queued on, when its alerts expire"""
+    day = datetime.fromtimestamp(enqueued_at, WIB).date() + timedelta(days=1)
+    return WIB.localize(datetime(day.year, day.month, day.day)).timestamp()
+
+
+def is_rejected(error: str) -> bool:
+    """The Bot API refused the message itself (4xx other than 429): retrying will not help"""
+    return error[:1] == '4' and not error.startswith('429')
+
+
+class DeliveryItem:
+    """Message waiting in the delivery queue"""
+    def __init__(self, chat_id: str, text: str, message_id: int = None, enqueued_at: float = None):
+        self.chat_id = chat_id
+        self.text = text
+        self.message_id = message_id  # Outbox row id (None if not persisted)
+        self.enqueued_at = enqueued_at or time.time()
+        self.deadline = delivery_deadline(self.enqueued_at)
+        self.attempts = 0  # Failed sends, not counting 429s
+        self.not_before = 0.0  # Backoff: do not send before this time
+
+
+class DeliveryWorker:
+    """
+    Background Telegram sender
+
+    The scan thread only enqueues; one worker thread sends through the
+    pooled session while respecting per-chat, per-group and global rate
+    limits, and backs off on 429 (retry_after) or errors. Failed sends are
+    retried until the end of the day; only a message the API rejects
+    (4xx) TELEGRAM_MAX_ATTEMPTS times is given up on earlier.
+
+    With an outbox, every message is committed before it is queued and
+    acknowledged after delivery; pending messages are reloaded on start.
+    """
+
+    def __init__(self, post=post_message, outbox: Outbox = None):
+        self._post = post
+        self.outbox = outbox
+        self._recovered = False
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._busy = False
+
+        # Rate limit state
+        self._global_sends = deque()  # Send times within the last second
+        self._chat_next = {}          # chat_id -> earliest next send time
+        self._group_sends = {}        # chat_id -> deque of send times within the last minute
+        self._paused_until = 0.0      # Global pause after a 429
+
+        # Metrics
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.latencies = deque(maxlen=1000)       # enqueue -> delivered (seconds)
+        self.http_latencies = deque(maxlen=1000)  # HTTP request time (seconds)
+
+    # ============================================
+    # PUBLIC API
+    # ============================================
+
+    def start(self):
+        """Start worker thread (idempotent)"""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            if not self._recovered:
+                self._recover()
+            self._thread = threading.Thread(target=self._run, name="telegram-delivery", daemon=True)
+            self._thread.start()
+
+    def submit(self, text: str, chat_id: str = None) -> bool:
+        """Hand a message to the worker and return immediately"""
+        return self.submit_batch([text], chat_id) is not None
+
+    def submit_batch(self, texts: List[str], chat_id: str = None, keys: List[str] = ()) -> Optional[int]:
+        """
+        Queue several messages as one unit
+
+        With an outbox the whole batch and its idempotency keys are committed
+        in one transaction before anything is queued.
+
+        Args:
+            texts: Message texts (sent in order)
+            chat_id: Target chat (default: TELEGRAM_CHAT_ID)
+            keys: Idempotency keys covered by the batch
+
+        Returns:
+            Number of messages queued (0 if the keys were already enqueued),
+            None if the outbox write failed
+        """
+        chat_id = chat_id or TELEGRAM_CHAT_ID
+        self.start()
+
+        message_ids = [None] * len(texts)
+        if self.outbox is not None:
+            try:
+                message_ids = self.outbox.enqueue_many([(chat_id, text) for text in texts], keys)
+            except Exception as e:
+                logger.error(f"Error writing outbox: {str(e)}")
+                return None
+
+        with self._cond:
+            for text, message_id in zip(texts, message_ids):
+                self._queue.append(DeliveryItem(chat_id, text, message_id))
+            self._cond.notify()
+        return len(message_ids)
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Wait until the queue is drained; returns False on timeout"""
+        deadline = time.time() + timeout
+        with self._cond:
+            while self._queue or self._busy:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(min(remaining, 0.5))
+        return True
+
+    def stop(self, timeout: float = 10.0):
+        """Drain queue (up to timeout) and stop the worker"""
+        self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def queue_depth(self) -> int:
+        """Number of messages waiting"""
+        with self._cond:
+            return len(self._queue)
+
+    def get_stats(self) -> dict:
+        """Delivery counters and latency percentiles (seconds)"""
+        def percentile(values, pct):
+            if not values:
+                return 0.0
+            ordered = sorted(values)
+            return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+        latencies = list(self.latencies)
+        http_latencies = list(self.http_latencies)
+        outbox_stats = {'depth': self.queue_depth(), 'oldest_age': 0.0, 'failed': 0}
+        if self.outbox is not None:
+            try:
+                outbox_stats = self.outbox.get_stats()
+            except Exception as e:
+                logger.error(f"Error reading outbox stats: {str(e)}")
+        return {
+            'sent': self.sent,
+            'failed': self.failed,
+            'retried': self.retried,
+            'queued': self.queue_depth(),
+            'latency_p50': percentile(latencies, 50),
+            'latency_p95': percentile(latencies, 95),
+            'latency_max': max(latencies) if latencies else 0.0,
+            'http_p50': percentile(http_latencies, 50),
+            'http_p95': percentile(http_latencies, 95),
+            'outbox_depth': outbox_stats['depth'],
+            'outbox_oldest_age': outbox_stats['oldest_age'],
+            'outbox_failed': outbox_stats['failed']
+        }
+
+    # ============================================
+    # OUTBOX
+    # ============================================
+
+    def _recover(self):
+        """Reload messages left pending by a previous run (called under lock)"""
+        self._recovered = True
+        if self.outbox is None:
+            return
+
+        try:
+            self.outbox.prune()
+            pending = self.outbox.get_pending()
+        except Exception as e:
+            logger.error(f"Error loading outbox: {str(e)}")
+            return
+
+        for message_id, chat_id, text, attempts, created_at, next_attempt_at in pending:
+            item = DeliveryItem(chat_id, text, message_id, enqueued_at=created_at)
+            item.attempts = attempts
+            item.not_before = next_attempt_at
+            self._queue.append(item)
+
+        if pending:
+            logger.info(f"Outbox: resuming {len(pending)} undelivered messages")
+
+    def _record_outcome(self, item: DeliveryItem, outcome: str, error: str = "", retry_at: float = 0.0):
+        """Persist delivery outcome of an outbox message"""
+        if self.outbox is None or item.message_id is None:
+            return
+        try:
+            if outcome == 'sent':
+                self.outbox.ack(item.message_id)
+            elif outcome == 'failed':
+                self.outbox.fail(item.message_id, error)
+            else:
+                self.outbox.retry_later(item.message_id, item.attempts, retry_at, error)
+        except Exception as e:
+            logger.error(f"Error updating outbox message {item.message_id}: {str(e)}")
+
+    # ============================================
+    # RATE LIMITS
+    # ============================================
+
+    def _ready_at(self, chat_id: str, now: float) -> float:
+        """Earliest time a message to chat_id may be sent"""
+        ready = max(now, self._paused_until, self._chat_next.get(chat_id, 0.0))
+
+        while self._global_sends and self._global_sends[0] <= now - 1.0:
+            self._global_sends.popleft()
+        if len(self._global_sends) >= TELEGRAM_GLOBAL_RATE_PER_SEC:
+            ready = max(ready, self._global_sends[0] + 1.0)
+
+        sends = self._group_sends.get(chat_id)
+        if sends is not None:
+            while sends and sends[0] <= now - 60.0:
+                sends.popleft()
+            if len(sends) >= TELEGRAM_GROUP_RATE_PER_MIN:
+                ready = max(ready, sends[0] + 60.0)
+
+        return ready
+
+    def _record_send(self, chat_id: str, now: float):
+        """Register a send for rate limiting"""
+        self._global_sends.append(now)
+        self._chat_next[chat_id] = now + TELEGRAM_CHAT_MIN_INTERVAL
+        if str(chat_id).startswith('-'):  # Groups and channels
+            self._group_sends.setdefault(chat_id, deque()).append(now)
+
+    def _next_item(self) -> Tuple[Optional[DeliveryItem], float]:
+        """Pick the first sendable item (FIFO per chat); else how long to wait"""
+        now = time.time()
+        wait = None
+        seen_chats = set()
+
+        for item in self._queue:
+            if item.chat_id in seen_chats:
+                continue  # Keep per-chat order
+            seen_chats.add(item.chat_id)
+
+            ready = max(self._ready_at(item.chat_id, now), item.not_before)
+            if ready <= now:
+                self._queue.remove(item)
+                return item, 0.0
+            wait = ready - now if wait is None else min(wait, ready - now)
+
+        return None, (wait if wait is not None else 1.0)
+
+    # ============================================
+    # WORKER LOOP
+    # ============================================
+
+    def _run(self):
+        while True:
+            with self._cond:
+                item, wait = self._next_item()
+                while item is None:
+                    if self._stopping:
+                        return
+                    self._cond.wait(wait)
+                    item, wait = self._next_item()
+                self._busy = True
+
+            try:
+                self._deliver(item)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _deliver(self, item: DeliveryItem):
+        """Send one item and handle retry/backoff"""
+        started = time.time()
+        with self._cond:
+            self._record_send(item.chat_id, started)
+
+        success, retry_after, error = self._post(item.chat_id, item.text)
+        finished = time.time()
+        self.http_latencies.append(finished - started)
+        TELEGRAM_POST_SECONDS.observe(finished - started)
+
+        if success:
+            self.sent += 1
+            self.latencies.append(finished - item.enqueued_at)
+            TELEGRAM_MESSAGES.inc(outcome='sent')
+            ALERT_DELIVERY_SECONDS.observe(finished - item.enqueued_at)
+            self._record_outcome(item, 'sent')
+            logger.info(f"Telegram message sent ({finished - item.enqueued_at:.2f}s after enqueue)")
+            return
+
+        if retry_after <= 0:
+            item.attempts += 1  # Being told to slow down is not a failed attempt
+        rejected = is_rejected(error) and item.attempts >= TELEGRAM_MAX_ATTEMPTS
+        if rejected or finished >= item.deadline:
+            self.failed += 1
+            TELEGRAM_MESSAGES.inc(outcome='failed')
+            self._record_outcome(item, 'failed', error)
+            reason = f"rejected {item.attempts} times" if rejected else "retried until the end of the day"
+            logger.error(f"Telegram error, giving up on message {item.message_id} ({reason}): {error}")
+            return
+
+        self.retried += 1
+        TELEGRAM_MESSAGES.inc(outcome='retried')
+        with self._cond:
+            if retry_after > 0:
+                # Told to slow down: pause all sends, not just this chat
+                self._paused_until = max(self._paused_until, finished + retry_after)
+                logger.warning(f"Telegram rate limited, retrying after {retry_after:.0f}s")
+            else:
+                item.not_before = finished + min(TELEGRAM_RETRY_MAX_SECONDS, 2 ** min(item.attempts, 16))
+                logger.warning(f"Telegram error (attempt {item.attempts}), will retry: {error}")
+            self._queue.appendleft(item)
+        self._record_outcome(item, 'retry', error, max(item.not_before, self._paused_until))
+
+
+# Module-level worker shared by the scanner
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_delivery_worker() -> DeliveryWorker:
+    """Get the shared delivery worker backed by the outbox (started on first submit)"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            outbox = None
+            try:
+                outbox = Outbox(DB_FILE)
+            except Exception as e:
+                logger.error(f"Error opening outbox, delivering from memory only: {str(e)}")
+            _worker = DeliveryWorker(outbox=outbox)
+        return _worker
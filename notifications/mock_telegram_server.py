@@ -0,0 +1,316 @@
+# ============================================
+# MOCK TELEGRAM BOT API - LOCAL TEST SERVER
+# ============================================
+# Usage:
+#   python -m notifications.mock_telegram_server --port 8081 --latency 0.1
+#   TELEGRAM_API_BASE_URL=http://127.0.0.1:8081 python scheduler.py
+
+import json
+import math
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import logging
+
+from .packer import message_length
+
+logger = logging.getLogger(__name__)
+
+
+class MockTelegramServer:
+    """
+    Stand-in for api.telegram.org implementing sendMessage, getUpdates and getMe
+
+    Simulates response latency, Telegram's flood limits (429 with
+    retry_after) and the 4096 character message limit, and records every
+    accepted message for inspection. Incoming user messages for
+    getUpdates are injected with push_update().
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8081, latency: float = 0.0, jitter: float = 0.0,
+                 chat_interval: float = 1.0, group_rate_per_min: int = 20, global_rate_per_sec: int = 30,
+                 max_length: int = 4096, error_rate: float = 0.0, seed: int = None):
+        """
+        Args:
+            host, port: Listen address (port 0 = pick a free port)
+            latency: Base response time (seconds)
+            jitter: Extra random response time, uniform in [0, jitter]
+            chat_interval: Min seconds between messages to one chat (0 = no limit)
+            group_rate_per_min: Max messages per minute to a group chat (0 = no limit)
+            global_rate_per_sec: Max messages per second overall (0 = no limit)
+            max_length: Max message length (UTF-16 units)
+            error_rate: Fraction of requests answered with 500
+            seed: Random seed for jitter and errors
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.chat_interval = chat_interval
+        self.group_rate_per_min = group_rate_per_min
+        self.global_rate_per_sec = global_rate_per_sec
+        self.max_length = max_length
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+        self._lock = threading.Lock()
+        self._chat_last = {}
+        self._group_sends = {}
+        self._global_sends = deque()
+        self.messages = []  # (chat_id, text, received_at)
+        self._updates = []  # Pending getUpdates entries
+        self._next_update_id = 1
+        self._updates_cond = threading.Condition(self._lock)
+        self.stats = {'requests': 0, 'ok': 0, 'rate_limited': 0, 'rejected': 0, 'errors': 0}
+
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Serve in a background thread; returns base URL"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-telegram", daemon=True)
+        self._thread.start()
+        logger.info(f"Mock Telegram API listening on {self.base_url}")
+        return self.base_url
+
+    def stop(self):
+        """Stop serving"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def serve_forever(self):
+        """Serve in the current thread (CLI)"""
+        logger.info(f"Mock Telegram API listening on {self.base_url}")
+        self._httpd.serve_forever()
+
+    def reset(self):
+        """Clear recorded messages, counters and rate limit state"""
+        with self._lock:
+            self._chat_last.clear()
+            self._group_sends.clear()
+            self._global_sends.clear()
+            self.messages = []
+            self._updates = []
+            self.stats = {key: 0 for key in self.stats}
+
+    def push_update(self, chat_id, text: str) -> int:
+        """Queue an incoming user message for getUpdates; returns update_id"""
+        with self._updates_cond:
+            update_id = self._next_update_id
+            self._next_update_id += 1
+            self._updates.append({
+                'update_id': update_id,
+                'message': {
+                    'message_id': update_id,
+                    'date': int(time.time()),
+                    'chat': {'id': int(chat_id) if str(chat_id).lstrip('-').isdigit() else chat_id},
+                    'from': {'id': 1, 'is_bot': False, 'first_name': 'Tester'},
+                    'text': text
+                }
+            })
+            self._updates_cond.notify_all()
+            return update_id
+
+    def wait_for_messages(self, count: int, timeout: float = 5.0) -> bool:
+        """Wait until at least count messages were accepted"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self._lock:
+                if len(self.messages) >= count:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    # ============================================
+    # BOT API METHODS
+    # ============================================
+
+    def handle(self, method: str, params: dict):
+        """Dispatch one API call; returns (HTTP status, response body)"""
+        arrived = time.time()  # Rate limits count arrivals, not the end of the simulated latency
+        with self._lock:
+            self.stats['requests'] += 1
+
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+        if method == 'getMe':
+            return 200, {'ok': True, 'result': {'id': 1, 'is_bot': True, 'username': 'mock_bot'}}
+        if method == 'sendMessage':
+            return self._send_message(params, arrived)
+        if method == 'getUpdates':
+            return self._get_updates(params)
+        return self._error(404, "Not Found")
+
+    def _get_updates(self, params: dict):
+        """Long poll: confirm updates below offset, wait up to timeout for new ones"""
+        offset = int(params.get('offset', 0) or 0)
+        timeout = min(float(params.get('timeout', 0) or 0), 50.0)
+        deadline = time.time() + timeout
+
+        with self._updates_cond:
+            self._updates = [u for u in self._updates if u['update_id'] >= offset]
+            while not self._updates and time.time() < deadline:
+                self._updates_cond.wait(deadline - time.time())
+            updates = list(self._updates)
+        return 200, {'ok': True, 'result': updates}
+
+    def _send_message(self, params: dict, now: float):
+        chat_id = str(params.get('chat_id', ''))
+        text = params.get('text', '')
+
+        if not chat_id:
+            return self._rejected("Bad Request: chat_id is empty")
+        if not text:
+            return self._rejected("Bad Request: message text is empty")
+        if message_length(text) > self.max_length:
+            return self._rejected("Bad Request: message is too long")
+
+        with self._lock:
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.stats['errors'] += 1
+                return self._error(500, "Internal Server Error")
+
+            retry_after = self._retry_after(chat_id, now)
+            if retry_after > 0:
+                self.stats['rate_limited'] += 1
+                return 429, {
+                    'ok': False,
+                    'error_code': 429,
+                    'description': f"Too Many Requests: retry after {retry_after}",
+                    'parameters': {'retry_after': retry_after}
+                }
+
+            self._chat_last[chat_id] = now
+            self._global_sends.append(now)
+            if chat_id.startswith('-'):
+                self._group_sends.setdefault(chat_id, deque()).append(now)
+
+            self.messages.append((chat_id, text, now))
+            self.stats['ok'] += 1
+            message_id = len(self.messages)
+
+        return 200, {
+            'ok': True,
+            'result': {'message_id': message_id, 'chat': {'id': chat_id}, 'date': int(now), 'text': text}
+        }
+
+    def _retry_after(self, chat_id: str, now: float) -> int:
+        """Seconds the client must wait (0 = allowed); called under lock"""
+        wait = 0.0
+
+        if self.chat_interval and chat_id in self._chat_last:
+            wait = max(wait, self._chat_last[chat_id] + self.chat_interval - now)
+
+        if self.global_rate_per_sec:
+            while self._global_sends and self._global_sends[0] <= now - 1.0:
+                self._global_sends.popleft()
+            if len(self._global_sends) >= self.global_rate_per_sec:
+                wait = max(wait, self._global_sends[0] + 1.0 - now)
+
+        sends = self._group_sends.get(chat_id)
+        if self.group_rate_per_min and sends is not None:
+            while sends and sends[0] <= now - 60.0:
+                sends.popleft()
+            if len(sends) >= self.group_rate_per_min:
+                wait = max(wait, sends[0] + 60.0 - now)
+
+        return int(math.ceil(wait)) if wait > 0 else 0
+
+    def _rejected(self, description: str):
+        with self._lock:
+            self.stats['rejected'] += 1
+        return self._error(400, description)
+
+    @staticmethod
+    def _error(code: int, description: str):
+        return code, {'ok': False, 'error_code': code, 'description': description}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Parses /bot<token>/<method> requests (JSON, form or query string)"""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+
+    def do_GET(self):
+        self._dispatch({})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b''
+        content_type = self.headers.get('Content-Type', '')
+
+        params = {}
+        try:
+            if 'application/json' in content_type:
+                params = json.loads(body or b'{}')
+            elif body:
+                params = {k: v[0] for k, v in parse_qs(body.decode('utf-8')).items()}
+        except ValueError:
+            self._respond(400, {'ok': False, 'error_code': 400, 'description': "Bad Request: invalid body"})
+            return
+        self._dispatch(params)
+
+    def _dispatch(self, params: dict):
+        url = urlparse(self.path)
+        params = {**{k: v[0] for k, v in parse_qs(url.query).items()}, **params}
+
+        parts = url.path.strip('/').split('/')
+        if len(parts) != 2 or not parts[0].startswith('bot'):
+            self._respond(404, {'ok': False, 'error_code': 404, 'description': "Not Found"})
+            return
+
+        status, body = self.server.mock.handle(parts[1], params)
+        self._respond(status, body)
+
+    def _respond(self, status: int, body: dict):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if status == 429:
+            self.send_header('Retry-After', str(body['parameters']['retry_after']))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Mock Telegram Bot API server")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency', type=float, default=0.05, help="Base response time (s)")
+    parser.add_argument('--jitter', type=float, default=0.05, help="Random extra response time (s)")
+    parser.add_argument('--chat-interval', type=float, default=1.0, help="Min seconds between messages per chat")
+    parser.add_argument('--group-rate', type=int, default=20, help="Max messages per minute per group")
+    parser.add_argument('--global-rate', type=int, default=30, help="Max messages per second overall")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of 500 responses")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server = MockTelegramServer(
+        host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+        chat_interval=args.chat_interval, group_rate_per_min=args.group_rate,
+        global_rate_per_sec=args.global_rate, error_rate=args.error_rate
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info(f"Stopped. Stats: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# ============================================
+# MESSAGE PACKER - TELEGRAM 4096 CHAR LIMIT
+# ============================================
+
+from typing import List
+
+from config.settings import TELEGRAM_MAX_MESSAGE_LENGTH
+
+
+def message_length(text: str) -> int:
+    """
+    Length as Telegram counts it (UTF-16 code units)
+
+    Measured on the raw HTML, so tags are counted too - always on the
+    safe side of the limit.
+    """
+    return len(text.encode('utf-16-le')) // 2
+
+
+class MessageSection:
+    """
+    One logical message: header lines, entries, footer lines
+
+    An entry is one result (may span several lines) and is never split;
+    messages are only cut between entries.
+    """
+    def __init__(self, header: List[str], entries: List[str], footer: List[str] = None):
+        self.header = header
+        self.entries = entries
+        self.footer = footer or []
+
+    def render(self) -> str:
+        """Render as a single message (no length limit)"""
+        return "\n".join(self.header + self.entries + self.footer)
+
+
+def split_section(section: MessageSection, limit: int = TELEGRAM_MAX_MESSAGE_LENGTH) -> List[str]:
+    """
+    Split a section into messages under limit, cutting between entries
+
+    Every part repeats the header and gets a part marker; the footer goes
+    on the last part.
+    """
+    text = section.render()
+    if message_length(text) <= limit:
+        return [text]
+
+    header = "\n".join(section.header)
+    footer = "\n".join(section.footer)
+    marker_room = message_length("\n📄 Bagian 99/99")
+    budget = limit - message_length(header) - marker_room - 1
+
+    # Greedy fill: entries in order, footer must fit in the last part
+    parts = []
+    current = []
+    current_len = 0
+    for entry in section.entries:
+        entry_len = message_length(entry) + 1
+        if entry_len > budget:
+            # Single oversized entry: hard cut (should not happen with per-result entries)
+            entry = entry[:max(0, budget - 2)] + "…"
+            entry_len = message_length(entry) + 1
+        if current and current_len + entry_len > budget:
+            parts.append(current)
+            current, current_len = [], 0
+        current.append(entry)
+        current_len += entry_len
+
+    footer_len = message_length(footer) + 1 if footer else 0
+    if current_len + footer_len > budget and current:
+        parts.append(current)
+        current = []
+    parts.append(current)
+
+    total = len(parts)
+    messages = []
+    for i, entries in enumerate(parts, 1):
+        lines = [header, f"📄 Bagian {i}/{total}"] + entries
+        if i == total and footer:
+            lines.append(footer)
+        messages.append("\n".join(lines))
+    return messages
+
+
+def pack_sections(sections: List[MessageSection], limit: int = TELEGRAM_MAX_MESSAGE_LENGTH,
+                  separator: str = "\n\n") -> List[str]:
+    """
+    Pack sections into as few messages as possible
+
+    Whole sections are combined into one message while they fit; a
+    section larger than the limit is split on entry boundaries.
+
+    Returns:
+        List of message texts, each under limit
+    """
+    messages = []
+    current = ""
+
+    for section in sections:
+        for part in split_section(section, limit):
+            if not current:
+                current = part
+            elif message_length(current) + message_length(separator) + message_length(part) <= limit:
+                current = current + separator + part
+            else:
+                messages.append(current)
+                current = part
+
+    if current:
+        messages.append(current)
+    return messages
@@ -0,0 +1,182 @@
+# ============================================
+# SUBSCRIPTIONS - PER-CHAT ALERT FILTERS
+# ============================================
+
+import os
+import json
+import threading
+from typing import Dict, List, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+from config.settings import TELEGRAM_CHAT_ID, TELEGRAM_SUBSCRIPTIONS, SUBSCRIPTIONS_FILE, MIN_DAILY_TURNOVER
+from database.alert_ledger import SIGNAL_TYPES
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_ticker(ticker: str) -> str:
+    """'bbca' -> 'BBCA.JK' (Yahoo Finance format used by the scanner)"""
+    ticker = ticker.strip().upper()
+    return ticker if ticker.endswith('.JK') else ticker + '.JK'
+
+
+class Subscription:
+    """One chat and the alerts it wants"""
+    def __init__(self, name: str, chat_id: str, min_turnover: float = MIN_DAILY_TURNOVER,
+                 signal_types: List[str] = None, tickers: List[str] = None):
+        self.name = name
+        self.chat_id = str(chat_id)
+        self.min_turnover = float(min_turnover)
+        self.signal_types = set(signal_types) if signal_types else set(SIGNAL_TYPES)
+        self.tickers = {normalize_ticker(t) for t in tickers} if tickers else None  # None = all
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Subscription':
+        return cls(
+            name=data.get('name', str(data['chat_id'])),
+            chat_id=data['chat_id'],
+            min_turnover=data.get('min_turnover', MIN_DAILY_TURNOVER),
+            signal_types=data.get('signal_types'),
+            tickers=data.get('tickers')
+        )
+
+
+class SubscriptionRegistry:
+    """
+    All subscribers and a ticker -> subscribers index
+
+    Filters are kept as arrays (one column per subscriber) so a batch of
+    signals is matched against every subscriber in one vectorized pass.
+    """
+
+    def __init__(self, subscriptions: List[Subscription]):
+        self.subscriptions = subscriptions
+        self.chat_ids = [s.chat_id for s in subscriptions]
+
+        # Filter columns (S = number of subscribers)
+        self._floors = np.array([s.min_turnover for s in subscriptions], dtype=float)
+        self._wants_type = {
+            signal_type: np.array([signal_type in s.signal_types for s in subscriptions], dtype=bool)
+            for signal_type in SIGNAL_TYPES
+        }
+        self._all_tickers = np.array([s.tickers is None for s in subscriptions], dtype=bool)
+
+        # Ticker -> subscribers index as a (T x S) membership matrix
+        listed = sorted({t for s in subscriptions if s.tickers for t in s.tickers})
+        self._ticker_index = pd.Index(listed)
+        self._membership = np.zeros((len(listed), len(subscriptions)), dtype=bool)
+        for col, s in enumerate(subscriptions):
+            if s.tickers:
+                self._membership[self._ticker_index.get_indexer(list(s.tickers)), col] = True
+
+    def subscribers_for(self, ticker: str) -> List[str]:
+        """Chat ids that follow a ticker (ignoring signal type and turnover)"""
+        pos = self._ticker_index.get_indexer([ticker])[0]
+        allowed = self._all_tickers.copy()
+        if pos >= 0:
+            allowed |= self._membership[pos]
+        return [self.chat_ids[i] for i in np.flatnonzero(allowed)]
+
+    def match(self, signals: Dict[str, List]) -> Dict[str, Dict[str, List]]:
+        """
+        Route a batch of signals to subscribers
+
+        Args:
+            signals: Dictionary of signal types and their results
+
+        Returns:
+            {chat_id: {signal_type: [results]}} (only chats with something to send)
+        """
+        results = {}
+        for signal_results in signals.values():
+            for result in signal_results:
+                results[result.ticker] = result
+        if not results or not self.subscriptions:
+            return {}
+
+        tickers = list(results.keys())
+        turnover = np.array([results[t].avg_turnover_5d for t in tickers], dtype=float)
+
+        # (N x S): ticker allowed for subscriber and above its turnover floor
+        pos = self._ticker_index.get_indexer(tickers)
+        listed = np.zeros((len(tickers), len(self.subscriptions)), dtype=bool)
+        if len(self._ticker_index):
+            known = pos >= 0
+            listed[known] = self._membership[pos[known]]
+        eligible = (listed | self._all_tickers[None, :]) & (turnover[:, None] >= self._floors[None, :])
+
+        row_of = {ticker: i for i, ticker in enumerate(tickers)}
+        routed = {chat_id: {} for chat_id in self.chat_ids}
+        for signal_type, signal_results in signals.items():
+            if not signal_results:
+                continue
+            wants = self._wants_type.get(signal_type)
+            if wants is None:
+                continue
+            rows = np.array([row_of[r.ticker] for r in signal_results])
+            matched = eligible[rows] & wants[None, :]  # (n x S) for this signal type
+            for col in np.flatnonzero(matched.any(axis=0)):
+                picked = [signal_results[i] for i in np.flatnonzero(matched[:, col])]
+                routed[self.chat_ids[col]].setdefault(signal_type, []).extend(picked)
+
+        return {chat_id: by_type for chat_id, by_type in routed.items() if by_type}
+
+
+def group_by_content(routed: Dict[str, Dict[str, List]]) -> List[Tuple[List[str], Dict[str, List]]]:
+    """
+    Group chats that receive exactly the same signals
+
+    Returns:
+        List of (chat_ids, signals) - each group is rendered once
+    """
+    groups = {}
+    for chat_id, by_type in routed.items():
+        fingerprint = tuple(sorted(
+            (signal_type, tuple(r.ticker for r in results)) for signal_type, results in by_type.items()
+        ))
+        if fingerprint in groups:
+            groups[fingerprint][0].append(chat_id)
+        else:
+            groups[fingerprint] = ([chat_id], by_type)
+    return list(groups.values())
+
+
+def load_subscriptions(file_path: str = SUBSCRIPTIONS_FILE, raw: str = TELEGRAM_SUBSCRIPTIONS) -> List[Subscription]:
+    """
+    Load subscribers from TELEGRAM_SUBSCRIPTIONS (JSON) or the subscriptions file
+
+    Falls back to a single subscriber on TELEGRAM_CHAT_ID with default filters.
+    """
+    try:
+        data = None
+        if raw:
+            data = json.loads(raw)
+        elif file_path and os.path.exists(file_path):
+            with open(file_path, 'r') as f:
+                data = json.load(f)
+
+        if data:
+            subscriptions = [Subscription.from_dict(item) for item in data]
+            logger.info(f"Loaded {len(subscriptions)} subscribers")
+            return subscriptions
+    except Exception as e:
+        logger.error(f"Error loading subscriptions: {str(e)}")
+
+    return [Subscription('default', TELEGRAM_CHAT_ID)]
+
+
+# Module-level registry shared by the scanner
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_subscription_registry() -> SubscriptionRegistry:
+    """Get the shared subscription registry (loaded on first use)"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SubscriptionRegistry(load_subscriptions())
+        return _registry
@@ -2,15 +2,27 @@
 # TELEGRAM BOT - SEND ALERTS
 # ============================================
 
-import requests
 from typing import List
 import logging
+import threading
+import time
+from collections import deque
 from datetime import datetime
 import pytz
 
-import sys
-sys.path.append('..')
-from config.settings import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+from config.settings import (
+    TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_API_BASE_URL, TELEGRAM_POLL_TIMEOUT, TELEGRAM_COMMAND_CHATS
+)
+from .delivery import post_message, get_delivery_worker, get_session
+from .packer import MessageSection, pack_sections, split_section
+from .templates import (
+    ALERT_TEMPLATES, SEPARATOR, RECAP_SCORE_ROW, RECAP_CORRECTION_ROW, format_timestamp, header_lines
+)
+from .subscriptions import get_subscription_registry, group_by_content, normalize_ticker
+from core.results_cache import get_results_cache
+from core.scanner import SIGNAL_COLUMNS
+from database.outbox import make_alert_key
+from monitoring.metrics import timed
 
 logger = logging.getLogger(__name__)
 
@@ -20,244 +32,209 @@ WIB = pytz.timezone('Asia/Jakarta')
 
 def get_current_time_wib() -> str:
     """Get current time in WIB format"""
-    now = datetime.now(WIB)
-    return now.strftime("%d %b %Y, %H:%M WIB")
+    return format_timestamp(datetime.now(WIB))
 
 
-def send_telegram_message(message: str) -> bool:
+def send_telegram_message(message: str, chat_id: str = None) -> bool:
     """
-    Send message via Telegram Bot API
+    Send message via Telegram Bot API (blocking, pooled connection)
     
     Args:
         message: Message text (supports HTML formatting)
+        chat_id: Target chat (default: TELEGRAM_CHAT_ID)
     
     Returns:
         True if successful, False otherwise
     """
-    if TELEGRAM_BOT_TOKEN == "YOUR_BOT_TOKEN_HERE" or TELEGRAM_CHAT_ID == "YOUR_CHAT_ID_HERE":
-        logger.warning("Telegram not configured. Message would be:")
-        print("\n" + "="*50)
-        print(message)
-        print("="*50 + "\n")
-        return True
-    
-    try:
-        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-        payload = {
-            'chat_id': TELEGRAM_CHAT_ID,
-            'text': message,
-            'parse_mode': 'HTML',
-            'disable_web_page_preview': True
-        }
-        
-        response = requests.post(url, json=payload, timeout=10)
-        
-        if response.status_code == 200:
-            logger.info("Telegram message sent successfully")
-            return True
-        else:
-            logger.error(f"Telegram error: {response.status_code} - {response.text}")
-            return False
-            
-    except Exception as e:
-        logger.error(f"Error sending Telegram message: {str(e)}")
+    success, retry_after, error = post_message(chat_id or TELEGRAM_CHAT_ID, message)
+    
+    if success:
+        logger.info("Telegram message sent successfully")
+    else:
+        logger.error(f"Telegram error: {error}")
+    
+    return success
+
+
+def queue_telegram_message(message: str, chat_id: str = None) -> bool:
+    """
+    Hand a message to the background delivery worker and return immediately
+    
+    Rate limits, retries and 429 backoff are handled by the worker.
+    
+    Returns:
+        True once queued (persisted in the outbox)
+    """
+    if not message:
         return False
+    return get_delivery_worker().submit(message, chat_id)
+
+
+def flush_telegram_queue(timeout: float = 60.0) -> bool:
+    """Wait until all queued messages are delivered (call before process exit)"""
+    return get_delivery_worker().flush(timeout)
+
+
+def stop_telegram_delivery(timeout: float = 10.0):
+    """Drain the queue and stop the background worker"""
+    get_delivery_worker().stop(timeout)
+
+
+def get_delivery_stats() -> dict:
+    """Get delivery counters and latency metrics of the background worker"""
+    return get_delivery_worker().get_stats()
+
+
+def build_bullish_break_section(results: List, timestamp: str = None) -> MessageSection:
+    """Build bullish break alert (header, one entry per result, footer)"""
+    return ALERT_TEMPLATES['bullish_break'].render(results, timestamp)
 
 
 def format_bullish_break_message(results: List) -> str:
     """Format bullish break alert message"""
     if not results:
         return ""
-    
-    lines = [
-        "━━━━━━━━━━━━━━━━━━━━━━━━━━",
-        "🟢 <b>SUPERTREND BULLISH BREAK</b>",
-        "━━━━━━━━━━━━━━━━━━━━━━━━━━",
-        f"⏰ {get_current_time_wib()}",
-        ""
-    ]
-    
-    for r in results:
-        ticker_clean = r.ticker.replace('.JK', '')
-        change_str = f"+{r.change_percent:.1f}%" if r.change_percent >= 0 else f"{r.change_percent:.1f}%"
-        lines.append(f"📈 <b>{ticker_clean}</b> | {r.price:,.0f} ({change_str})")
-        lines.append(f"   └─ ST: {r.supertrend_value:,.0f} | Score: {r.score}")
-    
-    lines.append("")
-    lines.append(f"━━━━━━━━━━━━━━━━━━━━━━━━━━")
-    lines.append(f"Total: {len(results)} saham break bullish")
-    
-    return "\n".join(lines)
+    return build_bullish_break_section(results).render()
+
+
+def build_bearish_break_section(results: List, timestamp: str = None) -> MessageSection:
+    """Build bearish break alert (header, one entry per result, footer)"""
+    return ALERT_TEMPLATES['bearish_break'].render(results, timestamp)
 
 
 def format_bearish_break_message(results: List) -> str:
     """Format bearish break alert message"""
     if not results:
         return ""
-    
-    lines = [
-        "━━━━━━━━━━━━━━━━━━━━━━━━━━",
-        "🔴 <b>SUPERTREND BEARISH BREAK</b>",
-        "━━━━━━━━━━━━━━━━━━━━━━━━━━",
-        f"⏰ {get_current_time_wib()}",
-        ""
-    ]
-    
-    for r in results:
-        ticker_clean = r.ticker.replace('.JK', '')
-        change_str = f"{r.change_percent:.1f}%"
-        lines.append(f"📉 <b>{ticker_clean}</b> | {r.price:,.0f} ({change_str})")
-        lines.append(f"   └─ ST: {r.supertrend_value:,.0f} | Score: {r.score}")
-    
-    lines.append("")
-    lines.append(f"━━━━━━━━━━━━━━━━━━━━━━━━━━")
-    lines.append(f"Total: {len(results)} saham break bearish")
-    
-    return "\n".join(lines)
+    return build_bearish_break_section(results).render()
+
+
+def build_stoch_crossover_section(results: List, timestamp: str = None) -> MessageSection:
+    """Build Stoch RSI Crossover alert (header, one entry per result, footer)"""
+    return ALERT_TEMPLATES['stoch_crossover'].render(results, timestamp)
 
 
 def format_stoch_crossover_message(results: List) -> str:
     """Format Stoch RSI Crossover alert message"""
     if not results:
         return ""
-    
-    lines = [
-        "━━━━━━━━━━━━━━━━━━━━━━━━━━",
-        "📈 <b>STOCH RSI CROSSOVER</b>",
-        "━━━━━━━━━━━━━━━━━━━━━━━━━━",
-        f"⏰ {get_current_time_wib()}",
-        ""
-    ]
-    
-    # Sort by stoch_k (lowest first = coming from oversold)
-    sorted_results = sorted(results, key=lambda x: x.stoch_k)
-    
-    for r in sorted_results:
-        ticker_clean = r.ticker.replace('.JK', '')
-        change_str = f"+{r.change_percent:.1f}%" if r.change_percent >= 0 else f"{r.change_percent:.1f}%"
-        lines.append(f"📊 <b>{ticker_clean}</b> | {r.price:,.0f} ({change_str})")
-        lines.append(f"   └─ Stoch K: {r.stoch_k:.0f} ↗ D: {r.stoch_d:.0f}")
-    
-    lines.append("")
-    lines.append(f"━━━━━━━━━━━━━━━━━━━━━━━━━━")
-    lines.append("💡 <i>K crossed above D = bullish momentum!</i>")
-    lines.append(f"Total: {len(results)} saham stoch crossover")
-    
-    return "\n".join(lines)
+    return build_stoch_crossover_section(results).render()
+
+
+def build_accumulation_section(results: List, timestamp: str = None) -> MessageSection:
+    """Build accumulation alert (header, one entry per result, footer)"""
+    return ALERT_TEMPLATES['accumulation'].render(results, timestamp)
 
 
 def format_accumulation_message(results: List) -> str:
     """Format accumulation signal message"""
     if not results:
         return ""
-    
-    lines = [
-        "━━━━━━━━━━━━━━━━━━━━━━━━━━",
-        "🔵 <b>ACCUMULATION SIGNAL</b>",
-        "━━━━━━━━━━━━━━━━━━━━━━━━━━",
-        f"⏰ {get_current_time_wib()}",
-        ""
-    ]
-    
-    for r in results:
-        ticker_clean = r.ticker.replace('.JK', '')
-        change_str = f"+{r.change_percent:.1f}%" if r.change_percent >= 0 else f"{r.change_percent:.1f}%"
-        lines.append(f"📊 <b>{ticker_clean}</b> | {r.price:,.0f} ({change_str})")
-        lines.append(f"   └─ Score: {r.score} | Vol: {r.volume_ratio:.1f}x | Stoch: {r.stoch_k:.0f}")
-    
-    lines.append("")
-    lines.append(f"━━━━━━━━━━━━━━━━━━━━━━━━━━")
-    lines.append(f"Total: {len(results)} saham accumulation")
-    
-    return "\n".join(lines)
+    return build_accumulation_section(results).render()
 
 
-
-def send_all_alerts(signals: dict) -> int:
-    """
-    Send all alert messages
-    
-    Args:
-        signals: Dictionary of signal types and their results
-    
-    Returns:
-        Number of messages sent
-    """
-    messages_sent = 0
-    
-    # Bullish break
-    if signals.get('bullish_break'):
-        msg = format_bullish_break_message(signals['bullish_break'])
-        if send_telegram_message(msg):
-            messages_sent += 1
-    
-    # Bearish break
-    if signals.get('bearish_break'):
-        msg = format_bearish_break_message(signals['bearish_break'])
-        if send_telegram_message(msg):
-            messages_sent += 1
-    
-    # Stoch RSI Crossover
-    if signals.get('stoch_crossover'):
-        msg = format_stoch_crossover_message(signals['stoch_crossover'])
-        if send_telegram_message(msg):
-            messages_sent += 1
-    
-    # Accumulation
-    if signals.get('accumulation'):
-        msg = format_accumulation_message(signals['accumulation'])
-        if send_telegram_message(msg):
-            messages_sent += 1
-    
-    # Early Entry (Serok Bawah)
-    if signals.get('early_entry'):
-        msg = format_early_entry_message(signals['early_entry'])
-        if send_telegram_message(msg):
-            messages_sent += 1
-    
-    return messages_sent
+def build_early_entry_section(results: List, timestamp: str = None) -> MessageSection:
+    """Build Early Entry (Serok Bawah) alert (header, one entry per result, footer)"""
+    return ALERT_TEMPLATES['early_entry'].render(results, timestamp)
 
 
 def format_early_entry_message(results: List) -> str:
-    """
-    Format Early Entry (Serok Bawah) message
-    
-    Signal detects:
-    - Dry correction (4-12% drop with low volume)
-    - Price holding (no lower low, range shrinking)
-    - Early buying (volume increasing, price stable)
-    """
+    """Format Early Entry (Serok Bawah) message"""
     if not results:
         return ""
+    return build_early_entry_section(results).render()
+
+
+# Signal type -> section builder, in send order
+SECTION_BUILDERS = {
+    'bullish_break': build_bullish_break_section,
+    'bearish_break': build_bearish_break_section,
+    'stoch_crossover': build_stoch_crossover_section,
+    'accumulation': build_accumulation_section,
+    'early_entry': build_early_entry_section
+}
+
+
+@timed('alert_send')
+def send_all_alerts(signals: dict, chat_id: str = None):
+    """
+    Queue all alert messages for background delivery
     
-    lines = [
-        "━━━━━━━━━━━━━━━━━━━━━━━━━━",
-        "🎯 <b>EARLY ENTRY (SEROK BAWAH)</b>",
-        "━━━━━━━━━━━━━━━━━━━━━━━━━━",
-        f"⏰ {get_current_time_wib()}",
-        ""
-    ]
+    Signals are routed to every subscriber whose filters match (see
+    subscriptions.py); chats receiving the same signals share one
+    rendering. Sections of all signal types are packed into as few
+    messages as fit Telegram's length limit; a large section is split
+    between results. Every alert carries an idempotency key per
+    (signal type, ticker, date) and chat, so alerts already in the outbox
+    are not rendered or sent again.
     
-    # Sort by strength (highest first)
-    sorted_results = sorted(results, key=lambda x: x.early_entry_strength, reverse=True)
+    Args:
+        signals: Dictionary of signal types and their results
+        chat_id: Send everything to this chat only (skips subscriptions)
     
-    for r in sorted_results:
-        ticker_clean = r.ticker.replace('.JK', '')
-        change_str = f"+{r.change_percent:.1f}%" if r.change_percent >= 0 else f"{r.change_percent:.1f}%"
-        
-        # Strength indicator
-        strength = r.early_entry_strength
-        emoji = "🔥" if strength >= 5 else "💎" if strength >= 3 else "📍"
+    Returns:
+        Number of messages queued (0 if all were already enqueued),
+        None if the messages could not be stored
+    """
+    worker = get_delivery_worker()
+    today = datetime.now(WIB).strftime('%Y-%m-%d')
+    
+    if chat_id:
+        routed = {chat_id: {signal_type: results for signal_type, results in signals.items() if results}}
+    else:
+        routed = get_subscription_registry().match(signals)
+    
+    keys = {
+        (chat, signal_type, r.ticker): make_alert_key(signal_type, r.ticker, today, chat)
+        for chat, by_type in routed.items()
+        for signal_type, results in by_type.items()
+        for r in results
+    }
+    if not keys:
+        return 0
+    
+    new_keys = set(keys.values())
+    if worker.outbox is not None:
+        try:
+            new_keys = worker.outbox.filter_new_keys(keys.values())
+        except Exception as e:
+            logger.error(f"Error reading outbox keys: {str(e)}")
+            return None
+        if len(new_keys) < len(keys):
+            logger.info(f"Skipping {len(keys) - len(new_keys)} alerts already in outbox")
+    
+    pending = {}
+    for chat, by_type in routed.items():
+        kept = {}
+        for signal_type, results in by_type.items():
+            fresh = [r for r in results if keys[(chat, signal_type, r.ticker)] in new_keys]
+            if fresh:
+                kept[signal_type] = fresh
+        if kept:
+            pending[chat] = kept
+    
+    timestamp = get_current_time_wib()
+    messages_queued = 0
+    for chat_ids, by_type in group_by_content(pending):
+        sections = [
+            build(by_type[signal_type], timestamp)
+            for signal_type, build in SECTION_BUILDERS.items()
+            if by_type.get(signal_type)
+        ]
+        messages = pack_sections(sections)
         
-        lines.append(f"{emoji} <b>{ticker_clean}</b> | {r.price:,.0f} ({change_str})")
-        lines.append(f"   └─ Koreksi: {r.correction_percent:.1f}% | Strength: {strength}/7")
-    
-    lines.append("")
-    lines.append(f"━━━━━━━━━━━━━━━━━━━━━━━━━━")
-    lines.append("⚠️ <i>Sinyal dini - DYOR!</i>")
-    lines.append(f"Total: {len(results)} saham early entry")
-    
-    return "\n".join(lines)
+        for chat in chat_ids:
+            chat_keys = sorted(
+                keys[(chat, signal_type, r.ticker)]
+                for signal_type, results in by_type.items()
+                for r in results
+            )
+            queued = worker.submit_batch(messages, chat, chat_keys)
+            if queued is None:
+                return None
+            messages_queued += queued
+    
+    return messages_queued
 
 
 def send_startup_message():
@@ -272,7 +249,7 @@ Scanner is now running.
 Alerts will be sent every 5 minutes.
 ━━━━━━━━━━━━━━━━━━━━━━━━━━
 """
-    send_telegram_message(msg.strip())
+    queue_telegram_message(msg.strip())
 
 
 def send_scan_complete_message(total_stocks: int, signals_count: dict):
@@ -296,169 +273,383 @@ Signals found: {total_signals}
     # send_telegram_message(msg.strip())
 
 
-def send_daily_recap_message(daily_summary: dict):
+def _ticker_list_entries(title: str, tickers: List[str], per_line: int = 20) -> List[str]:
+    """Recap category as entries: title + ticker lines (per_line tickers each), blank spacer"""
+    lines = [f"   {', '.join(tickers[i:i + per_line])}" for i in range(0, len(tickers), per_line)]
+    return [f"{title}\n{lines[0]}"] + lines[1:] + [""]
+
+
+def build_daily_recap_section(daily_summary: dict, timestamp: str = None) -> MessageSection:
     """
-    Send end-of-day recap message with ALL stocks that triggered signals today.
+    Build end-of-day recap with ALL stocks that triggered signals today.
     
     Args:
         daily_summary: Dictionary with signal types and their stocks
             {'date': '2026-01-26', 'bullish_break': ['BBCA.JK', ...], ...}
     """
-    lines = [
-        "━━━━━━━━━━━━━━━━━━━━━━━━━━",
-        "📋 <b>REKAP HARIAN - END OF DAY</b>",
-        "━━━━━━━━━━━━━━━━━━━━━━━━━━",
-        f"📅 {daily_summary.get('date', 'N/A')}",
-        f"⏰ {get_current_time_wib()}",
-        ""
+    header = header_lines("📋 <b>REKAP HARIAN - END OF DAY</b>", timestamp, date=daily_summary.get('date', 'N/A'))
+    
+    categories = [
+        ('bullish_break', "🟢 <b>BULLISH BREAK</b>"),
+        ('bearish_break', "🔴 <b>BEARISH BREAK</b>"),
+        ('stoch_crossover', "📈 <b>STOCH CROSSOVER</b>"),
+        ('accumulation', "🔵 <b>ACCUMULATION</b>"),
+        ('early_entry', "🎯 <b>EARLY ENTRY</b>")
     ]
     
+    entries = []
     total_signals = 0
     
-    # Bullish Break
-    bullish = daily_summary.get('bullish_break', [])
-    if bullish:
-        lines.append(f"🟢 <b>BULLISH BREAK</b> ({len(bullish)} saham)")
-        tickers = [t.replace('.JK', '') for t in bullish]
-        lines.append(f"   {', '.join(tickers)}")
-        lines.append("")
-        total_signals += len(bullish)
-    
-    # Bearish Break
-    bearish = daily_summary.get('bearish_break', [])
-    if bearish:
-        lines.append(f"🔴 <b>BEARISH BREAK</b> ({len(bearish)} saham)")
-        tickers = [t.replace('.JK', '') for t in bearish]
-        lines.append(f"   {', '.join(tickers)}")
-        lines.append("")
-        total_signals += len(bearish)
-    
-    # Stoch Crossover
-    stoch = daily_summary.get('stoch_crossover', [])
-    if stoch:
-        lines.append(f"📈 <b>STOCH CROSSOVER</b> ({len(stoch)} saham)")
-        tickers = [t.replace('.JK', '') for t in stoch]
-        lines.append(f"   {', '.join(tickers)}")
-        lines.append("")
-        total_signals += len(stoch)
-    
-    # Accumulation
-    acc = daily_summary.get('accumulation', [])
-    if acc:
-        lines.append(f"🔵 <b>ACCUMULATION</b> ({len(acc)} saham)")
-        tickers = [t.replace('.JK', '') for t in acc]
-        lines.append(f"   {', '.join(tickers)}")
-        lines.append("")
-        total_signals += len(acc)
-    
-    # Early Entry
-    early = daily_summary.get('early_entry', [])
-    if early:
-        lines.append(f"🎯 <b>EARLY ENTRY</b> ({len(early)} saham)")
-        tickers = [t.replace('.JK', '') for t in early]
-        lines.append(f"   {', '.join(tickers)}")
-        lines.append("")
-        total_signals += len(early)
+    for key, title in categories:
+        stocks = daily_summary.get(key, [])
+        if stocks:
+            tickers = [t.replace('.JK', '') for t in stocks]
+            entries.extend(_ticker_list_entries(f"{title} ({len(stocks)} saham)", tickers))
+            total_signals += len(stocks)
     
     # Footer
-    lines.append("━━━━━━━━━━━━━━━━━━━━━━━━━━")
-    lines.append(f"📊 Total: {total_signals} sinyal hari ini")
-    lines.append("━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    footer = [
+        SEPARATOR,
+        f"📊 Total: {total_signals} sinyal hari ini",
+        SEPARATOR
+    ]
     
-    message = "\n".join(lines)
-    send_telegram_message(message)
+    return MessageSection(header, entries, footer)
 
 
-def send_morning_recap_message(signals: dict):
+def send_daily_recap_message(daily_summary: dict, chat_id: str = None):
     """
-    Send evening recap message at 18:00 with ALL stocks matching screener criteria.
+    Send end-of-day recap message with ALL stocks that triggered signals today.
+    Split on category/ticker-line boundaries if it exceeds Telegram's limit.
+    
+    Args:
+        daily_summary: Dictionary with signal types and their stocks
+            {'date': '2026-01-26', 'bullish_break': ['BBCA.JK', ...], ...}
+        chat_id: Target chat (default: TELEGRAM_CHAT_ID)
+    """
+    for message in split_section(build_daily_recap_section(daily_summary)):
+        queue_telegram_message(message, chat_id)
+
+
+def build_morning_recap_section(signals: dict, timestamp: str = None) -> MessageSection:
+    """
+    Build evening recap (18:00) with ALL stocks matching screener criteria.
     
     Args:
         signals: Dictionary with categories and list of ScanResult objects
             {'strong_buy': [...], 'accumulation': [...], 'bullish': [...], 'early_entry': [...], 'stoch_crossover': [...], 'bearish_watch': [...]}
     """
-    lines = [
-        "━━━━━━━━━━━━━━━━━━━━━━━━━━",
-        "🌙 <b>EVENING SCAN - 18:00</b>",
-        "━━━━━━━━━━━━━━━━━━━━━━━━━━",
-        f"⏰ {get_current_time_wib()}",
-        ""
-    ]
+    header = header_lines("🌙 <b>EVENING SCAN - 18:00</b>", timestamp)
     
+    entries = []
     total_signals = 0
     
     # Strong Buy (highest priority)
     strong_buy = signals.get('strong_buy', [])
     if strong_buy:
-        lines.append(f"🔥 <b>STRONG BUY</b> ({len(strong_buy)} saham)")
-        for r in strong_buy[:10]:  # Limit to 10
-            ticker_clean = r.ticker.replace('.JK', '')
-            lines.append(f"   • {ticker_clean} | {r.price:,.0f} | Score: {r.score}")
+        entries.append(f"🔥 <b>STRONG BUY</b> ({len(strong_buy)} saham)")
+        entries.extend(RECAP_SCORE_ROW(r.ticker.replace('.JK', ''), r.price, r.score)
+                       for r in strong_buy[:10])  # Limit to 10
         if len(strong_buy) > 10:
-            lines.append(f"   ... dan {len(strong_buy) - 10} lainnya")
-        lines.append("")
+            entries.append(f"   ... dan {len(strong_buy) - 10} lainnya")
+        entries.append("")
         total_signals += len(strong_buy)
     
     # Accumulation
     acc = signals.get('accumulation', [])
     if acc:
-        lines.append(f"🔵 <b>ACCUMULATION</b> ({len(acc)} saham)")
-        for r in acc[:10]:
-            ticker_clean = r.ticker.replace('.JK', '')
-            lines.append(f"   • {ticker_clean} | {r.price:,.0f} | Score: {r.score}")
+        entries.append(f"🔵 <b>ACCUMULATION</b> ({len(acc)} saham)")
+        entries.extend(RECAP_SCORE_ROW(r.ticker.replace('.JK', ''), r.price, r.score) for r in acc[:10])
         if len(acc) > 10:
-            lines.append(f"   ... dan {len(acc) - 10} lainnya")
-        lines.append("")
+            entries.append(f"   ... dan {len(acc) - 10} lainnya")
+        entries.append("")
         total_signals += len(acc)
     
     # Bullish
     bullish = signals.get('bullish', [])
     if bullish:
-        lines.append(f"🟢 <b>BULLISH</b> ({len(bullish)} saham)")
         tickers = [r.ticker.replace('.JK', '') for r in bullish[:15]]
-        lines.append(f"   {', '.join(tickers)}")
+        entries.append(f"🟢 <b>BULLISH</b> ({len(bullish)} saham)\n   {', '.join(tickers)}")
         if len(bullish) > 15:
-            lines.append(f"   ... dan {len(bullish) - 15} lainnya")
-        lines.append("")
+            entries.append(f"   ... dan {len(bullish) - 15} lainnya")
+        entries.append("")
         total_signals += len(bullish)
     
     # Early Entry (Serok Bawah)
     early = signals.get('early_entry', [])
     if early:
-        lines.append(f"🎯 <b>EARLY ENTRY</b> ({len(early)} saham)")
-        for r in early[:8]:
-            ticker_clean = r.ticker.replace('.JK', '')
-            lines.append(f"   • {ticker_clean} | {r.price:,.0f} | Koreksi: {r.correction_percent:.1f}%")
+        entries.append(f"🎯 <b>EARLY ENTRY</b> ({len(early)} saham)")
+        entries.extend(RECAP_CORRECTION_ROW(r.ticker.replace('.JK', ''), r.price, r.correction_percent)
+                       for r in early[:8])
         if len(early) > 8:
-            lines.append(f"   ... dan {len(early) - 8} lainnya")
-        lines.append("")
+            entries.append(f"   ... dan {len(early) - 8} lainnya")
+        entries.append("")
         total_signals += len(early)
     
     # Stoch Crossover
     stoch = signals.get('stoch_crossover', [])
     if stoch:
-        lines.append(f"📈 <b>STOCH CROSSOVER</b> ({len(stoch)} saham)")
         tickers = [r.ticker.replace('.JK', '') for r in stoch[:15]]
-        lines.append(f"   {', '.join(tickers)}")
+        entries.append(f"📈 <b>STOCH CROSSOVER</b> ({len(stoch)} saham)\n   {', '.join(tickers)}")
         if len(stoch) > 15:
-            lines.append(f"   ... dan {len(stoch) - 15} lainnya")
-        lines.append("")
+            entries.append(f"   ... dan {len(stoch) - 15} lainnya")
+        entries.append("")
         total_signals += len(stoch)
     
     # Bearish Watch (warning)
     bearish = signals.get('bearish_watch', [])
     if bearish:
-        lines.append(f"⚠️ <b>BEARISH WATCH</b> ({len(bearish)} saham)")
         tickers = [r.ticker.replace('.JK', '') for r in bearish[:10]]
-        lines.append(f"   {', '.join(tickers)}")
-        lines.append("")
+        entries.append(f"⚠️ <b>BEARISH WATCH</b> ({len(bearish)} saham)\n   {', '.join(tickers)}")
+        entries.append("")
         total_signals += len(bearish)
     
     # Footer
-    lines.append("━━━━━━━━━━━━━━━━━━━━━━━━━━")
-    lines.append(f"📊 Total: {total_signals} saham dalam radar")
-    lines.append("💡 <i>Scan lengkap setelah market tutup</i>")
-    lines.append("━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    footer = [
+        SEPARATOR,
+        f"📊 Total: {total_signals} saham dalam radar",
+        "💡 <i>Scan lengkap setelah market tutup</i>",
+        SEPARATOR
+    ]
+    
+    return MessageSection(header, entries, footer)
+
+
+def send_morning_recap_message(signals: dict, chat_id: str = None):
+    """
+    Send evening recap message at 18:00 with ALL stocks matching screener criteria.
+    Split between entries if it exceeds Telegram's limit.
     
-    message = "\n".join(lines)
-    send_telegram_message(message)
+    Args:
+        signals: Dictionary with categories and list of ScanResult objects
+        chat_id: Target chat (default: TELEGRAM_CHAT_ID)
+    """
+    for message in split_section(build_morning_recap_section(signals)):
+        queue_telegram_message(message, chat_id)
+
+
+# ============================================
+# COMMAND BOT (/scan, /top, /signals)
+# ============================================
+
+COMMAND_HELP = """🤖 <b>IHSG SCANNER - PERINTAH</b>
+/scan BBCA - analisa satu saham
+/top 20 - saham dengan score tertinggi
+/signals accumulation - saham dengan sinyal tertentu
+   (bullish_break, bearish_break, stoch_crossover, accumulation, early_entry)"""
+
+NO_SCAN_YET = "⏳ Belum ada hasil scan. Coba lagi setelah scan berikutnya."
+
+SIGNAL_LABELS = {
+    'bullish_break': "Bullish Break",
+    'bearish_break': "Bearish Break",
+    'stoch_crossover': "Stoch Crossover",
+    'accumulation': "Accumulation",
+    'early_entry': "Early Entry"
+}
+
+# Ignore commands older than this (sent while the bot was down)
+COMMAND_MAX_AGE_SECONDS = 120
+
+
+def _format_scan_reply(result, cycle_id: int, updated_at) -> str:
+    """Single-ticker reply"""
+    ticker_clean = result.ticker.replace('.JK', '')
+    signals = [label for signal_type, label in SIGNAL_LABELS.items()
+               if getattr(result, SIGNAL_COLUMNS[signal_type])]
+    trend = "🟢 Bullish" if result.is_bullish else "🔴 Bearish"
+    source = (f"Scan #{cycle_id}, {updated_at.strftime('%H:%M WIB')}"
+              if cycle_id and updated_at is not None else "Analisa on-demand")
+    
+    lines = [
+        f"📊 <b>{ticker_clean}</b> | {result.price:,.0f} ({result.change_percent:+.1f}%)",
+        f"{result.status_emoji} {result.status} | Score: {result.score}",
+        f"Trend: {trend} | ST: {result.supertrend_value:,.0f}",
+        f"Stoch K/D: {result.stoch_k:.0f}/{result.stoch_d:.0f} | Vol: {result.volume_ratio:.1f}x",
+        f"Turnover 5D: Rp {result.avg_turnover_5d / 1e9:,.1f} M",
+        f"Sinyal: {', '.join(signals) if signals else '-'}",
+        f"⏰ {source}"
+    ]
+    return "\n".join(lines)
+
+
+def _resolve_signal_type(name: str):
+    """'acc' -> 'accumulation' (exact name or unique prefix)"""
+    name = name.lower().strip()
+    if name in SIGNAL_COLUMNS:
+        return name
+    matches = [signal_type for signal_type in SIGNAL_COLUMNS if signal_type.startswith(name)]
+    return matches[0] if len(matches) == 1 else None
+
+
+def handle_command(text: str, cache=None) -> List[str]:
+    """
+    Answer one bot command from the results cache
+    
+    Only /scan on a ticker missing from the latest cycle analyzes anything
+    (that single ticker); everything else is read from memory.
+    
+    Args:
+        text: Message text, e.g. '/scan BBCA', '/top 20', '/signals acc'
+        cache: ResultsCache (default: shared cache)
+    
+    Returns:
+        Reply messages (each under Telegram's length limit)
+    """
+    cache = cache or get_results_cache()
+    parts = text.strip().split()
+    if not parts:
+        return []
+    command = parts[0].split('@')[0].lower()  # /top@MyBot -> /top
+    args = parts[1:]
+    cycle_id, updated_at, table = cache.snapshot()
+    
+    if command == '/scan':
+        if not args:
+            return ["Format: /scan BBCA"]
+        ticker = normalize_ticker(args[0])
+        in_cycle = ticker in table.index
+        result = cache.get_or_analyze(ticker)
+        if result is None or result.status == "UNKNOWN":
+            return [f"❌ Data {ticker.replace('.JK', '')} tidak tersedia."]
+        return [_format_scan_reply(result, cycle_id if in_cycle else 0, updated_at)]
+    
+    if command == '/top':
+        if cycle_id == 0:
+            return [NO_SCAN_YET]
+        try:
+            n = max(1, min(int(args[0]) if args else 10, 100))
+        except ValueError:
+            return ["Format: /top 20"]
+        entries = [
+            f"{i}. {r.status_emoji} <b>{r.ticker.replace('.JK', '')}</b> | {r.price:,.0f} | Score: {r.score}"
+            for i, r in enumerate(cache.top(n), 1)
+        ]
+        section = MessageSection(header_lines(f"🏆 <b>TOP {n} SCORE</b>", format_timestamp(updated_at)), entries)
+        return split_section(section)
+    
+    if command == '/signals':
+        if not args:
+            return ["Format: /signals accumulation"]
+        signal_type = _resolve_signal_type(args[0])
+        if signal_type is None:
+            return [f"❌ Sinyal tidak dikenal: {args[0]}\n\n{COMMAND_HELP}"]
+        if cycle_id == 0:
+            return [NO_SCAN_YET]
+        results = cache.signals(signal_type)
+        if not results:
+            return [f"Tidak ada saham dengan sinyal {SIGNAL_LABELS[signal_type]} di scan terakhir."]
+        return split_section(ALERT_TEMPLATES[signal_type].render(results, format_timestamp(updated_at)))
+    
+    return [COMMAND_HELP]
+
+
+def get_updates(offset: int = None, timeout: int = TELEGRAM_POLL_TIMEOUT) -> list:
+    """
+    Long-poll the Bot API for new messages
+    
+    Returns:
+        List of update dicts (empty on timeout)
+    """
+    url = f"{TELEGRAM_API_BASE_URL}/bot{TELEGRAM_BOT_TOKEN}/getUpdates"
+    payload = {'timeout': timeout, 'allowed_updates': ['message']}
+    if offset is not None:
+        payload['offset'] = offset
+    
+    response = get_session().post(url, json=payload, timeout=timeout + 10)
+    if response.status_code != 200:
+        raise RuntimeError(f"getUpdates {response.status_code} - {response.text}")
+    return response.json().get('result', [])
+
+
+class CommandBot:
+    """
+    Long-polling command handler
+    
+    Runs in its own thread; replies are posted directly (not through the
+    alert queue) so they are not held behind an alert burst.
+    """
+    
+    def __init__(self, cache=None, post=post_message, poll_timeout: int = TELEGRAM_POLL_TIMEOUT,
+                 allowed_chats: List[str] = None):
+        self.cache = cache
+        self._post = post
+        self.poll_timeout = poll_timeout
+        self.allowed_chats = set(allowed_chats if allowed_chats is not None else TELEGRAM_COMMAND_CHATS)
+        self._stopping = threading.Event()
+        self._thread = None
+        self.handled = 0
+        self.reply_latencies = deque(maxlen=1000)  # update received -> replies posted (seconds)
+    
+    def start(self):
+        """Start polling thread (idempotent)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="telegram-commands", daemon=True)
+        self._thread.start()
+        logger.info("Telegram command bot started")
+    
+    def stop(self, timeout: float = 2.0):
+        """Stop polling (an in-flight long poll is abandoned)"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+    
+    def _run(self):
+        offset = None
+        while not self._stopping.is_set():
+            try:
+                updates = get_updates(offset, self.poll_timeout)
+            except Exception as e:
+                logger.error(f"Error polling Telegram commands: {str(e)}")
+                self._stopping.wait(5)
+                continue
+            
+            for update in updates:
+                offset = update['update_id'] + 1
+                try:
+                    self.handle_update(update)
+                except Exception as e:
+                    logger.error(f"Error handling command: {str(e)}")
+    
+    def handle_update(self, update: dict):
+        """Answer one update if it is a command from an allowed chat"""
+        started = time.time()
+        message = update.get('message') or {}
+        text = message.get('text', '')
+        chat_id = str(message.get('chat', {}).get('id', ''))
+        
+        if not text.startswith('/') or not chat_id:
+            return
+        if '*' not in self.allowed_chats and chat_id not in self.allowed_chats:
+            return
+        if started - message.get('date', started) > COMMAND_MAX_AGE_SECONDS:
+            return  # Stale command from before a restart
+        
+        for reply in handle_command(text, self.cache):
+            success, retry_after, error = self._post(chat_id, reply)
+            if not success:
+                logger.error(f"Telegram error replying to {text.split()[0]}: {error}")
+        
+        self.handled += 1
+        self.reply_latencies.append(time.time() - started)
+
+
+# Module-level command bot
+_command_bot = None
+
+
+def start_command_bot() -> CommandBot:
+    """Start the shared command bot"""
+    global _command_bot
+    if _command_bot is None:
+        _command_bot = CommandBot()
+    _command_bot.start()
+    return _command_bot
+
+
+def stop_command_bot():
+    """Stop the shared command bot"""
+    if _command_bot is not None:
+        _command_bot.stop()
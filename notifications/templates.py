@@ -0,0 +1,220 @@
+# ============================================
+# MESSAGE TEMPLATES - COMPILED ONCE, RENDER BATCHES
+# ============================================
+
+from datetime import datetime
+from operator import attrgetter
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from .packer import MessageSection
+
+# Timezone
+WIB = pytz.timezone('Asia/Jakarta')
+
+SEPARATOR = "━━━━━━━━━━━━━━━━━━━━━━━━━━"
+
+
+def format_timestamp(now: datetime = None) -> str:
+    """Timestamp line value, e.g. '26 Jan 2026, 10:15 WIB'"""
+    return (now or datetime.now(WIB)).strftime("%d %b %Y, %H:%M WIB")
+
+
+def header_lines(title: str, timestamp: str = None, date: str = None) -> List[str]:
+    """Standard message header: separator, title, separator, (date), time, blank"""
+    lines = [SEPARATOR, title, SEPARATOR]
+    if date is not None:
+        lines.append(f"📅 {date}")
+    lines.append(f"⏰ {timestamp or format_timestamp()}")
+    lines.append("")
+    return lines
+
+
+class _Unsigned(float):
+    """NaN change formatted as the old builders did: 'nan', never '+nan'"""
+    def __format__(self, spec: str) -> str:
+        return float.__format__(self, spec.replace('+', ''))
+
+
+# Derived columns computed from the batch rather than read from results
+DERIVED_COLUMNS = {
+    'strength_emoji': ('early_entry_strength',
+                       lambda v: np.where(v >= 5, "🔥", np.where(v >= 3, "💎", "📍"))),
+}
+
+
+class AlertTemplate:
+    """
+    Compiled alert layout for one signal type
+
+    Header/footer lines and the per-result format string are prepared
+    once; render() takes a whole batch (results table or list of
+    ScanResult), pulls the needed columns, orders them with one argsort
+    and formats all entries in a single map over the columns.
+    """
+
+    def __init__(self, title: str, entry: str, fields: Sequence[str], footer: Sequence[str],
+                 sort_by: str = None, descending: bool = False):
+        """
+        Args:
+            title: Header title line (with emoji and markup)
+            entry: Entry format with positional fields:
+                {0} ticker (no .JK), {1} price (rounded int), {2} change %, {3}.. extra fields
+            fields: Extra result (or DERIVED_COLUMNS) columns passed as {3}, {4}, ...
+            footer: Footer lines; may contain {count}
+            sort_by: Column to order entries by (stable sort)
+            descending: Sort order
+        """
+        self.title = title
+        self.fields = list(fields)
+        self.footer = list(footer)
+        self.sort_by = sort_by
+        self.descending = descending
+        self._entry = entry.format  # Compiled once: bound format method
+
+        needed = ['price', 'change_percent'] + ([sort_by] if sort_by else [])
+        for name in self.fields:
+            needed.append(DERIVED_COLUMNS[name][0] if name in DERIVED_COLUMNS else name)
+        self.columns = list(dict.fromkeys(needed))
+
+    def render_entries(self, batch, positions: np.ndarray = None) -> List[str]:
+        """
+        Render one entry per result
+
+        Args:
+            batch: Results table, list of ScanResult, or prepared columns (extract_columns)
+            positions: Rows of prepared columns to render (default: all)
+        """
+        cols = batch if isinstance(batch, dict) else extract_columns(batch, self.columns)
+        if positions is None:
+            positions = np.arange(len(cols['ticker']))
+        if len(positions) == 0:
+            return []
+
+        if self.sort_by:
+            key = cols[self.sort_by][positions]
+            order = np.argsort(-key if self.descending else key, kind='stable')
+            positions = positions[order]
+
+        extras = []
+        for name in self.fields:
+            if name in DERIVED_COLUMNS:
+                source, derive = DERIVED_COLUMNS[name]
+                extras.append(derive(cols[source][positions]).tolist())
+            else:
+                extras.append(cols[name][positions].tolist())
+
+        change = cols['change_percent'][positions].astype(float)
+        changes = change.tolist()
+        for i in np.flatnonzero(np.isnan(change)):  # No data on the live bar
+            changes[i] = _Unsigned(changes[i])
+
+        return list(map(
+            self._entry,
+            cols['ticker'][positions].tolist(),
+            cols['price'][positions].astype(float).tolist(),
+            changes,
+            *extras
+        ))
+
+    def render(self, batch, timestamp: str = None, positions: np.ndarray = None) -> MessageSection:
+        """Render a whole batch as one section"""
+        entries = self.render_entries(batch, positions)
+        footer = [line.format(count=len(entries)) for line in self.footer]
+        return MessageSection(header_lines(self.title, timestamp), entries, footer)
+
+
+def extract_columns(batch, names: Sequence[str]) -> Dict[str, np.ndarray]:
+    """
+    Pull columns of a batch as arrays, tickers already stripped of '.JK'
+
+    Args:
+        batch: Results table (results_to_table) or list of ScanResult
+        names: Result columns to extract
+    """
+    names = list(dict.fromkeys(names))
+    if isinstance(batch, pd.DataFrame):
+        columns = {name: batch[name].to_numpy() for name in names}
+        tickers = batch.index.tolist()
+    else:
+        transposed = list(zip(*map(attrgetter('ticker', *names), batch))) or [()] * (len(names) + 1)
+        columns = {name: np.array(transposed[i]) for i, name in enumerate(names, 1)}
+        tickers = transposed[0]
+    columns['ticker'] = np.array([t.replace('.JK', '') for t in tickers], dtype=object)
+    return columns
+
+
+ALERT_TEMPLATES = {
+    'bullish_break': AlertTemplate(
+        title="🟢 <b>SUPERTREND BULLISH BREAK</b>",
+        entry="📈 <b>{0}</b> | {1:,.0f} ({2:+.1f}%)\n   └─ ST: {3:,.0f} | Score: {4}",
+        fields=['supertrend_value', 'score'],
+        footer=["", SEPARATOR, "Total: {count} saham break bullish"]
+    ),
+    'bearish_break': AlertTemplate(
+        title="🔴 <b>SUPERTREND BEARISH BREAK</b>",
+        entry="📉 <b>{0}</b> | {1:,.0f} ({2:.1f}%)\n   └─ ST: {3:,.0f} | Score: {4}",
+        fields=['supertrend_value', 'score'],
+        footer=["", SEPARATOR, "Total: {count} saham break bearish"]
+    ),
+    'stoch_crossover': AlertTemplate(
+        title="📈 <b>STOCH RSI CROSSOVER</b>",
+        entry="📊 <b>{0}</b> | {1:,.0f} ({2:+.1f}%)\n   └─ Stoch K: {3:.0f} ↗ D: {4:.0f}",
+        fields=['stoch_k', 'stoch_d'],
+        footer=["", SEPARATOR, "💡 <i>K crossed above D = bullish momentum!</i>",
+                "Total: {count} saham stoch crossover"],
+        sort_by='stoch_k'  # Lowest first = coming from oversold
+    ),
+    'accumulation': AlertTemplate(
+        title="🔵 <b>ACCUMULATION SIGNAL</b>",
+        entry="📊 <b>{0}</b> | {1:,.0f} ({2:+.1f}%)\n   └─ Score: {3} | Vol: {4:.1f}x | Stoch: {5:.0f}",
+        fields=['score', 'volume_ratio', 'stoch_k'],
+        footer=["", SEPARATOR, "Total: {count} saham accumulation"]
+    ),
+    'early_entry': AlertTemplate(
+        title="🎯 <b>EARLY ENTRY (SEROK BAWAH)</b>",
+        entry="{3} <b>{0}</b> | {1:,.0f} ({2:+.1f}%)\n   └─ Koreksi: {4:.1f}% | Strength: {5}/7",
+        fields=['strength_emoji', 'correction_percent', 'early_entry_strength'],
+        footer=["", SEPARATOR, "⚠️ <i>Sinyal dini - DYOR!</i>", "Total: {count} saham early entry"],
+        sort_by='early_entry_strength',  # Strongest first
+        descending=True
+    )
+}
+
+# Every column any alert template needs
+ALERT_COLUMNS = list(dict.fromkeys(name for template in ALERT_TEMPLATES.values() for name in template.columns))
+
+# Recap rows (compiled once)
+RECAP_SCORE_ROW = "   • {} | {:,.0f} | Score: {}".format
+RECAP_CORRECTION_ROW = "   • {} | {:,.0f} | Koreksi: {:.1f}%".format
+
+
+def render_alert_sections(table: pd.DataFrame, signals: Dict[str, Union[List[str], pd.Index]],
+                          timestamp: str = None) -> List[MessageSection]:
+    """
+    Render every signal type straight from the results table
+
+    Columns are extracted once for the whole table; each signal type then
+    renders its rows by position.
+
+    Args:
+        table: Results table (results_to_table)
+        signals: {signal_type: tickers}
+        timestamp: Shared timestamp (default: now)
+
+    Returns:
+        Sections in send order (empty signal types skipped)
+    """
+    timestamp = timestamp or format_timestamp()
+    columns = extract_columns(table, ALERT_COLUMNS)
+    sections = []
+    for signal_type, template in ALERT_TEMPLATES.items():
+        tickers = signals.get(signal_type)
+        if tickers is None or len(tickers) == 0:
+            continue
+        positions = table.index.get_indexer(tickers)
+        sections.append(template.render(columns, timestamp, positions[positions >= 0]))
+    return sections
@@ -11,9 +11,16 @@ import os
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from main import run_scan, is_trading_hours, send_end_of_day_recap, is_end_of_trading, run_evening_scan, is_evening_scan_time
+from monitoring.startup import mark_startup, check_import_budget, startup_report  # First: starts the cold start clock
+from main import run_scan, is_trading_hours, send_end_of_day_recap, is_end_of_trading, run_evening_scan, is_evening_scan_time, flush_coalesced_alerts, resume_session
+from config.settings import SCHEDULER_TICK_SECONDS, ALERT_COALESCE_SECONDS, TELEGRAM_COMMANDS_ENABLED, API_ENABLED, WARM_RESTART_ENABLED
 from database.state_manager import StateManager
-from notifications.telegram_bot import send_startup_message, send_telegram_message
+from database.session_store import SessionStore
+from core.market_calendar import get_market_phase
+from notifications.telegram_bot import send_startup_message, queue_telegram_message, stop_telegram_delivery, get_delivery_stats, start_command_bot, stop_command_bot
+from notifications.delivery import is_telegram_configured
+from notifications.coalescer import AlertCoalescer
+from monitoring.profiler import consume_profile_request, profile_call
 
 logging.basicConfig(
     level=logging.INFO,
@@ -27,41 +34,68 @@ logger = logging.getLogger(__name__)
 
 # Global state manager
 state_manager = None
+session_store = None
+coalescer = None
+
+# Last logged market phase (log only on change, not every minute)
+last_phase = None
 
 
 def scheduled_scan():
     """Run scheduled scan"""
-    global state_manager
+    global state_manager, session_store, coalescer, last_phase
     
     # Evening scan at 18:00 (after market closes)
     if is_evening_scan_time():
         logger.info("Evening scan time! Running full recap...")
         try:
-            run_evening_scan(state_manager)
+            run_evening_scan(state_manager, session_store)
         except Exception as e:
             logger.error(f"Error during evening scan: {str(e)}")
-            send_telegram_message(f"⚠️ Evening Scan Error: {str(e)}")
+            queue_telegram_message(f"⚠️ Evening Scan Error: {str(e)}")
         return
     
     if not is_trading_hours():
-        logger.info("Outside trading hours. Waiting...")
+        # Holidays, weekends and the midday break: no fetch, no analysis
+        phase = get_market_phase()
+        if phase != last_phase:
+            logger.info(f"Outside trading hours ({phase}). Waiting...")
+            last_phase = phase
         return
     
+    last_phase = None
+    
     try:
         # Check if it's end of trading (16:00) - send recap instead
         if is_end_of_trading():
             logger.info("End of trading session. Sending daily recap...")
-            send_end_of_day_recap(state_manager)
+            flush_coalesced_alerts(state_manager, coalescer, force=True)  # Recap must include buffered signals
+            send_end_of_day_recap(state_manager, session_store)
         else:
-            run_scan(state_manager, force=False)
+            profile_mode = consume_profile_request()  # SCAN_PROFILE or logs/profile.request
+            if profile_mode:
+                profile_call(profile_mode, run_scan, state_manager, force=False,
+                             session_store=session_store, coalescer=coalescer)
+            else:
+                run_scan(state_manager, force=False, session_store=session_store, coalescer=coalescer)
+        
+        stats = get_delivery_stats()
+        if stats['sent'] or stats['queued'] or stats['failed'] or stats['outbox_depth']:
+            logger.info(f"Telegram delivery: {stats['sent']} sent, {stats['queued']} queued, "
+                        f"{stats['failed']} failed, {stats['retried']} retried | "
+                        f"latency p50 {stats['latency_p50']:.2f}s p95 {stats['latency_p95']:.2f}s | "
+                        f"outbox {stats['outbox_depth']} pending (oldest {stats['outbox_oldest_age']:.0f}s)")
     except Exception as e:
         logger.error(f"Error during scheduled scan: {str(e)}")
-        send_telegram_message(f"⚠️ Scanner Error: {str(e)}")
+        queue_telegram_message(f"⚠️ Scanner Error: {str(e)}")
 
 
 def main():
     """Main scheduler loop"""
-    global state_manager
+    global state_manager, session_store, coalescer
+    
+    mark_startup('imports')
+    check_import_budget()
     
     # Ensure directories exist
     os.makedirs('logs', exist_ok=True)
@@ -71,19 +105,39 @@ def main():
     logger.info("IHSG SUPERTREND SCANNER - SCHEDULER")
     logger.info("="*50)
     logger.info("Scan interval: 1 minute")
+    logger.info(f"Alert digest window: {ALERT_COALESCE_SECONDS}s")
     logger.info("Evening scan: 18:00 WIB")
-    logger.info("Trading hours: 09:00 - 16:00 WIB")
+    logger.info("Trading hours: 09:00 - 16:00 WIB (IDX sessions & holidays)")
     logger.info("="*50)
     
     # Initialize state manager
     state_manager = StateManager()
+    session_store = SessionStore()
+    coalescer = AlertCoalescer()
+    
+    # Serve the latest results over HTTP (the Procfile web process)
+    if API_ENABLED:
+        from api.server import start_api_server
+        start_api_server()
     
     # Send startup notification
     send_startup_message()
+    mark_startup('ready')
+    
+    # Resume from the last cycle's snapshot, or run a full initial scan
+    if not (WARM_RESTART_ENABLED and resume_session(session_store)):
+        logger.info("Running initial scan...")
+        profile_mode = consume_profile_request()
+        if profile_mode:
+            profile_call(profile_mode, run_scan, state_manager, force=True, session_store=session_store, coalescer=coalescer)
+        else:
+            run_scan(state_manager, force=True, session_store=session_store, coalescer=coalescer)
+    mark_startup('first_scan')
+    logger.info(startup_report())
     
-    # Run initial scan
-    logger.info("Running initial scan...")
-    run_scan(state_manager, force=True)
+    # Answer /scan, /top, /signals from the latest results
+    if TELEGRAM_COMMANDS_ENABLED and is_telegram_configured():
+        start_command_bot()
     
     # Schedule scans every 1 minute
     # Run at :00, :01, :02, ... :59
@@ -96,10 +150,17 @@ def main():
     while True:
         try:
             schedule.run_pending()
-            time.sleep(30)  # Check every 30 seconds
+            flush_coalesced_alerts(state_manager, coalescer)  # Digest window may end between scans
+            time.sleep(SCHEDULER_TICK_SECONDS)
         except KeyboardInterrupt:
             logger.info("Scheduler stopped by user")
-            send_telegram_message("🛑 IHSG Scanner stopped")
+            flush_coalesced_alerts(state_manager, coalescer, force=True)
+            stop_command_bot()
+            if API_ENABLED:
+                from api.server import stop_api_server
+                stop_api_server()
+            queue_telegram_message("🛑 IHSG Scanner stopped")
+            stop_telegram_delivery()
             break
         except Exception as e:
             logger.error(f"Scheduler error: {str(e)}")
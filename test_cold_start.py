@@ -0,0 +1,85 @@
+# Scheduler Cold Start Test (offline)
+# Run: python test_cold_start.py   (or: python -m pytest test_cold_start.py)
+# Each check runs in a fresh interpreter, so nothing is imported already.
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+RUNS = 3  # Best of: the first run may pay for a cold disk cache
+
+# Loaded on first use only, never by importing the scheduler
+LAZY_MODULES = ["yfinance", "curl_cffi", "bs4", "api.server"]
+
+# Imports plus a first analysis of a synthetic universe (no network)
+FIRST_SCAN_TICKERS = 50
+FIRST_SCAN_EXTRA_SECONDS = 3.0  # On top of the import budget
+
+IMPORT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import scheduler
+took = time.perf_counter() - started
+from config.settings import IMPORT_TIME_BUDGET_SECONDS
+print(json.dumps({'seconds': took, 'budget': IMPORT_TIME_BUDGET_SECONDS, 'modules': sorted(sys.modules)}))
+"""
+
+FIRST_SCAN_SCRIPT = """
+import json, time
+started = time.perf_counter()
+from datetime import date
+import scheduler
+from core.scanner import scan_all_stocks
+imported = time.perf_counter()
+from core.synthetic_market import SyntheticMarket
+universe = SyntheticMarket(%d, 120, 1, end=date(2026, 1, 30)).generate()
+generated = time.perf_counter()
+scan_all_stocks(universe)
+done = time.perf_counter()
+from config.settings import IMPORT_TIME_BUDGET_SECONDS
+print(json.dumps({'seconds': (imported - started) + (done - generated), 'budget': IMPORT_TIME_BUDGET_SECONDS,
+                  'tickers': len(universe)}))
+"""
+
+
+def run_fresh(script: str) -> dict:
+    """Run a script in a new interpreter and parse its last output line"""
+    env = dict(os.environ, TELEGRAM_COMMANDS_ENABLED="0")
+    out = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env,
+                         capture_output=True, text=True, timeout=120)
+    assert out.returncode == 0, out.stderr[-2000:]
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_import_budget():
+    runs = [run_fresh(IMPORT_SCRIPT) for _ in range(RUNS)]
+    best = min(r['seconds'] for r in runs)
+    budget = runs[0]['budget']
+    print(f"  import scheduler: best {best:.3f}s of {RUNS} (budget {budget:.2f}s)")
+    assert best <= budget, f"import scheduler took {best:.3f}s"
+
+    loaded = set(runs[0]['modules'])
+    eager = [name for name in LAZY_MODULES if name in loaded]
+    assert not eager, f"imported at startup: {eager}"
+
+
+def test_time_to_first_scan():
+    runs = [run_fresh(FIRST_SCAN_SCRIPT % FIRST_SCAN_TICKERS) for _ in range(RUNS)]
+    best = min(r['seconds'] for r in runs)
+    budget = runs[0]['budget'] + FIRST_SCAN_EXTRA_SECONDS
+    print(f"  imports + first scan of {FIRST_SCAN_TICKERS} tickers: best {best:.3f}s (budget {budget:.2f}s)")
+    assert best <= budget, f"time to first scan {best:.3f}s"
+
+
+if __name__ == "__main__":
+    failed = False
+    for test in (test_import_budget, test_time_to_first_scan):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"❌ {test.__name__}: {e}")
+    if failed:
+        sys.exit(1)
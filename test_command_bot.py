@@ -0,0 +1,133 @@
+# Telegram Command Bot Test (offline, against the local mock Bot API)
+# Run: python test_command_bot.py   (or: python -m pytest test_command_bot.py)
+import os
+import socket
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import DATA_PERIOD, DATA_INTERVAL
+from core.scanner import ScanResult
+from core.results_cache import ResultsCache
+from core.data_fetcher import set_cached_data
+from core.synthetic_market import SyntheticMarket
+from notifications import delivery, telegram_bot
+from notifications.mock_telegram_server import MockTelegramServer
+from notifications.telegram_bot import CommandBot, handle_command
+from notifications.packer import message_length
+
+REAL_API_BASE_URL = telegram_bot.TELEGRAM_API_BASE_URL
+CHAT_ID = "12345"
+UNIVERSE = 120
+
+
+def make_universe(n: int) -> dict:
+    """Synthetic latest-cycle results (no fetch, no analysis)"""
+    rng = np.random.default_rng(7)
+    results = {}
+    for i in range(n):
+        r = ScanResult(f"T{i:03d}.JK")
+        r.price = float(rng.uniform(100, 10000))
+        r.change_percent = float(rng.uniform(-5, 5))
+        r.supertrend_value = r.price * 0.95
+        r.is_bullish = bool(i % 2)
+        r.score = int(rng.integers(0, 100))
+        r.status = "HOLD"
+        r.status_emoji = "🟡"
+        r.is_accumulation = i % 10 == 0
+        r.stoch_k, r.stoch_d = 40.0, 35.0
+        r.volume_ratio = 1.2
+        r.avg_turnover_5d = 1e10
+        results[r.ticker] = r
+    return results
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_mock_bot():
+    port = free_port()
+    server = MockTelegramServer(port=port, chat_interval=0)
+    server.start()
+    # Polling (telegram_bot) and replies (delivery) both go to the mock API
+    telegram_bot.TELEGRAM_API_BASE_URL = delivery.TELEGRAM_API_BASE_URL = f"http://127.0.0.1:{port}"
+    results = make_universe(UNIVERSE)
+    cache = ResultsCache(universe=list(results) + ["MISS.JK"])
+    cache.update(results)
+    bot = CommandBot(cache=cache, poll_timeout=1, allowed_chats=[CHAT_ID])
+    bot.start()
+    return server, cache, bot
+
+
+def ask(server, text: str, chat_id: str = CHAT_ID, expect: int = 1, timeout: float = 5.0):
+    """Send a command as a user; returns (replies, seconds until the last reply)"""
+    before = len(server.messages)
+    started = time.time()
+    server.push_update(chat_id, text)
+    if not server.wait_for_messages(before + expect, timeout):
+        return [m[1] for m in server.messages[before:]], None
+    return [m[1] for m in server.messages[before:]], time.time() - started
+
+
+def test_command_bot():
+    server, cache, bot = start_mock_bot()
+    try:
+        # /top answered from memory, well under a second
+        replies, elapsed = ask(server, "/top 5")
+        assert elapsed is not None and elapsed < 1.0, elapsed
+        assert "TOP 5 SCORE" in replies[0] and replies[0].count("Score:") == 5
+
+        # Large replies are split below Telegram's limit
+        replies = handle_command("/top 100", cache)
+        assert sum(r.count("Score:") for r in replies) == 100
+        assert all(message_length(r) <= 4096 for r in replies)
+
+        # /scan of a ticker in the latest cycle (bare code, bot suffix)
+        replies, elapsed = ask(server, "/scan@mock_bot t005")
+        assert elapsed is not None and elapsed < 1.0
+        assert "<b>T005</b>" in replies[0] and "Scan #1" in replies[0]
+
+        # /signals with prefix
+        replies, _ = ask(server, "/signals acc")
+        assert "ACCUMULATION SIGNAL" in replies[0] and "Total: 12 saham" in replies[0]
+
+        # Cache miss: only this ticker is analyzed (bars served from the fetch cache)
+        bars = SyntheticMarket(1, 120, seed=11, names=["MISS.JK"]).generate()
+        set_cached_data("MISS.JK", DATA_PERIOD, DATA_INTERVAL, bars["MISS.JK"], ttl=300)
+        replies, _ = ask(server, "/scan MISS")
+        assert "<b>MISS</b>" in replies[0] and "Analisa on-demand" in replies[0]
+        assert cache.get("MISS.JK") is not None and "MISS.JK" not in cache.results
+        assert not cache._analyze_locks
+
+        # Tickers outside the universe are never fetched
+        replies, _ = ask(server, "/scan NOPE")
+        assert "tidak tersedia" in replies[0] and cache.get("NOPE.JK") is None
+
+        # Unknown signal and unknown command
+        replies, _ = ask(server, "/signals foo")
+        assert "Sinyal tidak dikenal" in replies[0]
+        replies, _ = ask(server, "/hello")
+        assert "PERINTAH" in replies[0]
+
+        # Chats outside the allow list are ignored
+        replies, elapsed = ask(server, "/top 3", chat_id="999", timeout=1.5)
+        assert elapsed is None and not replies
+    finally:
+        bot.stop()
+        server.stop()
+        telegram_bot.TELEGRAM_API_BASE_URL = delivery.TELEGRAM_API_BASE_URL = REAL_API_BASE_URL
+
+
+if __name__ == "__main__":
+    try:
+        test_command_bot()
+        print("✅ SUCCESS! Command bot replies OK (mock Bot API)")
+    except AssertionError as e:
+        print(f"❌ FAILED: {e}")
+        sys.exit(1)
@@ -0,0 +1,113 @@
+# Telegram Delivery Retry Test (offline, sends go to a scripted fake instead of the Bot API)
+# Run: python test_delivery.py   (or: python -m pytest test_delivery.py)
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import main
+from config.settings import TELEGRAM_MAX_ATTEMPTS
+from database.outbox import Outbox, make_alert_key
+from database.state_manager import StateManager
+from notifications import delivery
+from notifications.delivery import DeliveryWorker
+
+CHAT_ID = "12345"
+TODAY = datetime.now(main.WIB).strftime('%Y-%m-%d')
+
+
+class ScriptedPost:
+    """post_message stand-in answering from a list of (success, retry_after, error)"""
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def __call__(self, chat_id, text):
+        self.calls += 1
+        return self.responses.pop(0) if self.responses else (True, 0, "")
+
+
+def make_worker(post):
+    tmp = tempfile.mkdtemp(prefix="test_delivery_")
+    return DeliveryWorker(post=post, outbox=Outbox(os.path.join(tmp, "scanner.db"))), tmp
+
+
+def run(worker, texts, keys=()):
+    """Deliver a batch with the backoff and per-chat interval shortened to milliseconds"""
+    real = delivery.TELEGRAM_RETRY_MAX_SECONDS, delivery.TELEGRAM_CHAT_MIN_INTERVAL
+    delivery.TELEGRAM_RETRY_MAX_SECONDS = delivery.TELEGRAM_CHAT_MIN_INTERVAL = 0.01
+    try:
+        worker.submit_batch(texts, CHAT_ID, list(keys))
+        assert worker.flush(10), "queue not drained"
+    finally:
+        delivery.TELEGRAM_RETRY_MAX_SECONDS, delivery.TELEGRAM_CHAT_MIN_INTERVAL = real
+        worker.stop(1)
+
+
+def test_rate_limits_do_not_count_as_attempts():
+    post = ScriptedPost(*[(False, 0.01, "429 - Too Many Requests")] * (TELEGRAM_MAX_ATTEMPTS + 2))
+    worker, _ = make_worker(post)
+    run(worker, ["alert"])
+    assert worker.sent == 1 and worker.failed == 0, worker.get_stats()
+    assert post.calls == TELEGRAM_MAX_ATTEMPTS + 3
+
+
+def test_network_errors_retry_past_the_attempt_limit():
+    post = ScriptedPost(*[(False, 0, "Connection refused")] * (TELEGRAM_MAX_ATTEMPTS * 2))
+    worker, _ = make_worker(post)
+    run(worker, ["alert"])
+    assert worker.sent == 1 and worker.failed == 0, worker.get_stats()
+
+
+def test_rejected_message_gives_up():
+    post = ScriptedPost(*[(False, 0, "400 - Bad Request: can't parse entities")] * TELEGRAM_MAX_ATTEMPTS)
+    worker, _ = make_worker(post)
+    run(worker, ["alert"])
+    assert worker.sent == 0 and worker.failed == 1 and post.calls == TELEGRAM_MAX_ATTEMPTS
+
+
+def test_given_up_alerts_are_alerted_again():
+    real_deadline = delivery.delivery_deadline
+    delivery.delivery_deadline = lambda enqueued_at: enqueued_at  # Day already over
+    try:
+        worker, tmp = make_worker(ScriptedPost((False, 0, "Connection refused")))
+        keys = [make_alert_key('bullish_break', ticker, TODAY, CHAT_ID) for ticker in ("BBCA.JK", "BBRI.JK")]
+        run(worker, ["alert 1", "alert 2"], keys)
+    finally:
+        delivery.delivery_deadline = real_deadline
+    assert worker.failed == 1 and worker.sent == 1, worker.get_stats()
+
+    state_manager = StateManager(state_file=os.path.join(tmp, "states.json"), db_file=os.path.join(tmp, "scanner.db"),
+                                 journal_file=os.path.join(tmp, "journal.jsonl"), history_dir=os.path.join(tmp, "history"))
+    state_manager.add_alerted_stocks('bullish_break', ["BBCA.JK", "BBRI.JK", "TLKM.JK"])
+    state_manager.flush_alerts()
+
+    real_worker = main.get_delivery_worker
+    main.get_delivery_worker = lambda: worker
+    try:
+        assert main.requeue_undelivered_alerts(state_manager) == 2
+        assert main.requeue_undelivered_alerts(state_manager) == 0  # Keys released once
+    finally:
+        main.get_delivery_worker = real_worker
+
+    # The batch can be enqueued again; TLKM (another batch) stays alerted, also after a reload
+    assert worker.outbox.filter_new_keys(keys) == set(keys)
+    state_manager.alert_ledger.load()
+    assert state_manager.get_alerted_stocks('bullish_break') == {"TLKM.JK"}
+    state_manager.close()
+
+
+if __name__ == "__main__":
+    failed = False
+    for test in (test_rate_limits_do_not_count_as_attempts, test_network_errors_retry_past_the_attempt_limit,
+                 test_rejected_message_gives_up, test_given_up_alerts_are_alerted_again):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"❌ {test.__name__}: {e}")
+    if failed:
+        sys.exit(1)
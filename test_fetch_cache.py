@@ -0,0 +1,96 @@
+# Fetch Cache Revalidation Test (offline, Yahoo Finance replaced by synthetic bars)
+# Run: python test_fetch_cache.py   (or: python -m pytest test_fetch_cache.py)
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core import data_fetcher
+from core.data_fetcher import fetch_multiple_stocks, set_cached_data, clear_cache, get_last_fetch_stats
+from core.synthetic_market import SyntheticMarket
+
+PERIOD, INTERVAL = "1y", "1d"
+ROWS = 120
+
+
+def make_histories(*tickers: str) -> dict:
+    """Daily bars per ticker; the last one is the session after the cached history"""
+    return SyntheticMarket(len(tickers), ROWS + 1, seed=3, names=list(tickers)).generate()
+
+
+def split_adjusted(df: pd.DataFrame, ratio: float = 2.0) -> pd.DataFrame:
+    """The same bars after a 1:ratio split (Yahoo re-adjusts the whole history)"""
+    adjusted = df.copy()
+    adjusted[['open', 'high', 'low', 'close']] /= ratio
+    adjusted['volume'] *= ratio
+    return adjusted
+
+
+def run_revalidation(cached: dict, latest_bars: dict, full_history: dict) -> tuple:
+    """Expired cache entries for every ticker, then one fetch_multiple_stocks call"""
+    real_latest, real_fetch = data_fetcher.fetch_latest_bars, data_fetcher.fetch_stock_data
+    full_fetches = []
+
+    def fetch_stock_data(ticker, period, interval):
+        full_fetches.append(ticker)
+        return full_history[ticker]
+
+    data_fetcher.fetch_latest_bars = lambda tickers, period, interval: {t: latest_bars[t] for t in tickers}
+    data_fetcher.fetch_stock_data = fetch_stock_data
+    try:
+        clear_cache()
+        for ticker, df in cached.items():
+            set_cached_data(ticker, PERIOD, INTERVAL, df.iloc[:-1], ttl=-1)  # Expired
+        results = fetch_multiple_stocks(list(cached), PERIOD, INTERVAL, delay=0)
+        return results, full_fetches
+    finally:
+        data_fetcher.fetch_latest_bars, data_fetcher.fetch_stock_data = real_latest, real_fetch
+        clear_cache()
+
+
+def test_unchanged_history_is_revalidated():
+    history = make_histories("AAAA.JK")["AAAA.JK"]
+    results, full_fetches = run_revalidation({"AAAA.JK": history}, {"AAAA.JK": history.iloc[-5:]},
+                                             {"AAAA.JK": history})
+    assert not full_fetches, full_fetches
+    assert get_last_fetch_stats()['revalidated'] == 1
+    pd.testing.assert_frame_equal(results["AAAA.JK"], history.iloc[-ROWS:])
+
+
+def test_split_adjusted_overlap_refetches_ticker():
+    histories = make_histories("SPLT.JK", "AAAA.JK")
+    history = histories["AAAA.JK"]
+    adjusted = split_adjusted(histories["SPLT.JK"])  # Split after the history was cached
+    results, full_fetches = run_revalidation(
+        histories,
+        {"SPLT.JK": adjusted.iloc[-5:], "AAAA.JK": history.iloc[-5:]},
+        {"SPLT.JK": adjusted, "AAAA.JK": history})
+    assert full_fetches == ["SPLT.JK"], full_fetches
+    stats = get_last_fetch_stats()
+    assert stats['revalidated'] == 1 and stats['fetched'] == 1, stats
+    # One consistently adjusted series, no break at the old/new boundary
+    pd.testing.assert_frame_equal(results["SPLT.JK"], adjusted)
+
+
+def test_rounding_is_not_a_mismatch():
+    history = make_histories("AAAA.JK")["AAAA.JK"]
+    latest = history.iloc[-5:].copy()
+    latest[['open', 'high', 'low', 'close']] += 0.004  # Float noise of the adjusted prices
+    _, full_fetches = run_revalidation({"AAAA.JK": history}, {"AAAA.JK": latest}, {"AAAA.JK": history})
+    assert not full_fetches, full_fetches
+
+
+if __name__ == "__main__":
+    failed = False
+    for test in (test_unchanged_history_is_revalidated, test_split_adjusted_overlap_refetches_ticker,
+                 test_rounding_is_not_a_mismatch):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"❌ {test.__name__}: {e}")
+    if failed:
+        sys.exit(1)
@@ -1,8 +1,10 @@
 # Quick Telegram Test
+# Offline: run `python -m notifications.mock_telegram_server` and set
+# TELEGRAM_API_BASE_URL=http://127.0.0.1:8081 before running this script
 import requests
 import sys
 sys.path.insert(0, '.')
-from config.settings import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+from config.settings import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_API_BASE_URL
 
 BOT_TOKEN = TELEGRAM_BOT_TOKEN
 CHAT_ID = TELEGRAM_CHAT_ID
@@ -13,7 +15,7 @@ IHSG Scanner berhasil terhubung!
 Bot Telegram aktif ✅
 ━━━━━━━━━━━━━━━━━━━━━━━━━━"""
 
-url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
+url = f"{TELEGRAM_API_BASE_URL}/bot{BOT_TOKEN}/sendMessage"
 payload = {
     'chat_id': CHAT_ID,
     'text': message,